@@ -0,0 +1,400 @@
+# app/agents/checkpointer.py
+import os
+import time
+import random
+import asyncio
+import sqlite3
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from app.core.logger import logger
+
+# 체크포인트에 남기지 않는 일회성 상태 키 (실행이 끝나면 다시 쓰이지 않고, 아티팩트 핸들은 TTL이 지나면 무효)
+DEFAULT_EXCLUDED_KEYS: Tuple[str, ...] = (
+    "input_df_ref",
+    "frequencies_df_ref",
+    "sentiment_frequencies_df_ref",
+    "search_results",
+    "markdown_docs",
+    "chunks",
+    "retrieved",
+    "reranked",
+)
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph 체크포인트를 로컬 SQLite에 저장하는 체크포인터 (MemorySaver 대체)
+    - 프로세스를 재시작해도 thread_id별 대화 상태가 유지됨
+    - thread_id마다 최근 max_per_thread개의 루트 체크포인트만 보관. 서브그래프 체크포인트(매 실행마다 새 namespace)는
+      상위 루트 체크포인트가 정리될 때 함께 삭제
+    - 마지막 갱신 후 ttl_seconds가 지난 thread는 통째로 삭제 (put 중 주기적으로 정리)
+    - excluded_keys에 해당하는 채널 값은 체크포인트/pending write에 저장하지 않음
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_per_thread: int = 20,
+        ttl_seconds: float = 7 * 86400,
+        excluded_keys: Sequence[str] = DEFAULT_EXCLUDED_KEYS,
+        prune_interval: float = 600.0,
+        *,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.max_per_thread = max_per_thread
+        self.ttl_seconds = ttl_seconds
+        self.excluded_keys = frozenset(excluded_keys)
+        self.prune_interval = prune_interval
+        self._last_pruned = 0.0
+        self._lock = threading.Lock()
+
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                type TEXT,
+                checkpoint BLOB,
+                metadata_type TEXT,
+                metadata BLOB,
+                root_checkpoint_id TEXT,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                task_path TEXT NOT NULL DEFAULT '',
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                type TEXT,
+                value BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE INDEX IF NOT EXISTS idx_checkpoints_created ON checkpoints(created_at);
+            """
+        )
+        # 이전 스키마에는 root_checkpoint_id가 없음 (NULL이면 서브그래프 체크포인트 자신의 id로 정리)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(checkpoints)")}
+        if "root_checkpoint_id" not in columns:
+            self._conn.execute("ALTER TABLE checkpoints ADD COLUMN root_checkpoint_id TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_root ON checkpoints(thread_id, root_checkpoint_id)")
+        self._conn.commit()
+
+    # ---------- 조회 ----------
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str):
+        rows = self._conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return [(task_id, channel, self.serde.loads_typed((type_, value))) for task_id, channel, type_, value in rows]
+
+    def _to_tuple(self, row, checkpoint_ns: str) -> CheckpointTuple:
+        thread_id, checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=self.serde.loads_typed((type_, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)) if metadata is not None else {},
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id else None
+            ),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "thread_id, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            return self._to_tuple(row, checkpoint_ns) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        where, params = [], []
+        if config is not None:
+            where.append("thread_id = ?")
+            params.append(str(config["configurable"]["thread_id"]))
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_id)
+
+        query = (
+            "SELECT thread_id, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata, checkpoint_ns "
+            "FROM checkpoints"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + " ORDER BY checkpoint_id DESC"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            results = []
+            for row in rows:
+                item = self._to_tuple(row[:7], row[7])
+                # 메타데이터 필터는 직렬화된 값이라 SQL이 아닌 파이썬에서 비교
+                if filter and any(item.metadata.get(k) != v for k, v in filter.items()):
+                    continue
+                results.append(item)
+                if limit is not None and len(results) >= limit:
+                    break
+        yield from results
+
+    # ---------- 저장 ----------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+
+        if self.excluded_keys:
+            values = checkpoint.get("channel_values") or {}
+            checkpoint = {
+                **checkpoint,
+                "channel_values": {k: v for k, v in values.items() if k not in self.excluded_keys},
+            }
+        type_, serialized = self.serde.dumps_typed(checkpoint)
+        metadata = get_checkpoint_metadata(config, metadata)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(metadata)
+        # 서브그래프 체크포인트는 실행 당시의 루트(namespace "") 체크포인트에 묶어 두고 함께 정리
+        root_checkpoint_id = (metadata.get("parents") or {}).get("") if checkpoint_ns else None
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints "
+                "(thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata, "
+                "root_checkpoint_id, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                    type_, serialized, metadata_type, serialized_metadata, root_checkpoint_id, time.time(),
+                ),
+            )
+            if not checkpoint_ns:
+                self._trim_thread(thread_id)
+            self._maybe_prune_expired()
+            self._conn.commit()
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        # 특수 채널(오류/인터럽트 등)은 항상 덮어쓰고, 일반 채널은 이미 기록된 값을 유지
+        verb = "INSERT OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "INSERT OR IGNORE"
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            if channel in self.excluded_keys:
+                continue
+            type_, serialized = self.serde.dumps_typed(value)
+            rows.append((
+                thread_id, checkpoint_ns, checkpoint_id, task_id, task_path,
+                WRITES_IDX_MAP.get(channel, idx), channel, type_, serialized,
+            ))
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                f"{verb} INTO writes "
+                "(thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, idx, channel, type, value) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (str(thread_id),))
+            self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (str(thread_id),))
+            self._conn.commit()
+
+    def get_next_version(self, current: Optional[str], channel: None = None) -> str:
+        # MemorySaver와 같은 형식: 정렬 가능한 정수부 + 충돌 방지용 난수부
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # ---------- 보존 정책 ----------
+
+    def _trim_thread(self, thread_id: str):
+        """
+        thread의 루트 체크포인트를 최신 max_per_thread개만 남기고, 남은 가장 오래된 루트보다 앞선 실행의
+        서브그래프 체크포인트와 더 이상 체크포인트가 없는 write를 삭제
+        """
+        if self.max_per_thread <= 0:
+            return
+        row = self._conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = '' "
+            "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+            (thread_id, self.max_per_thread - 1),
+        ).fetchone()
+        if row is None:
+            return
+        oldest_kept = row[0]
+        removed = self._conn.execute(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND ("
+            "(checkpoint_ns = '' AND checkpoint_id < ?) OR "
+            # 루트를 알 수 없는 서브그래프 체크포인트는 자신의 id(시간순 uuid)로 비교
+            "(checkpoint_ns != '' AND COALESCE(root_checkpoint_id, checkpoint_id) < ?))",
+            (thread_id, oldest_kept, oldest_kept),
+        ).rowcount
+        if removed:
+            self._conn.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND NOT EXISTS ("
+                "SELECT 1 FROM checkpoints c WHERE c.thread_id = writes.thread_id "
+                "AND c.checkpoint_ns = writes.checkpoint_ns AND c.checkpoint_id = writes.checkpoint_id)",
+                (thread_id,),
+            )
+
+    def _maybe_prune_expired(self):
+        now = time.time()
+        if self.ttl_seconds <= 0 or now - self._last_pruned < self.prune_interval:
+            return
+        self._last_pruned = now
+        expired = self._conn.execute(
+            "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?",
+            (now - self.ttl_seconds,),
+        ).fetchall()
+        if expired:
+            params = [(tid,) for (tid,) in expired]
+            self._conn.executemany("DELETE FROM checkpoints WHERE thread_id = ?", params)
+            self._conn.executemany("DELETE FROM writes WHERE thread_id = ?", params)
+            logger.info(f"[Checkpointer] Evicted {len(expired)} expired threads.")
+
+    # ---------- 비동기 (SQLite 호출은 스레드로 위임) ----------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+_checkpointer_instance: Optional[SqliteCheckpointSaver] = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> Optional[SqliteCheckpointSaver]:
+    """
+    프로세스 전역 SQLite 체크포인터를 반환합니다.
+    CHECKPOINT_BACKEND=memory 이거나 DB를 열 수 없으면 None을 반환합니다. (호출 측에서 MemorySaver 사용)
+    """
+    global _checkpointer_instance
+    if os.getenv("CHECKPOINT_BACKEND", "sqlite").lower() != "sqlite":
+        return None
+
+    with _checkpointer_lock:
+        if _checkpointer_instance is None:
+            path = os.getenv("CHECKPOINT_PATH", os.path.join("cache", "checkpoints.sqlite3"))
+            excluded = os.getenv("CHECKPOINT_EXCLUDED_KEYS")
+            try:
+                _checkpointer_instance = SqliteCheckpointSaver(
+                    path=path,
+                    max_per_thread=int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "20")),
+                    ttl_seconds=float(os.getenv("CHECKPOINT_TTL_HOURS", "168")) * 3600,
+                    excluded_keys=(
+                        tuple(k.strip() for k in excluded.split(",") if k.strip())
+                        if excluded is not None else DEFAULT_EXCLUDED_KEYS
+                    ),
+                )
+            except Exception as e:
+                logger.error(f"[Checkpointer] Failed to open checkpoint DB at '{path}': {e}", exc_info=True)
+                return None
+    return _checkpointer_instance
@@ -14,6 +14,8 @@ class TMState(TypedDict, total=False):
     slots: Dict[str, Any]       # {"region":"KR", "period_days":30, ...}
     cache_key: str
     cache_hit: bool
+    report_cache_hit: bool      # 같은 slots/데이터 버전의 리포트를 캐시에서 바로 반환했는지
+    crawl_ranges: List[Dict[str, str]]  # [{"start": "YYYY-MM-DD", "end": "YYYY-MM-DD"}] 아직 수집하지 않은 구간
 
     # --- Insight Extract Outputs (Tools & KB) ---
     search_results: List[Dict[str, Any]]   # serper results
@@ -24,9 +26,10 @@ class TMState(TypedDict, total=False):
     reranked: List[Dict[str, Any]]         # top 10 after judge
 
     # --- Data flow between nodes ---
-    input_df_json: str # Serialized DataFrame for keyword extraction
+    input_df_ref: str # Artifact handle (artifact://...) of the DataFrame for keyword extraction
     base_export_path: str # Base path for exporting temp files if needed
-    frequencies_df_json: str # Serialized keyword frequencies DataFrame for DB sync
+    frequencies_df_ref: str # Artifact handle of the keyword frequencies DataFrame for DB sync
+    sentiment_frequencies_df_ref: str # Artifact handle of the sentiment frequencies DataFrame
 
     # --- Keyword Extraction Outputs ---
     csv_path: str
@@ -2,53 +2,120 @@ import pandas as pd
 import json
 import time
 import os
+import hashlib
+import threading
+from collections import deque, Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
-from io import StringIO
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from langgraph.graph import StateGraph, END
 from langchain_core.runnables import RunnableConfig
 from tqdm import tqdm
 
 from app.agents.state import TMState
+from app.agents.utils import count_tokens, truncate_text_to_tokens
 from app.core.llm import get_solar_pro_chat_client
 from app.core.logger import logger
+from app.core.rate_limit import TokenBucket, backoff_with_jitter
 from app.service.vector_service import VectorService
+from app.repository.cache.keyword_cache import KeywordResultCache, get_keyword_cache
+from app.repository.cache.artifact_store import get_artifact_store
 
-def keyword_extraction_node(state: TMState, config: RunnableConfig) -> dict:
+# LLM 배치 동시 처리 설정: 동시에 진행할 최대 배치 수, 초당 요청 수(프로세스 전역 공유), 배치별 재시도 횟수
+KEYWORD_EXTRACTION_MAX_IN_FLIGHT = int(os.getenv("KEYWORD_EXTRACTION_MAX_IN_FLIGHT", "4"))
+KEYWORD_EXTRACTION_REQUESTS_PER_SECOND = float(os.getenv("KEYWORD_EXTRACTION_REQUESTS_PER_SECOND", "2"))
+KEYWORD_EXTRACTION_MAX_RETRIES = int(os.getenv("KEYWORD_EXTRACTION_MAX_RETRIES", "3"))
+
+MODEL_NAME = "solar-pro"
+# 프롬프트나 출력 형식을 바꾸면 올려서 키워드 결과 캐시를 무효화
+PROMPT_VERSION = "v3"
+# 모델이 결과에서 빠뜨린 영상을 작은 후속 배치로 다시 요청하는 최대 횟수
+KEYWORD_EXTRACTION_FOLLOWUP_ROUNDS = int(os.getenv("KEYWORD_EXTRACTION_FOLLOWUP_ROUNDS", "2"))
+
+# 배치 크기 설정: 배치당 입력 토큰 예산, 배치당 영상 수 상/하한, 영상 설명 최대 토큰, 목표 응답 시간(초)
+KEYWORD_BATCH_TOKEN_BUDGET = int(os.getenv("KEYWORD_BATCH_TOKEN_BUDGET", "8000"))
+KEYWORD_BATCH_MAX_ITEMS = int(os.getenv("KEYWORD_BATCH_MAX_ITEMS", "50"))
+KEYWORD_BATCH_MIN_ITEMS = int(os.getenv("KEYWORD_BATCH_MIN_ITEMS", "5"))
+KEYWORD_DESCRIPTION_MAX_TOKENS = int(os.getenv("KEYWORD_DESCRIPTION_MAX_TOKENS", "300"))
+KEYWORD_BATCH_TARGET_LATENCY = float(os.getenv("KEYWORD_BATCH_TARGET_LATENCY", "45"))
+
+# 영상 1건을 JSON 항목으로 감쌀 때 붙는 id/키 이름 등의 대략적인 토큰 수
+_ITEM_OVERHEAD_TOKENS = 12
+
+_llm_bucket = TokenBucket(rate=KEYWORD_EXTRACTION_REQUESTS_PER_SECOND, capacity=KEYWORD_EXTRACTION_MAX_IN_FLIGHT)
+
+
+class AdaptiveBatchPlanner:
     """
-    LLM을 사용하여 트렌드 키워드를 추출하고, 결과를 벡터 DB에 동기화합니다.
-    안정성을 위해 배치 사이즈를 줄이고 API 타임아웃을 설정했습니다.
+    입력 토큰 예산 기반 배치 구성기 (프로세스 전역 공유)
+    - 영상별 토큰 수를 더해 예산(KEYWORD_BATCH_TOKEN_BUDGET)과 최대 영상 수를 넘지 않게 배치를 채움
+    - 관측한 응답 시간/오류로 예산 배율(scale)을 조절: 오류 시 절반, 목표 시간 초과 시 0.8배,
+      목표의 절반보다 빠르면 0.1씩 회복 (하한 0.1, 상한 1.0)
     """
-    logger.info("--- (KE) v2 --- Keyword Extraction Code ACTIVE ---") # New test log
-    logger.info("--- (KE) Entered Keyword Extraction Subgraph ---")
-    
-    # 벡터 서비스 및 설정 로드
-    vector_service: VectorService = config["configurable"].get("vector_service")
-    
-    try:
-        # 1. 데이터 로드 (input_df_json으로부터)
-        input_df_json = state.get("input_df_json")
-        base_export_path = state.get("base_export_path")
-        slots = state.get("slots", {})
-        domain = slots.get("domain", "any")
-        category = slots.get("search_query", domain)
 
-        if not input_df_json or not base_export_path:
-            return {"error": "필수 데이터(JSON 또는 export 경로)가 누락되었습니다."}
+    def __init__(self, token_budget: int, max_items: int, min_items: int, target_latency: float):
+        self.token_budget = token_budget
+        self.max_items = max_items
+        self.min_items = min(min_items, max_items)
+        self.target_latency = target_latency
+        self.scale = 1.0
+        self._lock = threading.Lock()
 
-        df = pd.read_json(StringIO(input_df_json), orient='split')
-        logger.info(f"KE Node: 총 {len(df)}개의 데이터를 처리합니다. (도메인: {domain})")
+    def limits(self) -> Tuple[int, int]:
+        with self._lock:
+            scale = self.scale
+        budget = max(1, int(self.token_budget * scale))
+        items = max(self.min_items, int(self.max_items * scale))
+        return budget, items
 
-        # 2. 키워드 추출 설정
-        model_name = "solar-pro"
-        batch_size = 50
-        client = get_solar_pro_chat_client()
-        
-        videos_info = df[['title', 'description']].fillna('').to_dict('records')
-        all_keywords = []
-        all_sentiments = [] # 감성 분석 결과 저장
+    def next_batch(self, queue: deque, max_items: Optional[int] = None) -> List[int]:
+        """(인덱스, 토큰 수) 큐 앞에서부터 예산에 맞게 꺼내 배치를 만듭니다. 최소 1건은 포함."""
+        budget, items = self.limits()
+        if max_items is not None:
+            items = max(1, min(items, max_items))
+        batch, used = [], 0
+        while queue and len(batch) < items:
+            idx, tokens = queue[0]
+            if batch and used + tokens > budget:
+                break
+            queue.popleft()
+            batch.append(idx)
+            used += tokens
+        return batch
+
+    def observe(self, latency: float, ok: bool):
+        with self._lock:
+            if not ok:
+                self.scale = max(0.1, self.scale * 0.5)
+            elif latency > self.target_latency:
+                self.scale = max(0.1, self.scale * 0.8)
+            elif latency < self.target_latency / 2:
+                self.scale = min(1.0, self.scale + 0.1)
+            scale = self.scale
+        logger.debug(f"[KeywordBatchPlanner] latency={latency:.1f}s ok={ok} -> scale={scale:.2f}")
+
+
+_batch_planner = AdaptiveBatchPlanner(
+    token_budget=KEYWORD_BATCH_TOKEN_BUDGET,
+    max_items=KEYWORD_BATCH_MAX_ITEMS,
+    min_items=KEYWORD_BATCH_MIN_ITEMS,
+    target_latency=KEYWORD_BATCH_TARGET_LATENCY,
+)
+
+
+def prepare_video_item(title: str, description: str) -> Tuple[Dict[str, str], int]:
+    """설명을 토큰 한도로 자르고, LLM에 보낼 항목과 그 토큰 수를 반환합니다."""
+    description = truncate_text_to_tokens(description, KEYWORD_DESCRIPTION_MAX_TOKENS)
+    item = {"title": title, "description": description}
+    return item, count_tokens(title) + count_tokens(description) + _ITEM_OVERHEAD_TOKENS
 
-        def extract_trend_keywords(videos_batch, domain_filter):
-            system_prompt = f"""
+
+class KeywordBatchError(RuntimeError):
+    """재시도 후에도 키워드 추출에 실패한 배치가 남아 있을 때 발생"""
+
+
+def _build_system_prompt(domain_filter: str) -> str:
+    return f"""
             당신은 '{domain_filter}' 도메인의 전문 분석가입니다. 영상 정보에서 마케팅 트렌드 키워드를 추출하고, 각 영상의 긍정/부정/중립 감성을 분석하는 것이 당신의 임무입니다.
 
             **키워드 추출에 대한 핵심 지침:**
@@ -64,12 +131,13 @@ def keyword_extraction_node(state: TMState, config: RunnableConfig) -> dict:
             {{
                 "results": [
                     {{
-                        "title": "원본 영상 제목",
+                        "id": 입력 영상의 id (정수, 그대로 복사),
                         "keywords": ["정규화된 키워드 1", "정규화된 키워드 2"],
                         "sentiment": "positive" | "negative" | "neutral"
                     }}
                 ]
             }}
+            입력된 모든 id에 대해 결과를 하나씩 반환하세요. 키워드가 없으면 빈 리스트를 반환하세요.
 
             **올바른 정규화 예시:**
             - **예시 1 (약어 통합)**: 텍스트에 "두쫀쿠 인기"와 "두바이 쫀득쿠키 후기"가 포함되어 있다면, 출력 키워드는 "두바이 쫀득쿠키" 하나여야 합니다.
@@ -77,108 +145,391 @@ def keyword_extraction_node(state: TMState, config: RunnableConfig) -> dict:
 
             이제 아래 리스트를 분석해주세요:
             """
-            user_prompt = f"아래 리스트를 분석해줘:\n{json.dumps(videos_batch, ensure_ascii=False)}"
-            
-            try:
-                response = client.chat.completions.create(
-                    model=model_name,
-                    messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
-                    response_format={"type": "json_object"},
-                    timeout=120 
-                )
-                response_content = response.choices[0].message.content
-                logger.debug(f"LLM raw response content: {response_content}")
-                
-                response_data = json.loads(response_content)
-                results = response_data.get('results', [])
-                
-                if not results:
-                    logger.warning("LLM returned no 'results' or an empty 'results' list.")
-
-                return results
-            except Exception as e:
-                logger.error(f"API 호출 중 오류 발생 (배치 건너뜀): {e}", exc_info=True)
-                return []
-
-        # 3. 루프 실행 (Progress Bar)
-        for i in tqdm(range(0, len(videos_info), batch_size)):
-            batch_info = videos_info[i : i + batch_size]
-            results = extract_trend_keywords(batch_info, domain)
-            
-            title_to_data = {item.get('title'): {
-                'keywords': item.get('keywords', []),
-                'sentiment': item.get('sentiment', 'neutral')
-            } for item in results}
-
-            for info in batch_info:
-                data = title_to_data.get(info['title'], {'keywords': [], 'sentiment': 'neutral'})
-                all_keywords.append(", ".join(data['keywords']))
-                all_sentiments.append(data['sentiment'])
-            
-            time.sleep(0.5)
-
-        # 결과 병합
-        df_processed = df.copy()
-        df_processed['trend_keywords'] = all_keywords[:len(df_processed)]
-        df_processed['sentiment'] = all_sentiments[:len(df_processed)]
-
-        # 4. CSV 저장 및 벡터 DB 동기화
-        output_path = f"{base_export_path}_with_keywords.csv"
+
+
+def extract_trend_keywords(client, videos_batch: List[Dict[str, Any]], domain_filter: str) -> List[Optional[Dict[str, Any]]]:
+    """
+    배치 1개를 LLM에 보내 입력 순서와 같은 길이의 결과 배열을 반환합니다.
+    영상마다 배치 내 번호(id)를 붙여 보내고 결과의 id로 자리를 찾으므로, 제목이 겹치거나
+    모델이 제목을 바꿔 써도 결과가 섞이지 않습니다. 모델이 빠뜨린 영상 자리는 None입니다.
+    호출 실패나 결과가 하나도 없는 경우는 예외로 올려 호출 측에서 배치 단위로 재시도합니다.
+    """
+    payload = [
+        {"id": i, "title": v.get("title", ""), "description": v.get("description", "")}
+        for i, v in enumerate(videos_batch)
+    ]
+    user_prompt = f"아래 리스트를 분석해줘:\n{json.dumps(payload, ensure_ascii=False)}"
+    response = client.chat.completions.create(
+        model=MODEL_NAME,
+        messages=[{"role": "system", "content": _build_system_prompt(domain_filter)}, {"role": "user", "content": user_prompt}],
+        response_format={"type": "json_object"},
+        timeout=120 
+    )
+    response_content = response.choices[0].message.content
+    logger.debug(f"LLM raw response content: {response_content}")
+
+    aligned: List[Optional[Dict[str, Any]]] = [None] * len(videos_batch)
+    for item in json.loads(response_content).get('results', []) or []:
+        try:
+            idx = int(item.get('id'))
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if 0 <= idx < len(aligned) and aligned[idx] is None:
+            keywords = item.get('keywords') or []
+            aligned[idx] = {
+                'keywords': [str(k) for k in keywords] if isinstance(keywords, list) else [],
+                'sentiment': item.get('sentiment') or 'neutral',
+            }
+
+    if all(r is None for r in aligned):
+        raise ValueError("LLM returned no usable results for this batch.")
+    return aligned
+
+
+def _run_batch_with_retries(client, batch_index: int, videos_batch: List[Dict[str, Any]], domain_filter: str) -> List[Optional[Dict[str, Any]]]:
+    """공유 속도 제한을 지키며 배치 1개를 처리하고, 실패하면 이 배치만 재시도합니다."""
+    last_error = None
+    for attempt in range(KEYWORD_EXTRACTION_MAX_RETRIES):
+        _llm_bucket.acquire()
+        started = time.perf_counter()
+        try:
+            results = extract_trend_keywords(client, videos_batch, domain_filter)
+            _llm_bucket.reward()
+            _batch_planner.observe(time.perf_counter() - started, ok=True)
+            return results
+        except Exception as e:
+            last_error = e
+            _batch_planner.observe(time.perf_counter() - started, ok=False)
+            if getattr(e, "status_code", None) == 429:
+                _llm_bucket.penalize()
+            logger.warning(f"Keyword batch {batch_index} failed (attempt {attempt + 1}/{KEYWORD_EXTRACTION_MAX_RETRIES}): {e}")
+            if attempt < KEYWORD_EXTRACTION_MAX_RETRIES - 1:
+                time.sleep(backoff_with_jitter(attempt, base=2.0))
+    raise KeywordBatchError(f"배치 {batch_index} 키워드 추출 실패: {last_error}")
+
+
+def iter_keyword_batches(
+    client,
+    items: List[Dict[str, Any]],
+    token_costs: List[int],
+    indices: List[int],
+    domain_filter: str,
+    max_items: Optional[int] = None,
+) -> Iterator[Tuple[List[int], List[Optional[Dict[str, Any]]]]]:
+    """
+    indices에 해당하는 영상들을 토큰 예산에 맞춘 배치로 나눠 최대 KEYWORD_EXTRACTION_MAX_IN_FLIGHT개까지
+    동시에 처리하고, 끝나는 배치부터 (배치의 영상 인덱스, 인덱스와 같은 순서의 결과 배열)을 내보냅니다.
+    배치는 슬롯이 빌 때마다 그 시점의 예산으로 새로 구성하므로 관측한 응답 시간이 바로 반영됩니다.
+    재시도 후에도 실패한 배치가 있으면 나머지 배치를 모두 내보낸 뒤 KeywordBatchError를 발생시킵니다.
+    """
+    queue = deque((idx, token_costs[idx]) for idx in indices)
+    failed = []
+    batch_no = 0
+    with ThreadPoolExecutor(max_workers=max(1, KEYWORD_EXTRACTION_MAX_IN_FLIGHT)) as executor, tqdm(total=len(queue)) as progress:
+        in_flight = {}
+        while queue or in_flight:
+            while queue and len(in_flight) < KEYWORD_EXTRACTION_MAX_IN_FLIGHT:
+                batch = _batch_planner.next_batch(queue, max_items=max_items)
+                future = executor.submit(_run_batch_with_retries, client, batch_no, [items[i] for i in batch], domain_filter)
+                in_flight[future] = batch
+                batch_no += 1
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = in_flight.pop(future)
+                progress.update(len(batch))
+                try:
+                    results = future.result()
+                except KeywordBatchError as e:
+                    logger.error(str(e))
+                    failed.append(batch)
+                    continue
+                yield batch, results
+
+    if failed:
+        raise KeywordBatchError(
+            f"{len(failed)}/{batch_no}개 배치({sum(len(b) for b in failed)}건)의 키워드 추출에 실패했습니다."
+        )
+
+
+class KeywordResultSink:
+    """
+    키워드 추출이 끝난 영상들을 배치 단위로 바로 내보내는 스트리밍 출력
+    - CSV에 행을 이어 쓰고, 벡터 DB에 임베딩/업서트하고, 키워드/감성 빈도를 누적 집계
+    - 중간에 실패해도 이미 쓴 배치는 CSV와 DB에 남음
+    - 배치는 끝난 순서대로 들어오므로, close()에서 CSV를 입력 DataFrame 순서로 다시 정렬해 씀
+      (이를 위해 행별 키워드/감성 문자열만 메모리에 보관)
+    """
+
+    def __init__(self, df: pd.DataFrame, output_path: str, vector_service: Optional[VectorService], category: str):
+        self.df = df
+        self.output_path = output_path
+        self.vector_service = vector_service
+        self.category = category
+        self.keyword_counts = Counter()
+        self.sentiment_counts = Counter()
+        self.rows_written = 0
+        self._results: Dict[int, Tuple[str, str]] = {}
+
         # 파일 저장 전 디렉토리 존재 확인 및 생성
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        df_processed.to_csv(output_path, index=False, encoding='utf-8-sig')
-
-        if vector_service and not df_processed.empty:
-            documents = []
-            metadatas = []
-            ids = []
-
-            for idx, row in df_processed.iterrows():
-                text_content = f"제목: {row['title']}\n내용: {row['description']}\n키워드: {row['trend_keywords']}"
-                documents.append(text_content)
-                # `published_at`을 Unix 타임스탬프로 변환 (더 강력한 방식)
-                pub_date_val = row.get('published_at')
-                if pd.isna(pub_date_val):
-                    timestamp = datetime.now().timestamp()
-                else:
-                    try:
-                        # to_datetime은 다양한 포맷을 처리할 수 있음
-                        timestamp = pd.to_datetime(pub_date_val).timestamp()
-                    except (ValueError, TypeError):
-                        timestamp = datetime.now().timestamp()
-                
-                metadatas.append({
-                    "keyword": row['trend_keywords'],
-                    "category": category,
-                    "sns": "youtube",
-                    "sentiment": row['sentiment'],
-                    "published_at": timestamp
-                })
-                ids.append(f"yt_{row.get('video_id', idx)}")
-
-            vector_service.add_documents(documents=documents, metadatas=metadatas, ids=ids)
-            logger.info(f"Adding documents to vector DB. Sample metadatas (first 3): {metadatas[:3]}") # Log metadatas for verification
-            logger.info(f"벡터 DB에 {len(documents)}건의 데이터를 동기화했습니다.")
-
-        # 5. 빈도수 계산 및 반환
-        all_extracted_keywords = []
-        for keywords_str in df_processed['trend_keywords'].dropna():
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        self._file = open(output_path, "w", newline="", encoding="utf-8-sig")
+        self._header_written = False
+
+    def write(self, indices: List[int], keywords: List[str], sentiments: List[str]):
+        if not indices:
+            return
+        rows = self.df.iloc[indices].copy()
+        rows['trend_keywords'] = keywords
+        rows['sentiment'] = sentiments
+
+        rows.to_csv(self._file, index=False, header=not self._header_written)
+        self._file.flush()
+        self._header_written = True
+        self.rows_written += len(rows)
+        self._results.update(zip(indices, zip(keywords, sentiments)))
+
+        for keywords_str in keywords:
             keywords_in_row = [kw.strip().replace(' ', '') for kw in keywords_str.split(',') if kw.strip()]
-            all_extracted_keywords.extend(list(set(keywords_in_row)))
+            self.keyword_counts.update(set(keywords_in_row))
+        self.sentiment_counts.update(s for s in sentiments if s)
+
+        if self.vector_service:
+            documents, metadatas, ids = _build_vector_records(rows, self.category)
+            self.vector_service.add_documents(documents=documents, metadatas=metadatas, ids=ids)
+            logger.debug(f"Upserted {len(documents)} documents. Sample metadatas (first 3): {metadatas[:3]}")
+
+    def close(self):
+        if not self._header_written:
+            # 결과가 한 건도 없어도 헤더는 남겨 둠
+            self.df.head(0).assign(trend_keywords=[], sentiment=[]).to_csv(self._file, index=False)
+            self._header_written = True
+        self._file.close()
+
+        order = sorted(self._results)
+        if list(self._results) != order:
+            rows = self.df.iloc[order].copy()
+            rows['trend_keywords'] = [self._results[idx][0] for idx in order]
+            rows['sentiment'] = [self._results[idx][1] for idx in order]
+            # 임시 파일에 쓴 뒤 교체하여 정렬 중 실패해도 이어 쓴 CSV는 남도록 함
+            tmp_path = f"{self.output_path}.tmp"
+            rows.to_csv(tmp_path, index=False, encoding="utf-8-sig")
+            os.replace(tmp_path, self.output_path)
+
+
+def _build_vector_records(rows: pd.DataFrame, category: str):
+    documents = []
+    metadatas = []
+    ids = []
+    for idx, row in rows.iterrows():
+        text_content = f"제목: {row['title']}\n내용: {row['description']}\n키워드: {row['trend_keywords']}"
+        documents.append(text_content)
+        # `published_at`을 Unix 타임스탬프로 변환 (더 강력한 방식)
+        pub_date_val = row.get('published_at')
+        if pd.isna(pub_date_val):
+            timestamp = datetime.now().timestamp()
+        else:
+            try:
+                # to_datetime은 다양한 포맷을 처리할 수 있음
+                timestamp = pd.to_datetime(pub_date_val).timestamp()
+            except (ValueError, TypeError):
+                timestamp = datetime.now().timestamp()
+        
+        metadatas.append({
+            "keyword": row['trend_keywords'],
+            "category": category,
+            "sns": "youtube",
+            "sentiment": row['sentiment'],
+            "published_at": timestamp
+        })
+        ids.append(f"yt_{row.get('video_id', idx)}")
+    return documents, metadatas, ids
+
+
+class ExtractionJournal:
+    """
+    키워드 추출 진행 상황을 기록하는 추가 전용(append-only) JSONL 저널 ({base_export_path}.journal.jsonl)
+    - 첫 줄은 입력 지문(fingerprint). 입력/모델/프롬프트가 같을 때만 이전 기록을 이어서 사용
+    - 배치가 끝날 때마다 {인덱스: 결과} 한 줄을 fsync까지 마쳐 기록하므로 프로세스가 죽어도 남음
+    - 모든 영상 처리가 끝나면 삭제
+    """
+
+    def __init__(self, path: str, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self._file = None
+
+    @staticmethod
+    def make_fingerprint(input_df_ref: str, domain: str) -> str:
+        # 아티팩트 핸들은 내용 해시이므로 같은 입력이면 같은 핸들
+        return hashlib.sha256(f"{MODEL_NAME}\x00{PROMPT_VERSION}\x00{domain}\x00{input_df_ref}".encode("utf-8")).hexdigest()
+
+    def load(self) -> Dict[int, Dict[str, Any]]:
+        """같은 입력으로 기록된 완료 결과를 읽어 옵니다. 지문이 다르면 이전 저널은 버립니다."""
+        completed: Dict[int, Dict[str, Any]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            header = _parse_journal_line(lines[0]) if lines else None
+            if header and header.get("fingerprint") == self.fingerprint:
+                # 기록 도중 죽어서 잘린 마지막 줄은 무시
+                for line in lines[1:]:
+                    entry = _parse_journal_line(line)
+                    if entry:
+                        completed.update({int(k): v for k, v in entry.get("results", {}).items()})
+                self._file = open(self.path, "a", encoding="utf-8")
+                return completed
+            logger.info(f"KE Journal: 입력이 달라 이전 저널을 버립니다. ({self.path})")
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._write({"fingerprint": self.fingerprint, "created_at": datetime.now().isoformat()})
+        return completed
+
+    def append(self, results: Dict[int, Dict[str, Any]]):
+        if results:
+            self._write({"results": {str(k): v for k, v in results.items()}})
+
+    def _write(self, entry: Dict[str, Any]):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def finish(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _parse_journal_line(line: str) -> Optional[Dict[str, Any]]:
+    try:
+        entry = json.loads(line)
+        return entry if isinstance(entry, dict) else None
+    except json.JSONDecodeError:
+        return None
+
+
+def keyword_extraction_node(state: TMState, config: RunnableConfig) -> dict:
+    """
+    LLM을 사용하여 트렌드 키워드를 추출하고, 결과를 벡터 DB에 동기화합니다.
+    끝난 배치부터 바로 CSV에 이어 쓰고 벡터 DB에 업서트하므로, 앞선 결과는 나머지 배치가
+    진행 중일 때도 조회할 수 있고 중간에 실패해도 남습니다.
+    """
+    logger.info("--- (KE) v2 --- Keyword Extraction Code ACTIVE ---") # New test log
+    logger.info("--- (KE) Entered Keyword Extraction Subgraph ---")
+    
+    # 벡터 서비스 및 설정 로드
+    vector_service: VectorService = config["configurable"].get("vector_service")
+    
+    try:
+        # 1. 데이터 로드 (input_df_ref 아티팩트로부터)
+        input_df_ref = state.get("input_df_ref")
+        base_export_path = state.get("base_export_path")
+        slots = state.get("slots", {})
+        domain = slots.get("domain", "any")
+        category = slots.get("search_query", domain)
+
+        if not input_df_ref or not base_export_path:
+            return {"error": "필수 데이터(아티팩트 핸들 또는 export 경로)가 누락되었습니다."}
+
+        artifact_store = get_artifact_store()
+        df = artifact_store.get_df(input_df_ref)
+        logger.info(f"KE Node: 총 {len(df)}개의 데이터를 처리합니다. (도메인: {domain})")
+
+        # 2. 키워드 추출 설정
+        client = get_solar_pro_chat_client()
         
-        from collections import Counter
-        keyword_counts = Counter(all_extracted_keywords)
-        df_frequencies = pd.DataFrame(keyword_counts.items(), columns=['keyword', 'frequency'])
+        videos_info = df[['title', 'description']].fillna('').astype(str).to_dict('records')
+        output_path = f"{base_export_path}_with_keywords.csv"
+        sink = KeywordResultSink(df, output_path, vector_service, category)
+
+        # 같은 입력으로 중단된 실행이 있으면 저널에 남은 완료 결과부터 이어서 진행
+        journal = ExtractionJournal(f"{base_export_path}.journal.jsonl", ExtractionJournal.make_fingerprint(input_df_ref, domain))
+        journaled = journal.load()
+        if journaled:
+            logger.info(f"KE Node: 저널에서 완료된 {len(journaled)}건을 복원하여 이어서 진행합니다.")
+
+        completed = False
+        try:
+            # 저널/캐시에 있는 영상은 LLM에 보내지 않고 바로 내보냄 (재개 시 CSV를 다시 쓰고 DB에 다시 업서트)
+            keyword_cache = get_keyword_cache()
+            cache_keys = [
+                KeywordResultCache.make_key(MODEL_NAME, PROMPT_VERSION, domain, info['title'], info['description'])
+                for info in videos_info
+            ]
+            cached = keyword_cache.get_many([cache_keys[idx] for idx in range(len(videos_info)) if idx not in journaled]) if keyword_cache else {}
+            known = {idx: journaled.get(idx) or cached.get(cache_keys[idx]) for idx in range(len(videos_info))}
+            known_indices = [idx for idx, data in known.items() if data is not None]
+            pending = [idx for idx, data in known.items() if data is None]
+            if keyword_cache:
+                logger.info(f"KE Node: 캐시 적중 {len(known_indices) - len(journaled)}건, LLM 요청 {len(pending)}건 ({keyword_cache.stats()})")
+            for i in range(0, len(known_indices), KEYWORD_BATCH_MAX_ITEMS):
+                chunk = known_indices[i : i + KEYWORD_BATCH_MAX_ITEMS]
+                sink.write(
+                    chunk,
+                    [", ".join(known[idx]['keywords']) for idx in chunk],
+                    [known[idx]['sentiment'] for idx in chunk],
+                )
+
+            # LLM에 보낼 항목: 설명을 토큰 한도로 자르고 영상별 토큰 수를 미리 계산 (배치 구성용)
+            llm_items, token_costs = [None] * len(videos_info), [0] * len(videos_info)
+            for idx in pending:
+                llm_items[idx], token_costs[idx] = prepare_video_item(videos_info[idx]['title'], videos_info[idx]['description'])
+
+            # 3. 배치 동시 실행. 끝난 배치는 바로 저널/CSV/벡터 DB로 내보내고,
+            #    모델이 빠뜨린 영상은 더 작은 후속 배치로 다시 요청
+            for round_no in range(1 + KEYWORD_EXTRACTION_FOLLOWUP_ROUNDS):
+                if not pending:
+                    break
+                max_items = None if round_no == 0 else max(1, KEYWORD_BATCH_MAX_ITEMS >> round_no)
+
+                skipped = []
+                for batch_indices, results in iter_keyword_batches(client, llm_items, token_costs, pending, domain, max_items=max_items):
+                    done = [(idx, data) for idx, data in zip(batch_indices, results) if data is not None]
+                    skipped.extend(idx for idx, data in zip(batch_indices, results) if data is None)
+                    journal.append(dict(done))
+                    sink.write(
+                        [idx for idx, _ in done],
+                        [", ".join(data['keywords']) for _, data in done],
+                        [data['sentiment'] for _, data in done],
+                    )
+                    # 배치가 끝날 때마다 캐시에 기록 (이후 배치가 실패해도 완료된 결과는 재사용)
+                    if keyword_cache:
+                        keyword_cache.put_many({cache_keys[idx]: data for idx, data in done})
+                if skipped:
+                    logger.info(f"KE Node: 모델이 {len(skipped)}건을 누락하여 후속 배치로 재요청합니다. (round {round_no + 1})")
+                pending = sorted(skipped)
+
+            if pending:
+                logger.warning(f"KE Node: 후속 배치 후에도 {len(pending)}건의 키워드를 얻지 못했습니다. (빈 키워드로 저장)")
+                sink.write(pending, [""] * len(pending), ["neutral"] * len(pending))
+            completed = True
+        finally:
+            sink.close()
+            # 끝까지 처리했으면 저널 삭제, 실패했으면 다음 실행에서 이어가도록 남겨 둠
+            if completed:
+                journal.finish()
+            else:
+                journal.close()
+
+        logger.info(f"KE Node: {sink.rows_written}건을 {output_path} 및 벡터 DB에 기록했습니다.")
+
+        # 4. 누적 집계한 빈도수 반환
+        df_frequencies = pd.DataFrame(sink.keyword_counts.items(), columns=['keyword', 'frequency'])
         df_frequencies = df_frequencies.sort_values(by='frequency', ascending=False)
 
         # 감성 빈도수 계산
-        sentiment_counts = Counter(df_processed['sentiment'].dropna())
-        df_sentiment_frequencies = pd.DataFrame(sentiment_counts.items(), columns=['sentiment', 'frequency'])
+        df_sentiment_frequencies = pd.DataFrame(sink.sentiment_counts.items(), columns=['sentiment', 'frequency'])
         df_sentiment_frequencies = df_sentiment_frequencies.sort_values(by='frequency', ascending=False)
 
         return {
-            "frequencies_df_json": df_frequencies.to_json(orient='split', index=False),
-            "sentiment_frequencies_df_json": df_sentiment_frequencies.to_json(orient='split', index=False), # 감성 빈도수 추가
+            "frequencies_df_ref": artifact_store.put_df(df_frequencies.reset_index(drop=True), kind="frequencies"),
+            "sentiment_frequencies_df_ref": artifact_store.put_df(df_sentiment_frequencies.reset_index(drop=True), kind="sentiment"), # 감성 빈도수 추가
             "output_path": output_path,
             "error": None
         }
@@ -4,15 +4,29 @@ from langchain_core.runnables import RunnableConfig
 from app.agents.state import TMState
 from app.core.logger import logger
 from app.service.vector_service import VectorService
+from app.service.naver_validate_service import label_naver_post
+from app.service.keyword_matcher import KeywordMatcher
+from collections import Counter
+from datetime import datetime
+import csv
 import os
 
+NAVER_CSV_COLUMNS = [
+    "days_ago", "postdate", "title", "description", "bloggername", "link",
+    "query", "source", "matched_keywords", "match_count",
+]
+
+
 def naver_blog_process_node(state: TMState, config: RunnableConfig) -> dict:
     """
     네이버 블로그 데이터를 수집하고, 그 결과 CSV 파일 경로를 반환합니다.
     1. DB에서 현재 카테고리의 상위 키워드를 가져옵니다.
-    2. 상위 키워드로 네이버 블로그 크롤링 도구를 호출하여 CSV를 생성합니다.
+    2. 상위 키워드들을 쿼리로 네이버 블로그를 동시에 스트리밍 수집하면서,
+       수집되는 글마다 바로 YouTube 키워드를 매칭하여 CSV에 한 줄씩 기록합니다.
     3. 생성된 CSV 경로를 상태에 저장하여 다음 노드로 전달합니다.
     """
+    from app.repository.client.naver_blog_client import iter_naver_blog_candidates, get_naver_metrics
+
     logger.info("--- (NB) Entered Naver Blog Processing Subgraph ---")
     
     # 1. 이전 단계에서 생성된 상위 키워드 가져오기
@@ -23,38 +37,52 @@ def naver_blog_process_node(state: TMState, config: RunnableConfig) -> dict:
 
     slots = state.get("slots", {})
     category = slots.get('search_query', state.get("user_input"))
+    days = int(slots.get("period_days", 7) or 7)
     
     logger.info(f"Step NB.1: Fetching top YouTube keywords for category '{category}' to use as Naver queries...")
     try:
-        top_keywords_data = vector_service.get_keyword_frequencies(category=category, sns="youtube", n_results=5)
-        top_keywords = [item['keyword'] for item in top_keywords_data]
+        top_keywords_data = vector_service.get_keyword_frequencies(category=category, sns="youtube", n_results=30)
+        match_keywords = [item['keyword'] for item in top_keywords_data]
+        top_keywords = match_keywords[:5]
         if not top_keywords:
             logger.warning("No top keywords found from YouTube data. Using original category as query.")
             top_keywords = [category]
         logger.info(f"Top keywords to be used as queries: {top_keywords}")
     except Exception as e:
         logger.error(f"Failed to get top keywords from DB: {e}", exc_info=True)
+        match_keywords = []
         top_keywords = [category]
 
-    # 2. 네이버 블로그 데이터 크롤링
-    logger.info("Step NB.2: Calling naver_blog_crawling_tool...")
-    crawl_result_str = naver_blog_crawling_tool.invoke({"queries": top_keywords, "main_query": category})
-    logger.info(f"Naver crawling tool returned: {crawl_result_str}")
+    # 2. 네이버 블로그 스트리밍 수집 + 글 단위 키워드 매칭
+    logger.info("Step NB.2: Streaming Naver blog posts and matching keywords...")
+    safe_query = "".join(c for c in category if c.isalnum())
+    current_date = datetime.now().strftime("%Y%m%d")
+    os.makedirs("downloads", exist_ok=True)
+    csv_path = os.path.join("downloads", f"naver_blog_{safe_query}_{current_date}_{days}d.csv")
 
-    # Tool 결과에서 CSV 경로 추출
+    matcher = KeywordMatcher(match_keywords)
+    post_count = 0
+    keyword_hits = Counter()
     try:
-        csv_path = crawl_result_str.rsplit(": ", 1)[1].strip()
-    except IndexError:
-        error_message = "Failed to find a valid CSV path from naver_blog_crawling_tool output."
-        logger.error(error_message)
+        with open(csv_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=NAVER_CSV_COLUMNS)
+            writer.writeheader()
+            for post in iter_naver_blog_candidates(top_keywords, days=days, per_query=200, sort="date"):
+                row = label_naver_post(post, matcher)
+                writer.writerow(row)
+                post_count += 1
+                if row["matched_keywords"]:
+                    keyword_hits.update(row["matched_keywords"].split("|"))
+    except Exception as e:
+        logger.error(f"Naver blog crawling failed: {e}", exc_info=True)
         return {}
 
-    if not ".csv" in csv_path or not os.path.exists(csv_path):
-        error_message = f"Invalid or non-existent CSV path from Naver crawl: '{csv_path}'"
-        logger.error(error_message)
+    if post_count == 0:
+        logger.warning(f"Naver crawl returned no posts for queries {top_keywords}.")
         return {}
 
-    logger.info(f"Extracted Naver Blog CSV path: {csv_path}")
+    logger.info(f"Saved {post_count} Naver blog posts to {csv_path}. Top matched keywords: {keyword_hits.most_common(10)}")
+    logger.info(f"Naver API metrics: {get_naver_metrics()}")
     logger.info("--- Naver Blog Processing Subgraph Finished ---")
 
     # 다음 strategy_gen 노드가 사용할 수 있도록, 크롤링된 원본 CSV 경로를 상태에 추가
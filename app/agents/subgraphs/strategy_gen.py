@@ -6,9 +6,9 @@ from app.agents.state import TMState
 from app.core.llm import get_solar_chat
 from app.core.logger import logger
 from app.service.vector_service import VectorService
+from app.repository.cache.report_cache import ReportResultCache, get_report_cache
 import datetime
 import os
-import pandas as pd
 
 # [System Prompt] English Version - Senior Consultant Persona (Emoji-free)
 GEN_SYSTEM_PROMPT = """You are a Senior Market Strategy Consultant. 
@@ -31,40 +31,6 @@ Format: Structured Markdown
 Note: Do not use emojis or decorative icons in the output.
 """
 
-def build_daily_sentiment_series(docs, start_date, end_date):
-    if not docs:
-        return []
-
-    records = []
-    for doc in docs:
-        ts = doc.get("published_at")
-        sentiment = doc.get("sentiment")
-        if ts and sentiment:
-            try:
-                dt = datetime.datetime.fromtimestamp(float(ts))
-                records.append({"date": pd.Timestamp(dt).normalize(), "sentiment": sentiment})
-            except (ValueError, TypeError):
-                continue
-
-    if not records:
-        return []
-
-    df = pd.DataFrame(records)
-    df_pivot = df.groupby(["date", "sentiment"]).size().unstack(fill_value=0)
-
-    for s in ["positive", "neutral", "negative"]:
-        if s not in df_pivot.columns:
-            df_pivot[s] = 0
-
-    full_date_range = pd.date_range(start=start_date, end=end_date, freq="D").normalize()
-    df_pivot = df_pivot.reindex(full_date_range, fill_value=0)
-    df_pivot = df_pivot[["positive", "neutral", "negative"]]
-
-    daily_sentiments = df_pivot.reset_index().rename(columns={"index": "date"})
-    daily_sentiments["date"] = daily_sentiments["date"].dt.strftime("%Y-%m-%d")
-    return daily_sentiments.to_dict("records")
-
-
 def strategy_gen_node(state: TMState, config: RunnableConfig):
     logger.info("--- [4] Strategy Generation Node: Hybrid Search & Analysis ---")
 
@@ -80,26 +46,20 @@ def strategy_gen_node(state: TMState, config: RunnableConfig):
     start_date_str = start_date_dt.strftime("%Y-%m-%d")
     end_date_str = end_date_dt.strftime("%Y-%m-%d")
 
-    # 2. Refined Keyword Filtering
-    raw_keywords_data = vector_service.get_keyword_frequencies(category=category, sns=sns, n_results=20)
-    keyword_freq_data = vector_service.get_keyword_frequencies(
-        category=category,
-        sns=sns,
-        n_results=10,
-        start_date=start_date_str,
-        end_date=end_date_str,
-    )
-    all_docs = vector_service.get_documents_for_period(
+    # 리포트 캐시용 데이터 버전은 DB를 읽기 전에 조회 (생성 중 데이터가 바뀌면 저장된 리포트는 무효)
+    report_cache = get_report_cache()
+    data_version = report_cache.data_version(category) if report_cache else None
+
+    # 2. Refined Keyword Filtering (기간 스냅샷 1회 조회로 빈도/감성 추이 재사용)
+    snapshot = vector_service.get_period_snapshot(
         category=category,
         sns=sns,
         start_date=start_date_str,
         end_date=end_date_str,
     )
-    daily_sentiments_for_frontend = build_daily_sentiment_series(
-        all_docs,
-        start_date_dt,
-        end_date_dt,
-    )
+    raw_keywords_data = snapshot["keyword_frequencies_all"][:20]
+    keyword_freq_data = snapshot["keyword_frequencies"][:10]
+    daily_sentiments_for_frontend = snapshot["daily_sentiments"]
 
     clean_category = category.replace(" ", "").lower()
     stopwords = ["추천", "영상", "인기", "최근", "정보", "관련", "유튜브", "내용", "조회수", "순위", "가지", "방법", "꿀팁", "이유"]
@@ -185,12 +145,19 @@ def strategy_gen_node(state: TMState, config: RunnableConfig):
 
     logger.info(f"Strategy Generation Workflow Complete. PDF saved at: {pdf_path}")
 
-    return {
+    result = {
         "final_answer": report_content,
         "pdf_path": str(pdf_path),
         "keyword_frequencies": keyword_freq_data,
         "daily_sentiments": daily_sentiments_for_frontend,
     }
+    # PDF까지 정상 생성된 리포트만 캐시 (slots의 search_query가 있어야 cache_check에서 조회 가능)
+    if report_cache and slots.get("search_query") and os.path.exists(result["pdf_path"]):
+        try:
+            report_cache.put(ReportResultCache.make_key(slots, end_date_str), slots["search_query"], data_version, result)
+        except Exception as e:
+            logger.warning(f"Failed to store report in cache: {e}")
+    return result
 
 
 # Graph Construction
@@ -61,37 +61,14 @@ def plot_daily_sentiment_bar_chart(df_pivot, title, filename):
 
     return save_plot(fig, filename, 'daily_sentiment_bar')
 
-def get_daily_sentiment_pivot_table(docs: list, start_date: datetime.datetime, end_date: datetime.datetime):
-    """원시 문서를 피벗 테이블 DataFrame으로 처리합니다."""
-    if not docs:
-        return pd.DataFrame()
-
-    sentiment_records = []
-    for doc in docs:
-        ts = doc.get("published_at")
-        sentiment = doc.get("sentiment")
-        if ts and sentiment:
-            try:
-                dt = datetime.datetime.fromtimestamp(float(ts))
-                sentiment_records.append({'date': pd.Timestamp(dt).normalize(), 'sentiment': sentiment})
-            except (ValueError, TypeError):
-                continue
-    
-    if not sentiment_records:
-        return pd.DataFrame()
-
-    df = pd.DataFrame(sentiment_records)
-    df_pivot = df.groupby(['date', 'sentiment']).size().unstack(fill_value=0)
+def get_daily_sentiment_pivot_table(daily_sentiments: list) -> pd.DataFrame:
+    """스냅샷의 일별 감성 레코드를 날짜 인덱스 피벗 테이블 DataFrame으로 변환합니다."""
+    if not daily_sentiments:
+        return pd.DataFrame(columns=['positive', 'neutral', 'negative'], index=pd.DatetimeIndex([]))
 
-    for s in ['positive', 'neutral', 'negative']:
-        if s not in df_pivot.columns:
-            df_pivot[s] = 0
-    
-    full_date_range = pd.date_range(start=start_date, end=end_date, freq='D').normalize()
-    df_pivot = df_pivot.reindex(full_date_range, fill_value=0)
-    df_pivot = df_pivot[['positive', 'neutral', 'negative']]
-    
-    return df_pivot
+    df_pivot = pd.DataFrame(daily_sentiments)
+    df_pivot.index = pd.to_datetime(df_pivot.pop('date'))
+    return df_pivot[['positive', 'neutral', 'negative']]
 
 # 메인 노드
 def visualization_gen_node(state: TMState, config: RunnableConfig):
@@ -114,21 +91,16 @@ def visualization_gen_node(state: TMState, config: RunnableConfig):
     end_date_str = end_date_dt.strftime("%Y-%m-%d")
     base_filename = f"{ ''.join(c for c in category if c.isalnum()) }_{period_days}d"
     
-    # --- 데이터 조회 및 처리 ---
-    keyword_freq_data = vector_service.get_keyword_frequencies(
-        category=category, sns=sns_channel, n_results=10,
-        start_date=start_date_str, end_date=end_date_str
-    )
-    all_docs = vector_service.get_documents_for_period(
+    # --- 데이터 조회 및 처리 (strategy_gen과 같은 요청 내 스냅샷 재사용) ---
+    snapshot = vector_service.get_period_snapshot(
         category=category, sns=sns_channel,
         start_date=start_date_str, end_date=end_date_str
     )
-    sentiment_pivot_df = get_daily_sentiment_pivot_table(all_docs, start_date_dt, end_date_dt)
+    keyword_freq_data = snapshot["keyword_frequencies"][:10]
+    sentiment_pivot_df = get_daily_sentiment_pivot_table(snapshot["daily_sentiments"])
 
     # --- 1. Streamlit용 데이터 준비 ---
-    daily_sentiments_data = sentiment_pivot_df.reset_index().rename(columns={'index': 'date'})
-    daily_sentiments_data['date'] = daily_sentiments_data['date'].dt.strftime('%Y-%m-%d')
-    daily_sentiments_for_frontend = daily_sentiments_data.to_dict('records')
+    daily_sentiments_for_frontend = snapshot["daily_sentiments"]
     logger.info(f"Prepared {len(keyword_freq_data)} keyword frequencies for Streamlit.")
     logger.info(f"Processed {len(daily_sentiments_for_frontend)} days of sentiment data for Streamlit.")
 
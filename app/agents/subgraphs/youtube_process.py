@@ -4,9 +4,50 @@ from langchain_core.runnables import RunnableConfig
 from app.agents.state import TMState
 from app.agents.tools import youtube_crawling_tool, run_keyword_extraction
 from app.core.logger import logger
+from app.repository.cache.artifact_store import ArtifactStore, get_artifact_store
 import re
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import pandas as pd
+
+
+def _to_rfc3339(day: str, next_day: bool = False) -> str:
+    """'YYYY-MM-DD'(로컬 기준 자정)을 YouTube API용 RFC3339(UTC) 문자열로 변환"""
+    dt = datetime.strptime(day, "%Y-%m-%d")
+    if next_day:
+        dt += timedelta(days=1)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _crawl_range(query: str, crawl_range: dict, pages: int) -> Optional[pd.DataFrame]:
+    """
+    하나의 날짜 구간만 크롤링하여 DataFrame으로 반환.
+    구간이 오늘까지 이어지면 watermark 기반 증분 모드로 새 영상만 검색하고 기존 영상과 병합합니다.
+    수집이나 아티팩트 로드에 실패하면 None (영상이 없는 구간은 빈 DataFrame)
+    """
+    start_dt = datetime.strptime(crawl_range["start"], "%Y-%m-%d")
+    end_dt = datetime.strptime(crawl_range["end"], "%Y-%m-%d")
+    incremental = end_dt.date() >= datetime.now().date()
+    result_ref = youtube_crawling_tool.invoke({
+        "query": query,
+        "days": (end_dt - start_dt).days + 1,
+        "pages": pages,
+        "published_after_date": _to_rfc3339(crawl_range["start"]),
+        "published_before_date": None if incremental else _to_rfc3339(crawl_range["end"], next_day=True),
+        "incremental": incremental,
+    })
+    if not ArtifactStore.is_ref(result_ref):
+        logger.warning(f"Crawling failed for range {crawl_range}: {result_ref}")
+        return None
+    try:
+        return get_artifact_store().get_df(result_ref)
+    except (ValueError, OSError) as e:
+        logger.warning(f"Failed to load crawl artifact for range {crawl_range}: {e}. Treating range as failed.")
+        return None
+
 
 def youtube_process_node(state: TMState, config: RunnableConfig) -> dict:
     """
@@ -14,8 +55,6 @@ def youtube_process_node(state: TMState, config: RunnableConfig) -> dict:
     1. 유튜브 크롤링 도구 호출 (DataFrame 반환)
     2. 키워드 추출 워크플로우 호출
     """
-    from datetime import datetime
-
     logger.info("--- (YT) Entered YouTube Processing Subgraph ---")
     # 1. 유튜브 데이터 크롤링 (DataFrame 반환)
     logger.info("Step YT.1: Calling youtube_crawling_tool...")
@@ -29,24 +68,48 @@ def youtube_process_node(state: TMState, config: RunnableConfig) -> dict:
     
     logger.info(f"Domain: '{domain}', Crawling Query: '{crawling_query}', Days: {days_to_crawl}, Pages: {pages_to_crawl}")
 
-    result_json = youtube_crawling_tool.invoke({
-        "query": crawling_query,
-        "days": days_to_crawl,
-        "pages": pages_to_crawl
-    })
+    # cache_check에서 계산한 빈 구간만 크롤링 (없으면 전체 기간)
+    crawl_ranges = state.get("crawl_ranges")
+    if not crawl_ranges:
+        end_dt = datetime.now()
+        crawl_ranges = [{
+            "start": (end_dt - timedelta(days=days_to_crawl)).strftime("%Y-%m-%d"),
+            "end": end_dt.strftime("%Y-%m-%d"),
+        }]
 
-    # JSON 문자열로부터 DataFrame 복원
-    try:
-        from io import StringIO
-        import pandas as pd
-        result_df = pd.read_json(StringIO(result_json), orient='split')
-    except (ValueError, KeyError):
-        logger.warning("Failed to parse DataFrame from JSON. Assuming empty.")
-        result_df = pd.DataFrame()
+    # 남은 YouTube API 할당량으로 감당 가능한 만큼만 페이지 수를 줄이고, 불가능하면 크롤링을 거절
+    from app.repository.client.youtube_client import plan_search_pages, remaining_budget
+    allowed_pages = plan_search_pages(len(crawl_ranges), pages_to_crawl)
+    if allowed_pages <= 0:
+        budget = remaining_budget()
+        logger.error(f"YouTube API quota budget exhausted: {budget}")
+        return {"error": f"YouTube API 일일 할당량이 부족하여 수집할 수 없습니다. (남은 예산: {budget['remaining_units']})"}
+    if allowed_pages < pages_to_crawl:
+        logger.warning(f"YouTube API quota budget low. Shrinking pages {pages_to_crawl} -> {allowed_pages}.")
+        pages_to_crawl = allowed_pages
+
+    logger.info(f"Crawling {len(crawl_ranges)} range(s) in parallel: {crawl_ranges}")
 
+    with ThreadPoolExecutor(max_workers=min(len(crawl_ranges), 4)) as executor:
+        frames = list(executor.map(lambda r: _crawl_range(crawling_query, r, pages_to_crawl), crawl_ranges))
 
+    # 수집을 마친 구간은 영상이 없어도 커버리지로 기록 (실패한 구간만 다음 요청에서 다시 수집)
+    covered_ranges = [r for r, f in zip(crawl_ranges, frames) if f is not None]
+    non_empty = [f for f in frames if f is not None and not f.empty]
+    if non_empty:
+        result_df = pd.concat(non_empty, ignore_index=True).drop_duplicates(subset="video_id")
+        if "score" in result_df.columns:
+            result_df = result_df.sort_values("score", ascending=False).reset_index(drop=True)
+    else:
+        result_df = pd.DataFrame()
+
+    vector_service = config["configurable"].get("vector_service")
     if result_df.empty:
         logger.warning("Crawling returned no data or an invalid type. Skipping keyword extraction.")
+        # 적재할 영상이 없으므로 정상 종료한 구간은 바로 기록 (같은 빈 구간에 검색 할당량을 반복 소모하지 않도록)
+        if vector_service:
+            for r in covered_ranges:
+                vector_service.record_crawl_coverage(crawling_query, "youtube", r["start"], r["end"])
         return {"output_path": None}
 
     # --- 로깅 추가 ---
@@ -54,15 +117,15 @@ def youtube_process_node(state: TMState, config: RunnableConfig) -> dict:
     logger.debug(f"--- DataFrame Head (youtube_process_node) ---\n{result_df.head(3).to_string()}")
     # --- 로깅 추가 끝 ---
 
-    # 2. 키워드 추출 워크플로우 실행 (DataFrame의 JSON을 직접 전달)
-    logger.info("Step YT.2: Calling run_keyword_extraction tool with DataFrame JSON...")
+    # 2. 키워드 추출 워크플로우 실행 (병합한 DataFrame은 아티팩트로 저장하고 핸들만 전달)
+    logger.info("Step YT.2: Calling run_keyword_extraction tool with DataFrame artifact...")
     
     safe_query = "".join(c for c in crawling_query if c.isalnum())
     current_date = datetime.now().strftime("%Y%m%d")
     base_export_path = os.path.join("downloads", f"youtube_{safe_query}_{current_date}_{days_to_crawl}d")
 
     keyword_result_str = run_keyword_extraction.invoke({
-        "input_df_json": result_json, # 크롤링 결과 JSON을 직접 전달
+        "input_df_ref": get_artifact_store().put_df(result_df, kind="youtube"),
         "base_export_path": base_export_path,
         "slots": state.get("slots", {}),
     })
@@ -72,10 +135,15 @@ def youtube_process_node(state: TMState, config: RunnableConfig) -> dict:
         if keyword_result.get("status") == "error":
              return {"error": keyword_result.get("message")}
         
-        frequencies_df_json = keyword_result.get("frequencies_df_json")
+        frequencies_df_ref = keyword_result.get("frequencies_df_ref")
+
+        if vector_service:
+            for r in covered_ranges:
+                vector_service.record_crawl_coverage(crawling_query, "youtube", r["start"], r["end"])
+
         logger.info("--- YouTube Processing Subgraph Finished ---")
         
-        return {"frequencies_df_json": frequencies_df_json}
+        return {"frequencies_df_ref": frequencies_df_ref}
 
     except json.JSONDecodeError:
         error_message = "Could not parse JSON from keyword extraction tool."
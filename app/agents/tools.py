@@ -644,45 +644,64 @@ def generate_report_pdf_v2_tool(content: str, filename: str = "trendmirror_repor
 # 4) YouTube Tool
 # =========================
 @tool
-def youtube_crawling_tool(query: str, days: int = 7, pages: int = 1) -> str:
+def youtube_crawling_tool(query: str, days: int = 7, pages: int = 1, published_after_date: str = None, published_before_date: str = None, incremental: bool = False) -> str:
     """
-    YouTube 트렌드 데이터를 수집하여 DataFrame을 JSON 문자열로 반환합니다.
+    YouTube 트렌드 데이터를 수집하여 DataFrame을 아티팩트 저장소에 저장하고 핸들(artifact://...)을 반환합니다.
+    published_after_date/published_before_date(RFC3339)를 주면 해당 구간만 수집합니다.
+    incremental=True 이면 (기간의 끝이 현재일 때) watermark 이후의 새 영상만 검색하고 기존 영상과 병합합니다.
+    수집 중 오류가 나면 핸들 대신 오류 JSON을 반환하여 '영상 없음'(빈 DataFrame 핸들)과 구분합니다.
     실제 app.repository.client.youtube_client를 사용합니다.
     """
-    from app.repository.client.youtube_client import collect_youtube_trend_candidates_df
+    from app.repository.client.youtube_client import collect_youtube_trend_candidates_df, collect_youtube_trend_candidates_incremental_df
+    from app.repository.cache.artifact_store import get_artifact_store
     import pandas as pd
 
-    logger.info(f"youtube_crawling_tool called with query='{query}', days='{days}', pages='{pages}'")
+    logger.info(f"youtube_crawling_tool called with query='{query}', days='{days}', pages='{pages}', range='{published_after_date} ~ {published_before_date}', incremental={incremental}")
 
     try:
-        df = collect_youtube_trend_candidates_df(query=query, days=days, pages=pages)
+        if incremental:
+            df = collect_youtube_trend_candidates_incremental_df(
+                query=query,
+                days=days,
+                pages=pages,
+                published_after_date=published_after_date,
+            )
+        else:
+            df = collect_youtube_trend_candidates_df(
+                query=query,
+                days=days,
+                pages=pages,
+                published_after_date=published_after_date,
+                published_before_date=published_before_date,
+            )
         if df.empty:
             logger.warning("YouTube crawling returned an empty DataFrame.")
-        # DataFrame을 JSON 문자열로 변환하여 반환
-        return df.to_json(orient='split', force_ascii=False)
+        # DataFrame은 아티팩트로 저장하고 핸들만 반환 (JSON 직렬화 없이 다음 노드로 전달)
+        return get_artifact_store().put_df(df, kind="youtube")
     except Exception as e:
         logger.error(f"Error during youtube crawling: {e}")
-        # 오류 발생 시 빈 DataFrame의 JSON을 반환
-        return pd.DataFrame().to_json(orient='split')
+        # 오류 발생 시 빈 결과와 구분되도록 오류 JSON을 반환 (호출 측은 핸들 여부로 판별)
+        return json.dumps({"status": "error", "message": f"YouTube 수집 중 오류: {e}"}, ensure_ascii=False)
 
 
 # =========================
 # 5) Keyword Extraction Tool (LAZY IMPORT to avoid circular import)
 # =========================
 @tool
-def run_keyword_extraction(input_df_json: str, base_export_path: str, slots: Dict[str, Any]) -> str:
+def run_keyword_extraction(input_df_ref: str, base_export_path: str, slots: Dict[str, Any]) -> str:
     """
-    주어진 DataFrame JSON 문자열에 대해 키워드 추출 워크플로우를 실행합니다.
-    입력: DataFrame JSON 문자열, base_export_path, slots
-    출력: 처리 결과 메시지(JSON)
+    아티팩트 핸들로 주어진 DataFrame에 대해 키워드 추출 워크플로우를 실행합니다.
+    입력: DataFrame 아티팩트 핸들(artifact://...), base_export_path, slots
+    출력: 처리 결과 메시지(JSON, 빈도수 DataFrame은 아티팩트 핸들로 전달)
     """
     from app.agents.subgraphs.keyword_extract import keyword_extraction_graph
+    from app.repository.cache.artifact_store import ArtifactStore
 
-    if not isinstance(input_df_json, str):
-        return json.dumps({"status": "error", "message": "입력 데이터가 유효한 JSON 문자열이 아닙니다."})
+    if not ArtifactStore.is_ref(input_df_ref):
+        return json.dumps({"status": "error", "message": "입력 데이터가 유효한 아티팩트 핸들이 아닙니다."}, ensure_ascii=False)
 
     initial_state = {
-        "input_df_json": input_df_json,
+        "input_df_ref": input_df_ref,
         "base_export_path": base_export_path,
         "slots": slots
     }
@@ -695,7 +714,7 @@ def run_keyword_extraction(input_df_json: str, base_export_path: str, slots: Dic
         {
             "status": "success",
             "output_path": final_state.get("output_path"),
-            "frequencies_df_json": final_state.get("frequencies_df_json"),
+            "frequencies_df_ref": final_state.get("frequencies_df_ref"),
         },
         ensure_ascii=False,
     )
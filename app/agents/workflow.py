@@ -1,15 +1,16 @@
 # app/agents/workflow.py
-import pandas as pd
-from io import StringIO
 from datetime import datetime, timedelta
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.runnables import RunnableConfig
 from app.agents.state import TMState
+from app.agents.checkpointer import get_checkpointer
 from app.agents.subgraphs.strategy_build import strategy_build_graph
 from app.agents.subgraphs.strategy_gen import strategy_gen_node # 이름 변경
 from app.agents.subgraphs.youtube_process import youtube_process_graph
 from app.core.logger import logger
+from app.repository.cache.artifact_store import get_artifact_store
+from app.repository.cache.report_cache import ReportResultCache, get_report_cache
 from app.service.sync_service import SyncService
 from app.service.vector_service import VectorService
 
@@ -26,44 +27,42 @@ def cache_check_node(state: TMState, config: RunnableConfig):
 
     if not vector_service or not search_query:
         logger.warning("VectorService or search_query not found. Skipping cache check.")
-        return {"cache_hit": False}
+        return {"cache_hit": False, "crawl_ranges": None, "report_cache_hit": False}
 
     end_date = datetime.now()
     start_date = end_date - timedelta(days=period_days)
     start_date_str = start_date.strftime("%Y-%m-%d")
     end_date_str = end_date.strftime("%Y-%m-%d")
 
-    cache_check_result = vector_service.check_data_existence(
+    # 같은 slots로 오늘 만든 리포트가 있고 그 이후 카테고리 데이터가 바뀌지 않았으면 수집/분석 모두 건너뜀
+    # (리포트는 데이터 버전과 TTL로 무효화되므로 커버리지 빈 구간 여부와 무관하게 먼저 조회)
+    report_cache = get_report_cache()
+    cached_report = report_cache.get(ReportResultCache.make_key(slots, end_date_str), search_query) if report_cache else None
+    if cached_report:
+        logger.info(f"Report Cache Hit for '{search_query}' ({period_days}d). Returning stored report.")
+        return {"cache_hit": True, "crawl_ranges": [], "report_cache_hit": True, **cached_report}
+
+    # 커버리지 원장 기준으로 아직 수집하지 않은 구간만 계산 (컬렉션 스캔 없음)
+    gaps = vector_service.get_coverage_gaps(
         category=search_query,
+        sns="youtube",
         start_date=start_date_str,
-        end_date=end_date_str
+        end_date=end_date_str,
     )
-    
-    cache_status = cache_check_result.get("status")
-    logger.info(f"DB Cache Check Status for '{search_query}': {cache_status}")
 
-    if cache_status == "FULL":
+    if not gaps:
+        logger.info(f"DB Cache Check Status for '{search_query}': FULL")
         logger.info("Cache Hit (FULL): Data exists in DB. Skipping crawling and analysis.")
-        return {"cache_hit": True}
-    
-    elif cache_status == "PARTIAL":
-        logger.info("Cache Hit (PARTIAL): Partially exists. Adjusting crawl period.")
-        new_start_str = cache_check_result.get("new_start")
-        new_end_str = cache_check_result.get("new_end")
-        
-        new_start_dt = datetime.strptime(new_start_str, "%Y-%m-%d")
-        new_end_dt = datetime.strptime(new_end_str, "%Y-%m-%d")
-        new_period_days = (new_end_dt - new_start_dt).days + 1
-
-        if new_period_days <= 0:
-            logger.info("No new data to crawl. Treating as cache hit.")
-            return {"slots": slots, "cache_hit": True}
+        return {"cache_hit": True, "crawl_ranges": [], "report_cache_hit": False}
 
-        slots["period_days"] = new_period_days
-        logger.info(f"Updated period_days for partial crawling: {new_period_days} days")
-        return {"slots": slots, "cache_hit": False}
+    crawl_ranges = [{"start": s, "end": e} for s, e in gaps]
+    if gaps == [(start_date_str, end_date_str)]:
+        logger.info(f"DB Cache Check Status for '{search_query}': NONE")
+    else:
+        logger.info(f"DB Cache Check Status for '{search_query}': PARTIAL")
+        logger.info(f"Cache Hit (PARTIAL): Crawling only missing ranges: {crawl_ranges}")
 
-    return {"cache_hit": False}
+    return {"cache_hit": False, "crawl_ranges": crawl_ranges, "report_cache_hit": False}
 
 
 def router_node(state: TMState):
@@ -73,6 +72,10 @@ def router_node(state: TMState):
         logger.info("[Router] Intent is chitchat. Routing to END.")
         return END
 
+    if state.get("report_cache_hit"):
+        logger.info("[Router] Report Cache Hit! Routing to END.")
+        return END
+
     if state.get("cache_hit"):
         logger.info("[Router] Cache Hit! Skipping to Analysis.")
         # 캐시가 있으면 데이터 수집 및 분석을 건너뛰고 바로 분석으로 이동
@@ -86,15 +89,15 @@ def sync_db_node(state: TMState, config: RunnableConfig):
     """키워드 빈도수 데이터를 DB와 동기화하는 노드"""
     logger.info("--- (DB) Entered Sync DB Node ---")
     sync_service: SyncService = config["configurable"].get("sync_service")
-    frequencies_df_json = state.get("frequencies_df_json")
+    frequencies_df_ref = state.get("frequencies_df_ref")
     slots = state.get("slots")
 
-    if not sync_service or not frequencies_df_json or not slots:
+    if not sync_service or not frequencies_df_ref or not slots:
         logger.warning("Skipping DB sync due to missing service, data, or slots.")
         return {}
 
     try:
-        df_frequencies = pd.read_json(StringIO(frequencies_df_json), orient='split')
+        df_frequencies = get_artifact_store().get_df(frequencies_df_ref)
         sync_service.sync_dataframe_to_db(df=df_frequencies, slots=slots)
     except Exception as e:
         logger.error(f"Failed to sync data to DB in sync_db_node: {e}", exc_info=True)
@@ -133,6 +136,6 @@ workflow.add_edge("youtube_process", "sync_db")
 workflow.add_edge("sync_db", "analysis")
 workflow.add_edge("analysis", END)
 
-# 체크포인터
-memory = MemorySaver()
+# 체크포인터 (SQLite에 저장하여 재시작 후에도 대화 상태 유지, 열 수 없으면 메모리로 대체)
+memory = get_checkpointer() or MemorySaver()
 super_graph = workflow.compile(checkpointer=memory)
@@ -0,0 +1,64 @@
+# app/core/concurrency.py
+import asyncio
+import queue
+import threading
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional
+
+# 동기 코드(LangGraph 노드, FastAPI 동기 핸들러 등)에서 비동기 클라이언트를 쓰기 위한
+# 프로세스 전역 백그라운드 이벤트 루프. 비동기 HTTP 커넥션 풀을 요청 간에 공유할 수 있습니다.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+# iter_async_generator_sync 내부 큐 메시지 종류
+_ITEM, _ERROR, _DONE = object(), object(), object()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, name="tm-async-loop", daemon=True)
+            thread.start()
+    return _loop
+
+
+def run_coroutine_sync(coro: Coroutine, timeout: Optional[float] = None) -> Any:
+    """
+    코루틴을 백그라운드 이벤트 루프에서 실행하고 결과를 동기적으로 반환합니다.
+    호출한 스레드에 이미 실행 중인 이벤트 루프가 있어도 안전하게 동작합니다.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_background_loop())
+    return future.result(timeout=timeout)
+
+
+def iter_async_generator_sync(agen: AsyncIterator) -> Iterator:
+    """
+    비동기 제너레이터를 백그라운드 이벤트 루프에서 실행하면서, 생성되는 항목을 동기 제너레이터로 전달합니다.
+    소비 측이 중간에 멈추면(break 등) 백그라운드 작업도 취소됩니다.
+    """
+    items: queue.Queue = queue.Queue()
+
+    async def pump():
+        try:
+            async for item in agen:
+                items.put((_ITEM, item))
+        except BaseException as e:  # 취소 포함, 소비 측에서 다시 발생시킴
+            items.put((_ERROR, e))
+        finally:
+            items.put((_DONE, None))
+
+    future = asyncio.run_coroutine_threadsafe(pump(), get_background_loop())
+    try:
+        while True:
+            kind, value = items.get()
+            if kind is _DONE:
+                break
+            if kind is _ERROR:
+                if isinstance(value, asyncio.CancelledError):
+                    break
+                raise value
+            yield value
+    finally:
+        if not future.done():
+            future.cancel()
@@ -0,0 +1,63 @@
+# app/core/metrics.py
+import bisect
+import threading
+from typing import Dict, Any, Tuple
+
+# 지연 시간 히스토그램 버킷 상한(초). 마지막 버킷은 그 이상 전부
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class HttpClientMetrics:
+    """
+    외부 API 클라이언트의 요청 지표를 프로세스 안에서 누적합니다 (스레드 안전).
+    - 지연 시간 히스토그램, 상태 코드별 응답 수, 재시도 횟수, 429 비율
+    """
+
+    def __init__(self, name: str, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._histogram = [0] * (len(self.buckets) + 1)
+        self._status_counts: Dict[int, int] = {}
+        self._requests = 0
+        self._retries = 0
+        self._errors = 0
+        self._latency_sum = 0.0
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+
+    def observe(self, latency: float, status_code: int):
+        with self._lock:
+            self._histogram[bisect.bisect_left(self.buckets, latency)] += 1
+            self._status_counts[status_code] = self._status_counts.get(status_code, 0) + 1
+            self._requests += 1
+            self._latency_sum += latency
+
+    def record_retry(self):
+        with self._lock:
+            self._retries += 1
+
+    def record_error(self):
+        """응답을 받지 못한 요청(타임아웃, 연결 오류 등)"""
+        with self._lock:
+            self._errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"<={b}s" for b in self.buckets] + [f">{self.buckets[-1]}s"]
+            throttled = self._status_counts.get(429, 0)
+            return {
+                "name": self.name,
+                "requests": self._requests,
+                "errors": self._errors,
+                "retries": self._retries,
+                "status_counts": dict(self._status_counts),
+                "rate_429": (throttled / self._requests) if self._requests else 0.0,
+                "avg_latency": (self._latency_sum / self._requests) if self._requests else 0.0,
+                "latency_histogram": dict(zip(labels, self._histogram)),
+            }
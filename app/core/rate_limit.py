@@ -0,0 +1,146 @@
+# app/core/rate_limit.py
+import threading
+import time
+import random
+import asyncio
+from datetime import datetime, timezone, timedelta
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from app.core.logger import logger
+
+try:
+    from zoneinfo import ZoneInfo
+    _PACIFIC = ZoneInfo("America/Los_Angeles")
+except Exception:  # tzdata가 없는 환경(Windows 등)에서는 PST 고정 오프셋으로 대체
+    _PACIFIC = timezone(timedelta(hours=-8))
+
+
+class QuotaExceededError(RuntimeError):
+    """일일 할당량(quota) 예산이 부족해 요청을 보낼 수 없을 때 발생"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 대기 시간(초)으로 변환합니다."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_with_jitter(attempt: int, base: float = 1.0, cap: float = 30.0, retry_after: Optional[float] = None) -> float:
+    """
+    지수 백오프 + full jitter 대기 시간(초).
+    서버가 Retry-After를 주면 최소 그 시간만큼은 기다립니다.
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+class TokenBucket:
+    """
+    스레드/코루틴 공용 토큰 버킷 (AIMD 적응형 속도 제어)
+    - reserve(): 토큰을 예약하고 기다려야 할 시간(초)을 반환 (동기/비동기 양쪽에서 사용)
+    - penalize(): 429 등 속도 제한 응답 시 속도를 절반으로 줄이고(Multiplicative Decrease),
+      Retry-After가 있으면 그 시간 동안 토큰 발급을 멈춤
+    - reward(): 성공 응답마다 속도를 조금씩 회복(Additive Increase)
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, min_rate: float = 0.2):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # 예약은 잔량을 음수로 만들 수 있으며, 그만큼 다음 호출자들이 뒤로 밀림
+            self._tokens -= tokens
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self, tokens: float = 1.0):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: float = 1.0):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self, retry_after: Optional[float] = None):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        logger.warning(f"[RateLimit] Backing off: rate={self.rate:.2f}/s, retry_after={retry_after}")
+
+    def reward(self, step: Optional[float] = None):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + (step or self.max_rate * 0.05))
+
+
+class DailyQuota:
+    """
+    태평양 시간 자정에 초기화되는 일일 단위(unit) 예산 (YouTube Data API 할당량 기준)
+    - 요청 전에 try_consume()으로 비용을 선차감하므로 동시 사용자 간에도 초과 사용되지 않음
+    """
+
+    def __init__(self, daily_units: int):
+        self.daily_units = int(daily_units)
+        self._used = 0
+        self._day = self._today()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(_PACIFIC).strftime("%Y-%m-%d")
+
+    def _roll(self):
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._used = 0
+
+    def try_consume(self, units: int) -> bool:
+        with self._lock:
+            self._roll()
+            if self._used + units > self.daily_units:
+                return False
+            self._used += units
+            return True
+
+    def refund(self, units: int):
+        with self._lock:
+            self._used = max(0, self._used - units)
+
+    def exhaust(self):
+        """서버가 할당량 초과를 알려온 경우 남은 예산을 0으로 맞춤"""
+        with self._lock:
+            self._roll()
+            self._used = self.daily_units
+
+    def remaining(self) -> int:
+        with self._lock:
+            self._roll()
+            return max(0, self.daily_units - self._used)
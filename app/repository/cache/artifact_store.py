@@ -0,0 +1,135 @@
+# app/repository/cache/artifact_store.py
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from app.core.logger import logger
+
+
+class ArtifactStore:
+    """
+    그래프 노드 사이에 주고받는 DataFrame을 Arrow IPC 파일로 저장하고, 상태에는 핸들(artifact://...)만 넘기는 저장소
+    - 핸들은 내용 해시로 만들므로 같은 데이터는 같은 핸들 (중복 저장 없음, 재실행 시 동일 입력 판별에 사용 가능)
+    - 읽기는 memory-map으로 열어 복사 없이 Arrow Table을 얻음
+    - 최근 사용한 Table은 프로세스 안 LRU에 보관하여 같은 프로세스의 다음 노드는 디스크를 거치지 않음
+    - 마지막 저장 후 ttl_seconds가 지난 파일은 prune()에서 삭제 (put_df 중 prune_interval마다 자동 실행)
+    """
+
+    SCHEME = "artifact://"
+
+    def __init__(self, root: str, memory_items: int = 16, ttl_seconds: float = 3 * 86400, prune_interval: float = 600.0):
+        self.root = root
+        self.memory_items = memory_items
+        self.ttl_seconds = ttl_seconds
+        self.prune_interval = prune_interval
+        self._last_pruned = 0.0
+        self._lock = threading.Lock()
+        self._tables: "OrderedDict[str, pa.Table]" = OrderedDict()
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def is_ref(cls, value) -> bool:
+        return isinstance(value, str) and value.startswith(cls.SCHEME)
+
+    def _path(self, ref: str) -> str:
+        name = ref[len(self.SCHEME):]
+        if not name or "/" in name or "\\" in name or name.startswith("."):
+            raise ValueError(f"잘못된 아티팩트 핸들: '{ref}'")
+        return os.path.join(self.root, f"{name}.arrow")
+
+    def _remember(self, ref: str, table: pa.Table):
+        with self._lock:
+            self._tables[ref] = table
+            self._tables.move_to_end(ref)
+            while len(self._tables) > self.memory_items:
+                self._tables.popitem(last=False)
+
+    def put_df(self, df: pd.DataFrame, kind: str = "df") -> str:
+        """DataFrame을 저장하고 핸들을 반환합니다. (인덱스는 저장하지 않음)"""
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        buf = sink.getvalue()
+
+        ref = f"{self.SCHEME}{kind}-{hashlib.sha256(memoryview(buf)).hexdigest()[:32]}"
+        path = self._path(ref)
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            # 임시 파일에 쓴 뒤 교체하여 읽는 쪽이 쓰다 만 파일을 보지 않도록 함
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(memoryview(buf))
+            os.replace(tmp_path, path)
+
+        self._remember(ref, table)
+        self._maybe_prune()
+        return ref
+
+    def _maybe_prune(self):
+        now = time.time()
+        with self._lock:
+            if now - self._last_pruned < self.prune_interval:
+                return
+            self._last_pruned = now
+        try:
+            self.prune()
+        except OSError as e:
+            logger.warning(f"[ArtifactStore] Failed to prune '{self.root}': {e}")
+
+    def get_table(self, ref: str) -> pa.Table:
+        with self._lock:
+            table = self._tables.get(ref)
+            if table is not None:
+                self._tables.move_to_end(ref)
+                return table
+
+        path = self._path(ref)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"아티팩트를 찾을 수 없습니다: {ref}")
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        self._remember(ref, table)
+        return table
+
+    def get_df(self, ref: str) -> pd.DataFrame:
+        return self.get_table(ref).to_pandas()
+
+    def prune(self, older_than: Optional[float] = None) -> int:
+        """마지막 저장 시각이 older_than초보다 오래된 아티팩트 파일을 삭제하고 삭제 개수를 반환합니다."""
+        cutoff = time.time() - (self.ttl_seconds if older_than is None else older_than)
+        removed = 0
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                # 다른 프로세스가 memory-map으로 열고 있는 경우(Windows) 등은 다음 정리 때 다시 시도
+                continue
+        if removed:
+            logger.debug(f"[ArtifactStore] Pruned {removed} expired artifacts.")
+        return removed
+
+
+_store_instance: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """프로세스 전역 아티팩트 저장소를 반환합니다. 만료된 아티팩트는 저장 중 주기적으로 정리됩니다."""
+    global _store_instance
+    with _store_lock:
+        if _store_instance is None:
+            root = os.getenv("ARTIFACT_STORE_PATH", os.path.join("cache", "artifacts"))
+            memory_items = int(os.getenv("ARTIFACT_STORE_MEMORY_ITEMS", "16"))
+            ttl_seconds = float(os.getenv("ARTIFACT_STORE_TTL_HOURS", "72")) * 3600
+            _store_instance = ArtifactStore(root=root, memory_items=memory_items, ttl_seconds=ttl_seconds)
+    return _store_instance
@@ -0,0 +1,173 @@
+# app/repository/cache/crawl_state.py
+import os
+import time
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.logger import logger
+
+
+class CrawlStateStore:
+    """
+    (query, region) 별 증분 크롤링 상태를 저장하는 SQLite 저장소
+    - watermarks: 이미 수집한 영상 중 가장 최신 published_at (RFC3339, UTC)
+      + covered_from: 이 시각 이후 게시된 영상은 빠짐없이 검색해 저장했다는 하한 (없으면 전체 검색 필요)
+      + window_days: 지금까지 제공한 가장 긴 트렌드 기간(일). 정리(prune)는 이 기간 기준
+    - videos: 수집한 영상의 기본 정보. 트렌드 기간 안에 남아 있는 영상은 다음 크롤링 때
+      다시 검색하지 않고 통계만 갱신해 새 결과와 병합
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS watermarks (
+                query TEXT NOT NULL,
+                region TEXT NOT NULL,
+                watermark TEXT NOT NULL,
+                covered_from TEXT,
+                window_days REAL NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (query, region)
+            );
+            CREATE TABLE IF NOT EXISTS videos (
+                query TEXT NOT NULL,
+                region TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                title TEXT,
+                description TEXT,
+                published_at TEXT NOT NULL,
+                channel_title TEXT,
+                PRIMARY KEY (query, region, video_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_videos_published ON videos(query, region, published_at);
+            """
+        )
+        # 이전 버전 스키마에는 covered_from/window_days가 없음. covered_from이 NULL이면 다음 요청은 전체 검색
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(watermarks)")}
+        if "covered_from" not in columns:
+            self._conn.execute("ALTER TABLE watermarks ADD COLUMN covered_from TEXT")
+        if "window_days" not in columns:
+            self._conn.execute("ALTER TABLE watermarks ADD COLUMN window_days REAL NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def get_state(self, query: str, region: str) -> Optional[Dict[str, Any]]:
+        """{'watermark', 'covered_from', 'window_days'} 또는 기록이 없으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark, covered_from, window_days FROM watermarks WHERE query = ? AND region = ?",
+                (query, region),
+            ).fetchone()
+        return {"watermark": row[0], "covered_from": row[1], "window_days": row[2]} if row else None
+
+    def known_videos(self, query: str, region: str, since: str) -> List[Dict[str, Any]]:
+        """since(RFC3339) 이후에 게시된, 이미 수집한 영상 목록"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id, title, description, published_at, channel_title FROM videos "
+                "WHERE query = ? AND region = ? AND published_at >= ? ORDER BY published_at DESC",
+                (query, region, since),
+            ).fetchall()
+        return [
+            {"video_id": r[0], "title": r[1] or "", "description": r[2] or "", "published_at": r[3], "channel_title": r[4] or ""}
+            for r in rows
+        ]
+
+    def record(
+        self,
+        query: str,
+        region: str,
+        videos: List[Dict[str, Any]],
+        searched_after: str,
+        covered_from: str,
+        window_days: float,
+        complete: bool = True,
+    ):
+        """
+        searched_after 이후를 검색해 얻은 영상을 저장하고 watermark를 올립니다.
+        covered_from은 이번 검색 후 빠짐없이 수집된 구간의 시작 (전체 검색이면 이번 기간 시작, 증분이면 기존 값)
+        complete=False(페이지 제한으로 검색 결과 끝까지 받지 못함)이면 영상만 저장하고 watermark/covered_from은 그대로 둡니다.
+        (처음 기록하는 경우 covered_from을 비워 다음 요청이 전체 검색하도록 함)
+        """
+        rows = [
+            (query, region, v["video_id"], v.get("title", ""), v.get("description", ""), v["published_at"], v.get("channel_title", ""))
+            for v in videos
+            if v.get("video_id") and v.get("published_at")
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            if complete:
+                # 결과가 없어도 검색한 구간은 수집 완료로 기록
+                newest = max([r[5] for r in rows] + [searched_after])
+                self._conn.execute(
+                    "INSERT INTO watermarks (query, region, watermark, covered_from, window_days, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(query, region) DO UPDATE SET "
+                    "watermark = MAX(watermark, excluded.watermark), covered_from = excluded.covered_from, "
+                    "window_days = MAX(window_days, excluded.window_days), updated_at = excluded.updated_at",
+                    (query, region, newest, covered_from, window_days, time.time()),
+                )
+            else:
+                self._conn.execute(
+                    "INSERT INTO watermarks (query, region, watermark, covered_from, window_days, updated_at) "
+                    "VALUES (?, ?, ?, NULL, ?, ?) "
+                    "ON CONFLICT(query, region) DO UPDATE SET "
+                    "window_days = MAX(window_days, excluded.window_days), updated_at = excluded.updated_at",
+                    (query, region, searched_after, window_days, time.time()),
+                )
+            self._conn.commit()
+        if complete:
+            logger.info(f"[CrawlState] Recorded {len(rows)} videos for '{query}'/{region}, watermark >= {newest}, covered from {covered_from}")
+        else:
+            logger.info(f"[CrawlState] Recorded {len(rows)} videos for '{query}'/{region} from a truncated search, watermark unchanged")
+
+    def prune(self, query: str, region: str):
+        """
+        지금까지 제공한 가장 긴 기간(window_days)을 벗어난 영상만 제거합니다.
+        짧은 기간 요청이 긴 기간 요청에 필요한 영상을 지우지 않도록 하고, 지운 만큼 covered_from을 당깁니다.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT window_days FROM watermarks WHERE query = ? AND region = ?", (query, region)
+            ).fetchone()
+            if not row or not row[0]:
+                return
+            before = (datetime.now(timezone.utc) - timedelta(days=row[0])).strftime("%Y-%m-%dT%H:%M:%SZ")
+            self._conn.execute(
+                "DELETE FROM videos WHERE query = ? AND region = ? AND published_at < ?", (query, region, before)
+            )
+            self._conn.execute(
+                "UPDATE watermarks SET covered_from = MAX(covered_from, ?) "
+                "WHERE query = ? AND region = ? AND covered_from IS NOT NULL",
+                (before, query, region),
+            )
+            self._conn.commit()
+
+
+_store_instance: Optional[CrawlStateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_crawl_state_store() -> Optional[CrawlStateStore]:
+    """프로세스 전역 증분 크롤링 상태 저장소를 반환합니다. 열 수 없으면 None (전체 크롤링으로 대체)."""
+    global _store_instance
+    with _store_lock:
+        if _store_instance is None:
+            path = os.getenv("CRAWL_STATE_PATH", os.path.join("cache", "crawl_state.sqlite3"))
+            try:
+                _store_instance = CrawlStateStore(path=path)
+            except Exception as e:
+                logger.error(f"[CrawlState] Failed to open crawl state store at '{path}': {e}", exc_info=True)
+                return None
+    return _store_instance
@@ -0,0 +1,129 @@
+# app/repository/cache/embedding_cache.py
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from app.core.logger import logger
+
+
+class EmbeddingCache:
+    """
+    (모델명 + 텍스트) 해시 -> 임베딩 벡터를 로컬 SQLite에 저장하는 영구 캐시
+    - 벡터는 float32 바이트(BLOB)로 압축 저장
+    - 마지막 접근 시각 기준 LRU, 최대 항목 수 초과 시 오래된 항목부터 제거
+    """
+
+    def __init__(self, path: str, max_entries: int = 200_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings(accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """캐시에 존재하는 키만 {key: vector} 형태로 반환하고 접근 시각을 갱신합니다."""
+        if not keys:
+            return {}
+
+        found: Dict[str, List[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            # SQLite 변수 개수 제한을 피하기 위해 나눠서 조회
+            for i in range(0, len(unique_keys), 500):
+                chunk = unique_keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET accessed_at = ? WHERE key = ?",
+                    [(now, k) for k in found],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]):
+        if not items:
+            return
+
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            arr = np.asarray(vector, dtype=np.float32)
+            rows.append((key, int(arr.shape[0]), arr.tobytes(), now))
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector, accessed_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            logger.debug(f"[EmbeddingCache] Evicted {overflow} least recently used entries.")
+
+
+_cache_instance: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    프로세스 전역 임베딩 캐시를 반환합니다.
+    EMBEDDING_CACHE_ENABLED=false 이면 None을 반환하여 캐시를 사용하지 않습니다.
+    """
+    global _cache_instance
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    with _cache_lock:
+        if _cache_instance is None:
+            path = os.getenv("EMBEDDING_CACHE_PATH", os.path.join("cache", "embeddings.sqlite3"))
+            max_entries = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+            try:
+                _cache_instance = EmbeddingCache(path=path, max_entries=max_entries)
+            except Exception as e:
+                logger.error(f"[EmbeddingCache] Failed to open cache at '{path}': {e}", exc_info=True)
+                return None
+    return _cache_instance
@@ -0,0 +1,157 @@
+# app/repository/cache/http_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.logger import logger
+
+
+class HttpResponseCache:
+    """
+    외부 API 응답(JSON)을 로컬 SQLite에 저장하는 영구 캐시
+    - 항목마다 TTL(expires_at)을 따로 가지므로 검색/통계 등 응답 종류별로 다른 TTL을 적용할 수 있음
+    - 만료된 항목도 ETag와 함께 보관해 두어 조건부 재검증(If-None-Match -> 304)에 사용
+    - 마지막 접근 시각 기준 LRU, 최대 항목 수 초과 시 오래된 항목부터 제거
+    """
+
+    def __init__(self, path: str, max_entries: int = 50_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any], exclude: Tuple[str, ...] = ("key",)) -> str:
+        """정렬된 요청 파라미터(API 키 등 제외)로 만든 캐시 키"""
+        normalized = sorted((k, str(v)) for k, v in params.items() if k not in exclude and v is not None)
+        raw = json.dumps([namespace, normalized], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """{'body', 'etag', 'fresh'} 를 반환합니다. 만료된 항목도 재검증용으로 반환(fresh=False)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return {"body": json.loads(row[0]), "etag": row[1], "fresh": row[2] > now}
+
+    def get_many_fresh(self, keys: List[str]) -> Dict[str, Any]:
+        """만료되지 않은 항목만 {key: body} 형태로 반환합니다."""
+        if not keys:
+            return {}
+
+        found: Dict[str, Any] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(unique_keys), 500):
+                chunk = unique_keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, body FROM responses WHERE expires_at > ? AND key IN ({placeholders})",
+                    (now, *chunk),
+                ).fetchall()
+                for key, body in rows:
+                    found[key] = json.loads(body)
+
+            if found:
+                self._conn.executemany(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", [(now, k) for k in found]
+                )
+                self._conn.commit()
+        return found
+
+    def put(self, key: str, body: Any, ttl: float, etag: Optional[str] = None):
+        self.put_many({key: (body, ttl)}, etags={key: etag} if etag else None)
+
+    def put_many(self, items: Dict[str, Tuple[Any, float]], etags: Optional[Dict[str, str]] = None):
+        """{key: (body, ttl)} 를 저장합니다."""
+        if not items:
+            return
+        now = time.time()
+        etags = etags or {}
+        rows = [
+            (key, json.dumps(body, ensure_ascii=False), etags.get(key), now + ttl, now)
+            for key, (body, ttl) in items.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO responses (key, body, etag, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, key: str, ttl: float):
+        """304 Not Modified 응답을 받은 항목의 만료 시각을 연장합니다."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?", (now + ttl, now, key)
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            logger.debug(f"[HttpResponseCache] Evicted {overflow} least recently used entries.")
+
+
+_cache_instance: Optional[HttpResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpResponseCache]:
+    """
+    프로세스 전역 HTTP 응답 캐시를 반환합니다.
+    HTTP_CACHE_ENABLED=false 이면 None을 반환하여 캐시를 사용하지 않습니다.
+    """
+    global _cache_instance
+    if os.getenv("HTTP_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    with _cache_lock:
+        if _cache_instance is None:
+            path = os.getenv("HTTP_CACHE_PATH", os.path.join("cache", "http_responses.sqlite3"))
+            max_entries = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "50000"))
+            try:
+                _cache_instance = HttpResponseCache(path=path, max_entries=max_entries)
+            except Exception as e:
+                logger.error(f"[HttpResponseCache] Failed to open cache at '{path}': {e}", exc_info=True)
+                return None
+    return _cache_instance
@@ -0,0 +1,143 @@
+# app/repository/cache/keyword_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.core.logger import logger
+
+
+class KeywordResultCache:
+    """
+    영상 내용 단위 LLM 키워드 추출 결과 캐시 (SQLite)
+    - 키: (모델, 프롬프트 버전, 도메인, 제목+설명 해시). 프롬프트를 바꾸면 PROMPT_VERSION만 올리면 전부 무효화
+    - 값: {"keywords": [...], "sentiment": "..."}
+    - 마지막 접근 시각 기준 LRU, 최대 항목 수 초과 시 오래된 항목부터 제거
+    - 프로세스 안에서 적중/미적중 횟수를 누적 (stats())
+    """
+
+    def __init__(self, path: str, max_entries: int = 500_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS keyword_results (
+                key TEXT PRIMARY KEY,
+                keywords TEXT NOT NULL,
+                sentiment TEXT NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_keyword_results_accessed ON keyword_results(accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt_version: str, domain: str, title: str, description: str) -> str:
+        content = hashlib.sha256(f"{title}\x00{description}".encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{model}\x00{prompt_version}\x00{domain}\x00{content}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """캐시에 존재하는 키만 {key: {"keywords", "sentiment"}} 형태로 반환하고 접근 시각을 갱신합니다."""
+        if not keys:
+            return {}
+
+        found: Dict[str, Dict[str, Any]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(unique_keys), 500):
+                chunk = unique_keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, keywords, sentiment FROM keyword_results WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, keywords, sentiment in rows:
+                    found[key] = {"keywords": json.loads(keywords), "sentiment": sentiment}
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE keyword_results SET accessed_at = ? WHERE key = ?", [(now, k) for k in found]
+                )
+                self._conn.commit()
+
+            self._hits += len(found)
+            self._misses += len(unique_keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, Dict[str, Any]]):
+        if not items:
+            return
+        now = time.time()
+        rows = [
+            (key, json.dumps(value.get("keywords", []), ensure_ascii=False), value.get("sentiment", "neutral"), now)
+            for key, value in items.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO keyword_results (key, keywords, sentiment, accessed_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            entries = self._conn.execute("SELECT COUNT(*) FROM keyword_results").fetchone()[0]
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / total) if total else 0.0,
+                "entries": entries,
+            }
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM keyword_results").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM keyword_results WHERE key IN "
+                "(SELECT key FROM keyword_results ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            logger.debug(f"[KeywordResultCache] Evicted {overflow} least recently used entries.")
+
+
+_cache_instance: Optional[KeywordResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_keyword_cache() -> Optional[KeywordResultCache]:
+    """
+    프로세스 전역 키워드 추출 결과 캐시를 반환합니다.
+    KEYWORD_CACHE_ENABLED=false 이면 None을 반환하여 캐시를 사용하지 않습니다.
+    """
+    global _cache_instance
+    if os.getenv("KEYWORD_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    with _cache_lock:
+        if _cache_instance is None:
+            path = os.getenv("KEYWORD_CACHE_PATH", os.path.join("cache", "keyword_results.sqlite3"))
+            max_entries = int(os.getenv("KEYWORD_CACHE_MAX_ENTRIES", "500000"))
+            try:
+                _cache_instance = KeywordResultCache(path=path, max_entries=max_entries)
+            except Exception as e:
+                logger.error(f"[KeywordResultCache] Failed to open cache at '{path}': {e}", exc_info=True)
+                return None
+    return _cache_instance
@@ -0,0 +1,110 @@
+# app/repository/cache/quota_store.py
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+from app.core.logger import logger
+from app.core.rate_limit import DailyQuota
+
+
+class SqliteDailyQuota(DailyQuota):
+    """
+    DailyQuota와 같은 인터페이스로, 사용량을 SQLite에 (이름, 태평양 시간 날짜) 단위로 기록하는 일일 예산
+    - 프로세스를 재시작해도 오늘 사용량이 유지되고, 같은 파일을 쓰는 워커(uvicorn/배치)끼리 예산을 공유
+    - 차감은 BEGIN IMMEDIATE 트랜잭션 안에서 확인과 함께 수행하므로 워커 간에도 초과 사용되지 않음
+    """
+
+    def __init__(self, path: str, name: str, daily_units: int):
+        super().__init__(daily_units)
+        self.path = path
+        self.name = name
+
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        # isolation_level=None: 트랜잭션을 직접 BEGIN IMMEDIATE로 열어 다른 프로세스와 쓰기 잠금을 맞춤
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS quota_usage (
+                name TEXT NOT NULL,
+                day TEXT NOT NULL,
+                used INTEGER NOT NULL,
+                PRIMARY KEY (name, day)
+            )
+            """
+        )
+        # 지난 날짜의 기록은 더 이상 쓰이지 않음
+        self._conn.execute("DELETE FROM quota_usage WHERE name = ? AND day < ?", (name, self._today()))
+
+    def _read_used(self, day: str) -> int:
+        row = self._conn.execute("SELECT used FROM quota_usage WHERE name = ? AND day = ?", (self.name, day)).fetchone()
+        return row[0] if row else 0
+
+    def _set_used(self, day: str, used: int):
+        self._conn.execute(
+            "INSERT INTO quota_usage (name, day, used) VALUES (?, ?, ?) "
+            "ON CONFLICT(name, day) DO UPDATE SET used = excluded.used",
+            (self.name, day, used),
+        )
+
+    def _update(self, fn) -> int:
+        """fn(used) -> 새 사용량을 트랜잭션 안에서 적용하고 새 사용량을 반환합니다."""
+        day = self._today()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                used = self._read_used(day)
+                new_used = fn(used)
+                if new_used != used:
+                    self._set_used(day, new_used)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return new_used
+
+    def try_consume(self, units: int) -> bool:
+        consumed = []
+
+        def apply(used: int) -> int:
+            if used + units > self.daily_units:
+                return used
+            consumed.append(units)
+            return used + units
+
+        self._update(apply)
+        return bool(consumed)
+
+    def refund(self, units: int):
+        self._update(lambda used: max(0, used - units))
+
+    def exhaust(self):
+        """서버가 할당량 초과를 알려온 경우 남은 예산을 0으로 맞춤 (다른 워커에도 반영)"""
+        self._update(lambda used: max(used, self.daily_units))
+
+    def remaining(self) -> int:
+        with self._lock:
+            return max(0, self.daily_units - self._read_used(self._today()))
+
+
+_quota_instances: Dict[str, SqliteDailyQuota] = {}
+_quota_lock = threading.Lock()
+
+
+def get_daily_quota(name: str, daily_units: int) -> Optional[SqliteDailyQuota]:
+    """
+    이름별 프로세스 전역 영구 일일 예산을 반환합니다. 열 수 없으면 None (호출 측에서 메모리 DailyQuota 사용).
+    """
+    with _quota_lock:
+        if name not in _quota_instances:
+            path = os.getenv("API_QUOTA_PATH", os.path.join("cache", "api_quota.sqlite3"))
+            try:
+                _quota_instances[name] = SqliteDailyQuota(path=path, name=name, daily_units=daily_units)
+            except Exception as e:
+                logger.error(f"[QuotaStore] Failed to open quota store at '{path}': {e}", exc_info=True)
+                return None
+    return _quota_instances[name]
@@ -0,0 +1,168 @@
+# app/repository/cache/report_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.logger import logger
+
+
+class ReportResultCache:
+    """
+    최종 리포트(분석 결과) 캐시 (SQLite)
+    - 키: slots(search_query, period_days, region) + 분석 기간 마지막 날짜
+      search_query는 벡터 DB의 category와 같은 값이어야 하므로 정규화하지 않음 (카테고리는 대소문자 구분)
+    - 카테고리별 데이터 버전을 함께 저장하고, 조회 시점의 버전과 다르면 무효(미적중)
+    - 벡터 DB에 카테고리 데이터가 쓰이거나 지워지면 bump_versions()로 버전을 올리고 해당 리포트를 삭제
+    - TTL이 지났거나 PDF 파일이 사라진 항목은 미적중으로 처리
+    """
+
+    # 카테고리를 특정할 수 없는 쓰기/삭제를 기록하는 data_versions 행
+    ALL_CATEGORIES = "*"
+
+    def __init__(self, path: str, ttl_seconds: float = 6 * 3600, max_entries: int = 2_000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS data_versions (
+                category TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS reports (
+                key TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                data_version INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_reports_category ON reports(category);
+            CREATE INDEX IF NOT EXISTS idx_reports_accessed ON reports(accessed_at);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(slots: Dict[str, Any], end_date: Optional[str] = None) -> str:
+        """분석 기간이 하루 밀리면 다른 키가 되도록 마지막 날짜를 포함 (search_query는 category 그대로)"""
+        query = str(slots.get("search_query") or "")
+        period_days = int(slots.get("period_days") or 7)
+        region = str(slots.get("region") or "KR").upper()
+        end_date = end_date or datetime.now().strftime("%Y-%m-%d")
+        raw = json.dumps([query, period_days, region, end_date], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _version(self, category: str) -> int:
+        # 전체 무효화(ALL_CATEGORIES) 횟수를 더해, 카테고리를 특정할 수 없는 쓰기에도 버전이 바뀌도록 함
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(version), 0) FROM data_versions WHERE category IN (?, ?)", (category, self.ALL_CATEGORIES)
+        ).fetchone()
+        return row[0]
+
+    def data_version(self, category: str) -> int:
+        with self._lock:
+            return self._version(category)
+
+    def get(self, key: str, category: str) -> Optional[Dict[str, Any]]:
+        """현재 데이터 버전으로 만든 유효한 리포트만 반환합니다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data_version, result, created_at FROM reports WHERE key = ? AND category = ?", (key, category)
+            ).fetchone()
+            if row is None:
+                return None
+            data_version, result, created_at = row
+            if data_version != self._version(category) or time.time() - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM reports WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE reports SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+        result = json.loads(result)
+        pdf_path = result.get("pdf_path")
+        if pdf_path and not os.path.exists(pdf_path):
+            return None
+        return result
+
+    def put(self, key: str, category: str, data_version: int, result: Dict[str, Any]):
+        """data_version은 리포트 생성에 사용한 데이터를 읽기 전에 조회한 값이어야 합니다."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports (key, category, data_version, result, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, category, data_version, json.dumps(result, ensure_ascii=False, default=str), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def bump_versions(self, categories: Optional[Iterable[str]] = None):
+        """카테고리 데이터가 바뀌었음을 기록하고 해당 리포트를 삭제합니다. categories=None 이면 전체."""
+        now = time.time()
+        with self._lock:
+            categories = [self.ALL_CATEGORIES] if categories is None else [c for c in set(categories) if c]
+            if not categories:
+                return
+            self._conn.executemany(
+                "INSERT INTO data_versions (category, version, updated_at) VALUES (?, 1, ?) "
+                "ON CONFLICT(category) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at",
+                [(c, now) for c in categories],
+            )
+            if categories == [self.ALL_CATEGORIES]:
+                self._conn.execute("DELETE FROM reports")
+            else:
+                self._conn.executemany("DELETE FROM reports WHERE category = ?", [(c,) for c in categories])
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM reports WHERE key IN (SELECT key FROM reports ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            logger.debug(f"[ReportResultCache] Evicted {overflow} least recently used reports.")
+
+
+_cache_instance: Optional[ReportResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_report_cache() -> Optional[ReportResultCache]:
+    """
+    프로세스 전역 리포트 결과 캐시를 반환합니다.
+    REPORT_CACHE_ENABLED=false 이면 None을 반환하여 캐시를 사용하지 않습니다.
+    """
+    global _cache_instance
+    if os.getenv("REPORT_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    with _cache_lock:
+        if _cache_instance is None:
+            path = os.getenv("REPORT_CACHE_PATH", os.path.join("cache", "report_results.sqlite3"))
+            ttl_seconds = float(os.getenv("REPORT_CACHE_TTL_HOURS", "6")) * 3600
+            max_entries = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "2000"))
+            try:
+                _cache_instance = ReportResultCache(path=path, ttl_seconds=ttl_seconds, max_entries=max_entries)
+            except Exception as e:
+                logger.error(f"[ReportResultCache] Failed to open cache at '{path}': {e}", exc_info=True)
+                return None
+    return _cache_instance
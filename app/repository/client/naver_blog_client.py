@@ -1,12 +1,19 @@
 import os
 import time
+import asyncio
+import threading
 import pandas as pd
 import datetime as dt
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Iterator
 import requests
+import httpx
 from dotenv import load_dotenv
 from pathlib import Path
 from app.core.logger import logger
+from app.core.concurrency import iter_async_generator_sync
+from app.core.rate_limit import TokenBucket, backoff_with_jitter, parse_retry_after
+from app.core.metrics import HttpClientMetrics
+from requests.adapters import HTTPAdapter
 
 ROOT = Path(__file__).resolve().parents[3]
 load_dotenv(ROOT/".env")
@@ -20,6 +27,23 @@ logger.info(NAVER_CLIENT_SECRET)
 
 NAVER_BLOG_SEARCH_URL = "https://openapi.naver.com/v1/search/blog.json"
 
+# 여러 쿼리를 동시에 수집할 때 공유하는 속도 제한(초당 요청 수)과 동시 진행 쿼리 수
+NAVER_REQUESTS_PER_SECOND = float(os.getenv("NAVER_REQUESTS_PER_SECOND", "8"))
+NAVER_MAX_CONCURRENT_QUERIES = int(os.getenv("NAVER_MAX_CONCURRENT_QUERIES", "4"))
+
+# 같은 자격 증명(Client ID)으로 동시에 보낼 수 있는 최대 요청 수
+NAVER_MAX_CONCURRENCY_PER_CREDENTIAL = int(os.getenv("NAVER_MAX_CONCURRENCY_PER_CREDENTIAL", "4"))
+
+_bucket = TokenBucket(rate=NAVER_REQUESTS_PER_SECOND)
+_async_client: Optional[httpx.AsyncClient] = None
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_credential_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_async_credential_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+# 요청 지연 시간 히스토그램, 재시도 횟수, 429 비율 (get_naver_metrics()로 조회)
+metrics = HttpClientMetrics("naver_blog")
+
 
 class NaverBlogClientError(RuntimeError):
     pass
@@ -36,20 +60,120 @@ def _headers() -> Dict[str, str]:
     }
 
 
+def get_naver_metrics() -> Dict[str, Any]:
+    return metrics.snapshot()
+
+
+def _get_session() -> requests.Session:
+    """keep-alive 커넥션을 재사용하는 공유 세션 (인증 헤더는 세션에 한 번만 설정)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=NAVER_MAX_CONCURRENCY_PER_CREDENTIAL * 2)
+            session.mount("https://", adapter)
+            session.headers.update(_headers())
+            _session = session
+    return _session
+
+
+def _credential_semaphore() -> threading.BoundedSemaphore:
+    with _session_lock:
+        if NAVER_CLIENT_ID not in _credential_semaphores:
+            _credential_semaphores[NAVER_CLIENT_ID] = threading.BoundedSemaphore(NAVER_MAX_CONCURRENCY_PER_CREDENTIAL)
+        return _credential_semaphores[NAVER_CLIENT_ID]
+
+
+def _async_credential_semaphore() -> asyncio.Semaphore:
+    # 백그라운드 이벤트 루프 안에서만 호출되므로 별도 잠금 불필요
+    if NAVER_CLIENT_ID not in _async_credential_semaphores:
+        _async_credential_semaphores[NAVER_CLIENT_ID] = asyncio.Semaphore(NAVER_MAX_CONCURRENCY_PER_CREDENTIAL)
+    return _async_credential_semaphores[NAVER_CLIENT_ID]
+
+
+def _retry_delay(r, attempt: int, backoff: float) -> Optional[float]:
+    """재시도가 필요하면 대기 시간(초), 아니면 None. 429는 공유 속도 제한도 함께 낮춤"""
+    # 429: too many requests / 5xx: server error
+    if r.status_code == 429 or (500 <= r.status_code <= 599):
+        retry_after = parse_retry_after(r.headers.get("Retry-After"))
+        if r.status_code == 429:
+            _bucket.penalize(retry_after)
+        return backoff_with_jitter(attempt, base=backoff, retry_after=retry_after)
+    _bucket.reward()
+    return None
+
+
 def _get(url: str, params: dict, timeout: int = 20, retries: int = 3, backoff: float = 1.2) -> requests.Response:
+    session = _get_session()
     last = None
     for t in range(retries):
-        r = requests.get(url, headers=_headers(), params=params, timeout=timeout)
+        _bucket.acquire()
+        started = time.perf_counter()
+        try:
+            with _credential_semaphore():
+                r = session.get(url, params=params, timeout=timeout)
+        except requests.RequestException as e:
+            metrics.record_error()
+            if t == retries - 1:
+                raise NaverBlogClientError(f"네이버 API 호출 실패: {e}") from e
+            metrics.record_retry()
+            time.sleep(backoff_with_jitter(t, base=backoff))
+            continue
+        metrics.observe(time.perf_counter() - started, r.status_code)
         last = r
 
-        # 429: too many requests / 5xx: server error
-        if r.status_code in (429,) or (500 <= r.status_code <= 599):
-            time.sleep(backoff * (t + 1))
+        delay = _retry_delay(r, t, backoff)
+        if delay is None:
+            return r
+        if t < retries - 1:
+            metrics.record_retry()
+            time.sleep(delay)
+
+    return last  
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """백그라운드 이벤트 루프 안에서만 호출됩니다 (같은 루프에 묶인 공유 커넥션 풀)."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=20,
+            headers=_headers(),
+            limits=httpx.Limits(
+                max_connections=NAVER_MAX_CONCURRENCY_PER_CREDENTIAL * 2,
+                max_keepalive_connections=NAVER_MAX_CONCURRENCY_PER_CREDENTIAL,
+            ),
+        )
+    return _async_client
+
+
+async def _aget(url: str, params: dict, timeout: int = 20, retries: int = 3, backoff: float = 1.2) -> httpx.Response:
+    client = _get_async_client()
+    last = None
+    for t in range(retries):
+        await _bucket.aacquire()
+        started = time.perf_counter()
+        try:
+            async with _async_credential_semaphore():
+                r = await client.get(url, params=params, timeout=timeout)
+        except httpx.TransportError as e:
+            metrics.record_error()
+            if t == retries - 1:
+                raise NaverBlogClientError(f"네이버 API 호출 실패: {e}") from e
+            metrics.record_retry()
+            await asyncio.sleep(backoff_with_jitter(t, base=backoff))
             continue
+        metrics.observe(time.perf_counter() - started, r.status_code)
+        last = r
 
-        return r
+        delay = _retry_delay(r, t, backoff)
+        if delay is None:
+            return r
+        if t < retries - 1:
+            metrics.record_retry()
+            await asyncio.sleep(delay)
 
-    return last  
+    return last
 
 
 def _parse_postdate(postdate: str) -> Optional[dt.date]:
@@ -83,27 +207,149 @@ def naver_blog_search(
     """
     네이버 블로그 검색 Open API 호출 (원본 JSON 반환)
     """
+    r = _get(NAVER_BLOG_SEARCH_URL, params=_search_params(query, display, start, sort), timeout=20, retries=3)
+    return _check_response(r)
+
+
+async def anaver_blog_search(
+    query: str,
+    display: int = 100,
+    start: int = 1,
+    sort: str = "date",
+) -> Dict[str, Any]:
+    """naver_blog_search의 비동기 버전 (공유 커넥션 풀 + 공유 속도 제한)"""
+    r = await _aget(NAVER_BLOG_SEARCH_URL, params=_search_params(query, display, start, sort), timeout=20, retries=3)
+    return _check_response(r)
+
+
+def _search_params(query: str, display: int, start: int, sort: str) -> dict:
     if display < 1 or display > 100:
         raise ValueError("display는 1~100 범위")
     if start < 1 or start > 1000:
         raise ValueError("start는 1~1000 범위 (API 제한)")
 
-    params = {
+    return {
         "query": query,
         "display": display,
         "start": start,
         "sort": sort,
     }
 
-    r = _get(NAVER_BLOG_SEARCH_URL, params=params, timeout=20, retries=3)
+
+def _check_response(r) -> Dict[str, Any]:
     if r is None:
         raise NaverBlogClientError("네이버 API 호출 실패 (응답 없음)")
     if r.status_code != 200:
         raise NaverBlogClientError(f"네이버 API 오류: {r.status_code} / {r.text}")
-
     return r.json()
 
 
+def _normalize_item(it: Dict[str, Any], query: str) -> Dict[str, Any]:
+    postdate = (it.get("postdate") or "").strip()
+    post_d = _parse_postdate(postdate)
+    return {
+        "source": "naver_blog",
+        "query": query,
+        "title": (it.get("title") or ""),
+        "description": (it.get("description") or ""),
+        "link": (it.get("link") or "").strip(),
+        "bloggername": (it.get("bloggername") or ""),
+        "postdate": postdate,
+        "post_date": post_d,
+        "days_ago": _days_ago(post_d),
+    }
+
+
+async def astream_naver_blog_candidates(
+    queries: List[str],
+    days: int = 7,
+    per_query: int = 200,
+    sort: str = "date",
+    max_concurrency: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    여러 쿼리를 동시에 페이지 단위로 수집하며, 정규화된 글을 수집되는 즉시 하나씩 내보냅니다.
+    - 모든 쿼리가 하나의 속도 제한(NAVER_REQUESTS_PER_SECOND)을 공유
+    - sort="date" 이면 기간(days)을 벗어난 글을 만나는 즉시 해당 쿼리만 중단
+    - 쿼리 간 중복 링크 제거
+    - 일시적인 네트워크 오류는 해당 쿼리만 건너뛰고, 인증 정보 누락/API 오류 응답(NaverBlogClientError)이나
+      잘못된 인자(ValueError) 등 그 밖의 오류는 나머지 쿼리를 취소하고 호출 측으로 다시 발생
+    레코드 스키마는 collect_naver_blog_candidates와 동일합니다.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or NAVER_MAX_CONCURRENT_QUERIES)
+    out: asyncio.Queue = asyncio.Queue()
+    seen_links = set()  # 모든 작업이 같은 이벤트 루프에서 돌기 때문에 별도 잠금 불필요
+    done = object()
+
+    async def crawl_query(q: str):
+        async with semaphore:
+            fetched = 0
+            start = 1
+            while fetched < per_query and start <= 1000:
+                display = min(100, per_query - fetched)
+                data = await anaver_blog_search(query=q, display=display, start=start, sort=sort)
+                items = data.get("items", []) or []
+                if not items:
+                    break
+
+                reached_cutoff = False
+                for it in items:
+                    record = _normalize_item(it, q)
+                    if record["days_ago"] > days:
+                        reached_cutoff = True
+                        continue
+                    if not record["link"] or record["link"] in seen_links:
+                        continue
+                    seen_links.add(record["link"])
+                    await out.put(record)
+
+                fetched += len(items)
+                start += len(items)
+
+                if reached_cutoff and sort == "date":
+                    logger.debug(f"[NaverBlog] '{q}' reached the {days}-day cutoff after {fetched} items.")
+                    break
+
+    async def run(q: str):
+        try:
+            await crawl_query(q)
+        except (httpx.HTTPError, asyncio.TimeoutError, OSError) as e:
+            logger.error(f"[NaverBlog] Crawling failed for query '{q}': {e}")
+        except Exception as e:
+            # NaverBlogClientError/ValueError 등은 다른 쿼리도 똑같이 실패하므로 소비 측에서 다시 발생시킴
+            await out.put(e)
+            return
+        await out.put(done)
+
+    tasks = [asyncio.create_task(run(q)) for q in queries]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            record = await out.get()
+            if record is done:
+                remaining -= 1
+                continue
+            if isinstance(record, Exception):
+                raise record
+            yield record
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def iter_naver_blog_candidates(
+    queries: List[str],
+    days: int = 7,
+    per_query: int = 200,
+    sort: str = "date",
+    max_concurrency: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """동기 코드(그래프 노드 등)에서 스트리밍 수집 결과를 하나씩 받기 위한 래퍼"""
+    return iter_async_generator_sync(astream_naver_blog_candidates(
+        queries, days=days, per_query=per_query, sort=sort, max_concurrency=max_concurrency,
+    ))
+
+
 def collect_naver_blog_candidates(
     queries: List[str],
     days: int = 7,
@@ -116,6 +362,7 @@ def collect_naver_blog_candidates(
     - 중복 URL 제거
     - postdate 기준 최근 days일 이내만 필터
     - 공통 스키마로 반환
+    (sleep_sec는 하위 호환용이며, 요청 간격은 공유 속도 제한으로 조절됩니다)
 
     반환 스키마(예시):
     {
@@ -130,59 +377,7 @@ def collect_naver_blog_candidates(
       "days_ago": float
     }
     """
-    out: List[Dict[str, Any]] = []
-    seen_links = set()
-
-    for q in queries:
-        fetched = 0
-        start = 1
-
-        while fetched < per_query:
-            display = min(100, per_query - fetched)
-            data = naver_blog_search(query=q, display=display, start=start, sort=sort)
-            items = data.get("items", []) or []
-            if not items:
-                break
-
-            for it in items:
-                link = (it.get("link") or "").strip()
-                if not link or link in seen_links:
-                    continue
-
-                postdate = (it.get("postdate") or "").strip()
-                post_d = _parse_postdate(postdate)
-                ago = _days_ago(post_d)
-
-                if ago > days:
-                    if sort == "date":
-                        items = []  
-                    continue
-
-                seen_links.add(link)
-
-                out.append({
-                    "source": "naver_blog",
-                    "query": q,
-                    "title": (it.get("title") or ""),
-                    "description": (it.get("description") or ""),
-                    "link": link,
-                    "bloggername": (it.get("bloggername") or ""),
-                    "postdate": postdate,
-                    "post_date": post_d,
-                    "days_ago": ago,
-                })
-
-            fetched += len(items)
-            start += len(items)
-
-            # 네이버 Open API start는 최대 1000 제한
-            if start > 1000:
-                break
-
-            time.sleep(sleep_sec)
-
-            if not items and sort == "date":
-                break
+    out = list(iter_naver_blog_candidates(queries, days=days, per_query=per_query, sort=sort))
 
     # 최신순 정렬
     out.sort(key=lambda x: (x.get("days_ago", 9999.0), x.get("link", "")))
@@ -1,7 +1,17 @@
 import os, time, requests, datetime
-from typing import List, Dict, Any, Optional
+import asyncio
+import math
+from typing import List, Dict, Any, Optional, Tuple, Union
 from dotenv import load_dotenv
+import httpx
 import pandas as pd
+from app.core.concurrency import run_coroutine_sync
+from app.core.rate_limit import TokenBucket, DailyQuota, QuotaExceededError, backoff_with_jitter, parse_retry_after
+from app.core.logger import logger
+from app.repository.cache.http_cache import HttpResponseCache, get_http_cache
+from app.repository.cache.crawl_state import get_crawl_state_store
+from app.repository.cache.quota_store import get_daily_quota
+from app.service.trend_score_service import compute_trend_features, score_trend_features
 
 load_dotenv()
 
@@ -11,17 +21,139 @@ BASE = "https://www.googleapis.com/youtube/v3"
 if not YOUTUBE_API_KEY:
     raise RuntimeError("YOUTUBE_API_KEY가 비어있음 (.env 확인)")
 
-def _get(url: str, params: dict, timeout=30, retries=3):
+# 비동기 클라이언트 커넥션 풀 설정 (백그라운드 이벤트 루프에서 요청 간 공유)
+YOUTUBE_MAX_CONNECTIONS = int(os.getenv("YOUTUBE_MAX_CONNECTIONS", "10"))
+_async_client: Optional[httpx.AsyncClient] = None
+
+# 할당량(quota) 설정: 엔드포인트별 단위 비용, 일일 예산(태평양 시간 자정 초기화), 초당 요청 수
+UNIT_COSTS = {"search": 100, "videos": 1}
+YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+YOUTUBE_QUOTA_RESERVE = int(os.getenv("YOUTUBE_QUOTA_RESERVE", "200"))
+YOUTUBE_REQUESTS_PER_SECOND = float(os.getenv("YOUTUBE_REQUESTS_PER_SECOND", "5"))
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+
+# 사용량은 SQLite에 기록하여 재시작/여러 워커 간에도 같은 예산을 공유 (열 수 없으면 프로세스 메모리)
+_quota = get_daily_quota("youtube", YOUTUBE_DAILY_QUOTA) or DailyQuota(YOUTUBE_DAILY_QUOTA)
+_bucket = TokenBucket(rate=YOUTUBE_REQUESTS_PER_SECOND)
+
+
+# 응답 캐시 TTL(초): 검색 결과는 짧게, 영상 통계는 길게 (최근 게시된 '핫' 영상은 짧게)
+YOUTUBE_SEARCH_TTL = int(os.getenv("YOUTUBE_SEARCH_TTL", "600"))
+YOUTUBE_STATS_TTL = int(os.getenv("YOUTUBE_STATS_TTL", "21600"))
+YOUTUBE_STATS_HOT_TTL = int(os.getenv("YOUTUBE_STATS_HOT_TTL", "900"))
+YOUTUBE_HOT_VIDEO_HOURS = float(os.getenv("YOUTUBE_HOT_VIDEO_HOURS", "48"))
+
+# 트렌드 점수 가중치 프리셋(trend_score_service.WEIGHTINGS)과 정규화 방식("percentile" 또는 빈 값)
+TREND_SCORE_WEIGHTING = os.getenv("TREND_SCORE_WEIGHTING", "default")
+TREND_SCORE_NORMALIZE = os.getenv("TREND_SCORE_NORMALIZE", "")
+
+
+class YouTubeQuotaExceededError(QuotaExceededError):
+    """일일 할당량 예산이 부족하거나 서버가 quotaExceeded를 반환한 경우"""
+
+
+class YouTubeRateLimitError(RuntimeError):
+    """재시도 후에도 403/429 속도 제한 응답이 계속되는 경우"""
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """백그라운드 이벤트 루프 안에서만 호출됩니다 (같은 루프에 묶인 공유 커넥션 풀)."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            base_url=BASE,
+            timeout=30,
+            limits=httpx.Limits(max_connections=YOUTUBE_MAX_CONNECTIONS, max_keepalive_connections=YOUTUBE_MAX_CONNECTIONS),
+        )
+    return _async_client
+
+def remaining_budget() -> Dict[str, Any]:
+    """남은 일일 할당량과 현재 요청 속도"""
+    return {
+        "remaining_units": _quota.remaining(),
+        "daily_quota": YOUTUBE_DAILY_QUOTA,
+        "requests_per_second": round(_bucket.rate, 2),
+    }
+
+def plan_search_pages(num_searches: int, pages: int, per_page: int = 50) -> int:
+    """
+    남은 할당량으로 감당 가능한 검색 페이지 수 (검색 1페이지 + 해당 영상 통계 조회 비용 기준).
+    예약분(YOUTUBE_QUOTA_RESERVE)은 남겨 두어 동시 사용자의 요청이 중간에 끊기지 않도록 합니다.
+    """
+    if num_searches <= 0 or pages <= 0:
+        return 0
+    page_cost = num_searches * (UNIT_COSTS["search"] + math.ceil(min(per_page, 50) / 50) * UNIT_COSTS["videos"])
+    affordable = (_quota.remaining() - YOUTUBE_QUOTA_RESERVE) // page_cost
+    return int(max(0, min(pages, affordable)))
+
+def _charge(endpoint: str) -> int:
+    """요청 1회 비용을 예산에서 차감하고 차감한 단위 수를 반환합니다. (요청이 전송되지 못하면 refund)"""
+    cost = UNIT_COSTS.get(endpoint, 1)
+    if not _quota.try_consume(cost):
+        raise YouTubeQuotaExceededError(
+            f"YouTube API 일일 할당량 부족: '{endpoint}' 요청 비용 {cost}, 남은 예산 {_quota.remaining()}"
+        )
+    return cost
+
+def _error_reason(r) -> str:
+    try:
+        return ((r.json().get("error") or {}).get("errors") or [{}])[0].get("reason", "")
+    except Exception:
+        return ""
+
+def _retry_delay(r, endpoint: str, attempt: int) -> Optional[float]:
+    """
+    403/429 응답 처리. 할당량 소진이면 예외, 속도 제한이면 재시도 전 대기 시간(초), 그 밖에는 None.
+    Retry-After는 공유 버킷을 그 시간 동안 멈추는 것으로 반영하므로(다음 acquire에서 대기) 여기서는 jitter만 더함
+    """
+    if r.status_code not in (403, 429):
+        _bucket.reward()
+        return None
+    reason = _error_reason(r)
+    if reason in QUOTA_REASONS:
+        _quota.exhaust()
+        raise YouTubeQuotaExceededError(f"YouTube API 할당량 초과 응답 ({endpoint}: {reason})")
+    if r.status_code == 403 and "rateLimit" not in reason:
+        # 권한 오류 등 재시도해도 의미 없는 403은 호출 측 raise_for_status에서 처리
+        return None
+    _bucket.penalize(parse_retry_after(r.headers.get("Retry-After")))
+    return backoff_with_jitter(attempt)
+
+def _get(url: str, params: dict, timeout=30, retries=3, headers: Optional[dict] = None):
+    endpoint = url.rstrip("/").rsplit("/", 1)[-1]
     for t in range(retries):
-        r = requests.get(url, params=params, timeout=timeout)
-        if r.status_code in (403, 429):  # quota/too many
-            time.sleep(1.5 * (t + 1))
-            continue
-        return r
-    return r
+        cost = _charge(endpoint)
+        _bucket.acquire()
+        try:
+            r = requests.get(url, params=params, timeout=timeout, headers=headers)
+        except requests.RequestException:
+            _quota.refund(cost)
+            raise
+        delay = _retry_delay(r, endpoint, t)
+        if delay is None:
+            return r
+        time.sleep(delay)
+    raise YouTubeRateLimitError(f"YouTube API 속도 제한: {retries}회 재시도 후에도 '{endpoint}' 요청 실패")
 
-def yt_search(query: str, max_results: int = 50, days: int = 30, pages: int = 1, published_after_date: Optional[str] = None) -> List[Dict[str, Any]]:
-    
+async def _aget(path: str, params: dict, timeout=30, retries=3, headers: Optional[dict] = None) -> httpx.Response:
+    endpoint = path.rstrip("/").rsplit("/", 1)[-1]
+    client = _get_async_client()
+    for t in range(retries):
+        # 영구 예산은 SQLite 트랜잭션(BEGIN IMMEDIATE)을 쓰므로 이벤트 루프를 막지 않도록 스레드에서 차감
+        cost = await asyncio.to_thread(_charge, endpoint)
+        await _bucket.aacquire()
+        try:
+            r = await client.get(path, params=params, timeout=timeout, headers=headers)
+        except httpx.TransportError:
+            await asyncio.to_thread(_quota.refund, cost)
+            raise
+        delay = _retry_delay(r, endpoint, t)
+        if delay is None:
+            return r
+        await asyncio.sleep(delay)
+    raise YouTubeRateLimitError(f"YouTube API 속도 제한: {retries}회 재시도 후에도 '{endpoint}' 요청 실패")
+
+def _search_params(query: str, max_results: int, days: int, published_after_date: Optional[str], published_before_date: Optional[str], region: str = "KR") -> dict:
     if published_after_date:
         # If a specific start date is provided, use it directly. Ensure it's in the correct format.
         published_after = published_after_date
@@ -29,52 +161,168 @@ def yt_search(query: str, max_results: int = 50, days: int = 30, pages: int = 1,
         # Fallback to the relative 'days' calculation if no specific date is given.
         published_after = (datetime.datetime.utcnow() - datetime.timedelta(days=days)).isoformat("T") + "Z"
 
+    params = {
+        "key": YOUTUBE_API_KEY,
+        "part": "snippet",
+        "q": query,
+        "type": "video",
+        "maxResults": min(max_results, 50),
+        "publishedAfter": published_after,
+        "relevanceLanguage": "ko",
+        "regionCode": region,
+        "safeSearch": "none",
+        "order": "date",
+    }
+    if published_before_date:
+        params["publishedBefore"] = published_before_date
+    return params
+
+def _parse_search_items(data: dict) -> List[Dict[str, Any]]:
+    items_out = []
+    for it in data.get("items", []):
+        vid = (it.get("id") or {}).get("videoId")
+        sn = it.get("snippet") or {}
+        if not vid or not sn:
+            continue
+        items_out.append({
+            "video_id": vid,
+            "title": sn.get("title", ""),
+            "description": sn.get("description", ""),
+            "published_at": sn.get("publishedAt", ""),
+            "channel_title": sn.get("channelTitle", ""),
+        })
+    return items_out
+
+def _parse_stats_items(data: dict) -> Dict[str, Dict[str, Any]]:
+    out = {}
+    for it in data.get("items", []):
+        vid = it.get("id")
+        stat = it.get("statistics", {}) or {}
+        if not vid:
+            continue
+        out[vid] = {
+            "viewCount": int(stat.get("viewCount", 0) or 0),
+            "likeCount": int(stat.get("likeCount", 0) or 0) if "likeCount" in stat else 0,
+            "commentCount": int(stat.get("commentCount", 0) or 0) if "commentCount" in stat else 0,
+        }
+    return out
+
+def _search_cache_key(params: dict) -> str:
+    # 상대 기간('days')으로 만든 publishedAfter는 호출마다 초 단위로 달라지므로 시간 단위로 잘라 키를 정규화
+    normalized = dict(params)
+    for k in ("publishedAfter", "publishedBefore"):
+        if normalized.get(k):
+            normalized[k] = normalized[k][:13]
+    return HttpResponseCache.make_key("youtube:search", normalized)
+
+def _lookup_search_page(params: dict):
+    """(cache, key, entry, headers) - 신선한 캐시가 있으면 entry['fresh']가 True"""
+    cache = get_http_cache()
+    if cache is None:
+        return None, None, None, None
+    key = _search_cache_key(params)
+    entry = cache.get(key)
+    headers = {"If-None-Match": entry["etag"]} if entry and entry.get("etag") else None
+    return cache, key, entry, headers
+
+def _store_search_page(cache, key, entry, r) -> dict:
+    if r.status_code == 304 and entry:
+        # 조건부 재검증 성공: 캐시된 본문을 그대로 쓰고 만료 시각만 연장
+        cache.refresh(key, YOUTUBE_SEARCH_TTL)
+        return entry["body"]
+    r.raise_for_status()
+    data = r.json()
+    if cache is not None:
+        cache.put(key, data, YOUTUBE_SEARCH_TTL, etag=r.headers.get("ETag") or data.get("etag"))
+    return data
+
+def _fetch_search_page(params: dict) -> dict:
+    cache, key, entry, headers = _lookup_search_page(params)
+    if entry and entry["fresh"]:
+        return entry["body"]
+    r = _get(f"{BASE}/search", params=params, timeout=30, headers=headers)
+    return _store_search_page(cache, key, entry, r)
+
+async def _afetch_search_page(params: dict) -> dict:
+    cache, key, entry, headers = _lookup_search_page(params)
+    if entry and entry["fresh"]:
+        return entry["body"]
+    r = await _aget("/search", params=params, timeout=30, headers=headers)
+    return _store_search_page(cache, key, entry, r)
+
+def _stats_ttl(published_at: Optional[str]) -> int:
+    """최근 게시된 영상은 조회수가 빠르게 변하므로 짧은 TTL로 자주 갱신"""
+    if published_at and days_since(published_at) * 24 <= YOUTUBE_HOT_VIDEO_HOURS:
+        return YOUTUBE_STATS_HOT_TTL
+    return YOUTUBE_STATS_TTL
+
+def _cached_stats(video_ids: List[str]):
+    """(캐시에서 찾은 {video_id: stats}, 새로 조회해야 할 video_id 목록)"""
+    unique_ids = list(dict.fromkeys(video_ids))
+    cache = get_http_cache()
+    if cache is None:
+        return {}, unique_ids
+    found = cache.get_many_fresh([f"youtube:videos:{vid}" for vid in unique_ids])
+    cached = {k.rsplit(":", 1)[-1]: v for k, v in found.items()}
+    return cached, [vid for vid in unique_ids if vid not in cached]
+
+def _store_stats(stats: Dict[str, Dict[str, Any]], published_at_map: Optional[Dict[str, str]]):
+    cache = get_http_cache()
+    if cache is None or not stats:
+        return
+    published_at_map = published_at_map or {}
+    cache.put_many({
+        f"youtube:videos:{vid}": (st, _stats_ttl(published_at_map.get(vid)))
+        for vid, st in stats.items()
+    })
+
+def yt_search(query: str, max_results: int = 50, days: int = 30, pages: int = 1, published_after_date: Optional[str] = None, published_before_date: Optional[str] = None) -> List[Dict[str, Any]]:
     items_out = []
     page_token = None
 
     for _ in range(pages):
-        params = {
-            "key": YOUTUBE_API_KEY,
-            "part": "snippet",
-            "q": query,
-            "type": "video",
-            "maxResults": min(max_results, 50),
-            "publishedAfter": published_after,
-            "relevanceLanguage": "ko",
-            "regionCode": "KR",
-            "safeSearch": "none",
-            "order": "date",
-        }
+        params = _search_params(query, max_results, days, published_after_date, published_before_date)
         if page_token:
             params["pageToken"] = page_token
 
-        r = _get(f"{BASE}/search", params=params, timeout=30)
-        r.raise_for_status()
-        data = r.json()
+        data = _fetch_search_page(params)
+        items_out.extend(_parse_search_items(data))
 
-        for it in data.get("items", []):
-            vid = (it.get("id") or {}).get("videoId")
-            sn = it.get("snippet") or {}
-            if not vid or not sn:
-                continue
-            items_out.append({
-                "video_id": vid,
-                "title": sn.get("title", ""),
-                "description": sn.get("description", ""),
-                "published_at": sn.get("publishedAt", ""),
-                "channel_title": sn.get("channelTitle", ""),
-            })
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            break
+
+    return items_out
+
+async def _ayt_search_pages(query: str, max_results: int, days: int, pages: int, published_after_date: Optional[str], published_before_date: Optional[str], region: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """(검색 결과, 마지막 페이지까지 받았는지) - pages 제한으로 멈췄으면 False"""
+    items_out = []
+    page_token = None
+
+    for _ in range(pages):
+        params = _search_params(query, max_results, days, published_after_date, published_before_date, region)
+        if page_token:
+            params["pageToken"] = page_token
+
+        data = await _afetch_search_page(params)
+        items_out.extend(_parse_search_items(data))
 
         page_token = data.get("nextPageToken")
         if not page_token:
             break
 
+    return items_out, not page_token
+
+async def ayt_search(query: str, max_results: int = 50, days: int = 30, pages: int = 1, published_after_date: Optional[str] = None, published_before_date: Optional[str] = None, region: str = "KR") -> List[Dict[str, Any]]:
+    """yt_search의 비동기 버전 (pageToken 때문에 한 쿼리 내 페이지는 순차 요청)"""
+    items_out, _ = await _ayt_search_pages(query, max_results, days, pages, published_after_date, published_before_date, region)
     return items_out
 
-def yt_videos_stats(video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
-    out = {}
-    for i in range(0, len(video_ids), 50): 
-        chunk = ",".join(video_ids[i:i+50])
+def yt_videos_stats(video_ids: List[str], published_at_map: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+    out, missing = _cached_stats(video_ids)
+    fetched = {}
+    for i in range(0, len(missing), 50): 
+        chunk = ",".join(missing[i:i+50])
         params = {
             "key": YOUTUBE_API_KEY,
             "part": "statistics",
@@ -82,17 +330,30 @@ def yt_videos_stats(video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
         }
         r = _get(f"{BASE}/videos", params=params, timeout=30)
         r.raise_for_status()
+        fetched.update(_parse_stats_items(r.json()))
+    _store_stats(fetched, published_at_map)
+    out.update(fetched)
+    return out
+
+async def ayt_videos_stats(video_ids: List[str], published_at_map: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+    """캐시에 없는 영상만 50개 단위로 동시에 요청하는 yt_videos_stats의 비동기 버전"""
+    async def fetch_chunk(chunk_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        params = {
+            "key": YOUTUBE_API_KEY,
+            "part": "statistics",
+            "id": ",".join(chunk_ids)
+        }
+        r = await _aget("/videos", params=params, timeout=30)
+        r.raise_for_status()
+        return _parse_stats_items(r.json())
 
-        for it in r.json().get("items", []):
-            vid = it.get("id")
-            stat = it.get("statistics", {}) or {}
-            if not vid:
-                continue
-            out[vid] = {
-                "viewCount": int(stat.get("viewCount", 0) or 0),
-                "likeCount": int(stat.get("likeCount", 0) or 0) if "likeCount" in stat else 0,
-                "commentCount": int(stat.get("commentCount", 0) or 0) if "commentCount" in stat else 0,
-            }
+    out, missing = _cached_stats(video_ids)
+    chunks = [missing[i:i+50] for i in range(0, len(missing), 50)]
+    fetched = {}
+    for part in await asyncio.gather(*(fetch_chunk(c) for c in chunks)):
+        fetched.update(part)
+    _store_stats(fetched, published_at_map)
+    out.update(fetched)
     return out
 
 def days_since(published_at: str) -> float:
@@ -102,49 +363,145 @@ def days_since(published_at: str) -> float:
     delta = datetime.datetime.now(datetime.timezone.utc) - dt
     return max(delta.total_seconds() / 86400.0, 0.5)
 
-def trend_score(stats: Dict[str, Any], published_at: str) -> float:
-    v = stats.get("viewCount", 0)
-    l = stats.get("likeCount", 0)
-    c = stats.get("commentCount", 0)
-    d = days_since(published_at)
 
-    views_per_day = v / d
-    like_ratio = (l / v) if v else 0
-    comment_ratio = (c / v) if v else 0
-    return (views_per_day * 0.6) + (like_ratio * 100000 * 0.2) + (comment_ratio * 100000 * 0.2)
+def _apply_stats_and_scores(videos: List[Dict[str, Any]], stats_map: Dict[str, Dict[str, Any]]):
+    """통계를 영상에 합치고, 이번 수집분 전체의 트렌드 점수를 한 번에(벡터화) 계산합니다."""
+    empty = {"viewCount":0,"likeCount":0,"commentCount":0}
+    for v in videos:
+        v.update(stats_map.get(v["video_id"], empty))
+    if not videos:
+        return
+    features = compute_trend_features(
+        [v["viewCount"] for v in videos],
+        [v["likeCount"] for v in videos],
+        [v["commentCount"] for v in videos],
+        [v["published_at"] or None for v in videos],
+    )
+    scores = score_trend_features(features, weights=TREND_SCORE_WEIGHTING, normalize=TREND_SCORE_NORMALIZE or None)
+    for v, score in zip(videos, scores):
+        v["score"] = float(score)
+
 """
 현재 30일 기준임. 50개씩 페이지 3개
 """
-def collect_youtube_trend_candidates(query: str, days=30, per_query=50, pages=1, published_after_date: Optional[str] = None) -> List[Dict[str, Any]]:
+async def acollect_youtube_trend_candidates(query: Union[str, List[str], None], days=30, per_query=50, pages=1, published_after_date: Optional[str] = None, published_before_date: Optional[str] = None) -> List[Dict[str, Any]]:
+    """여러 쿼리를 동시에 검색하고, 통계 요청도 병렬로 보내는 비동기 수집기"""
     if not query:
         # Fallback to a default query if none is provided
         queries = ["요즘 유행"]
-    else:
+    elif isinstance(query, str):
         # Use only the provided query for broader search scope
         queries = [query]
+    else:
+        queries = list(query)
+
+    # 남은 할당량에 맞춰 페이지 수를 줄이고, 한 페이지도 감당할 수 없으면 요청 자체를 거절
+    allowed_pages = plan_search_pages(len(queries), pages, per_query)
+    if allowed_pages <= 0:
+        raise YouTubeQuotaExceededError(f"YouTube API 할당량 부족으로 수집을 건너뜁니다. (남은 예산: {_quota.remaining()})")
+    if allowed_pages < pages:
+        logger.warning(f"[YouTube] Quota budget low ({_quota.remaining()} units). Shrinking pages {pages} -> {allowed_pages}.")
+        pages = allowed_pages
+
+    search_results = await asyncio.gather(*(
+        ayt_search(q, max_results=per_query, days=days, pages=pages, published_after_date=published_after_date, published_before_date=published_before_date)
+        for q in queries
+    ))
 
     videos = []
     seen = set()
-
-    for q in queries:
-        for v in yt_search(q, max_results=per_query, days=days, pages=pages, published_after_date=published_after_date):
+    for items in search_results:
+        for v in items:
             if v["video_id"] in seen:
                 continue
             seen.add(v["video_id"])
             videos.append(v)
 
-    stats_map = yt_videos_stats([v["video_id"] for v in videos])
+    stats_map = await ayt_videos_stats(
+        [v["video_id"] for v in videos],
+        published_at_map={v["video_id"]: v["published_at"] for v in videos},
+    )
 
-    for v in videos:
-        st = stats_map.get(v["video_id"], {"viewCount":0,"likeCount":0,"commentCount":0})
-        v.update(st)
-        v["score"] = trend_score(st, v["published_at"])
+    _apply_stats_and_scores(videos, stats_map)
 
     videos.sort(key=lambda x: x["score"], reverse=True)
     return videos
 
-def collect_youtube_trend_candidates_df(query: str, days=30, per_query=50, pages=1, published_after_date: Optional[str] = None) -> pd.DataFrame:
-    videos = collect_youtube_trend_candidates(query=query, days=days, per_query=per_query, pages=pages, published_after_date=published_after_date)
+def collect_youtube_trend_candidates(query: Union[str, List[str], None], days=30, per_query=50, pages=1, published_after_date: Optional[str] = None, published_before_date: Optional[str] = None) -> List[Dict[str, Any]]:
+    return run_coroutine_sync(acollect_youtube_trend_candidates(
+        query=query, days=days, per_query=per_query, pages=pages,
+        published_after_date=published_after_date, published_before_date=published_before_date,
+    ))
+
+def _rfc3339(dt: datetime.datetime) -> str:
+    return dt.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+async def acollect_youtube_trend_candidates_incremental(query: str, days=30, per_query=50, pages=1, published_after_date: Optional[str] = None, region: str = "KR") -> List[Dict[str, Any]]:
+    """
+    watermark 기반 증분 수집기 (기간의 끝이 '현재'인 경우용)
+    - (query, region) 별로 이미 수집한 가장 최신 published_at 이후의 영상만 검색
+      (저장소가 이번 기간의 시작부터 빠짐없이 수집한 상태가 아니면 기간 전체를 검색)
+    - 트렌드 기간 안에 남아 있는 기존 영상은 다시 검색하지 않고 통계만 갱신해 병합
+    published_after_date(RFC3339)는 트렌드 기간의 시작이며, 없으면 현재 - days
+    """
+    store = get_crawl_state_store()
+    if store is None or not query:
+        return await acollect_youtube_trend_candidates(query, days=days, per_query=per_query, pages=pages, published_after_date=published_after_date)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    window_start = published_after_date or _rfc3339(now - datetime.timedelta(days=days))
+    try:
+        window_days = (now - datetime.datetime.strptime(window_start, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc)).total_seconds() / 86400
+    except ValueError:
+        window_days = float(days)
+
+    # watermark는 covered_from 이후를 빠짐없이 수집했을 때만 유효. 이번 기간이 더 이르게 시작하면 전체 검색
+    state = store.get_state(query, region)
+    if state and state["covered_from"] and state["covered_from"] <= window_start:
+        search_after = max(state["watermark"], window_start)
+        covered_from = state["covered_from"]
+    else:
+        search_after = window_start
+        covered_from = window_start
+
+    allowed_pages = plan_search_pages(1, pages, per_query)
+    if allowed_pages <= 0:
+        raise YouTubeQuotaExceededError(f"YouTube API 할당량 부족으로 수집을 건너뜁니다. (남은 예산: {_quota.remaining()})")
+
+    logger.info(f"[YouTube] Incremental crawl for '{query}'/{region}: searching after {search_after} (window start {window_start})")
+    new_items, exhausted = await _ayt_search_pages(query, per_query, days, allowed_pages, search_after, None, region)
+
+    videos = []
+    seen = set()
+    for v in new_items + store.known_videos(query, region, since=window_start):
+        if v["video_id"] in seen:
+            continue
+        seen.add(v["video_id"])
+        videos.append(v)
+
+    stats_map = await ayt_videos_stats(
+        [v["video_id"] for v in videos],
+        published_at_map={v["video_id"]: v["published_at"] for v in videos},
+    )
+    _apply_stats_and_scores(videos, stats_map)
+
+    # 페이지 제한으로 멈췄으면 마지막 페이지 이후(더 오래된) 영상이 빠졌으므로 watermark/covered_from을 올리지 않음
+    if not exhausted:
+        logger.warning(f"[YouTube] Incremental crawl for '{query}'/{region} stopped at {allowed_pages} page(s) before the end. Keeping the previous watermark.")
+    store.record(query, region, new_items, searched_after=search_after, covered_from=covered_from, window_days=window_days, complete=exhausted)
+    store.prune(query, region)
+    logger.info(f"[YouTube] Incremental crawl: {len(new_items)} new + {len(videos) - len(new_items)} known videos in window.")
+
+    videos.sort(key=lambda x: x["score"], reverse=True)
+    return videos
+
+def collect_youtube_trend_candidates_incremental(query: str, days=30, per_query=50, pages=1, published_after_date: Optional[str] = None, region: str = "KR") -> List[Dict[str, Any]]:
+    return run_coroutine_sync(acollect_youtube_trend_candidates_incremental(
+        query=query, days=days, per_query=per_query, pages=pages,
+        published_after_date=published_after_date, region=region,
+    ))
+
+def _videos_to_df(videos: List[Dict[str, Any]]) -> pd.DataFrame:
     df = pd.DataFrame(videos)
 
     if df.empty:
@@ -164,6 +521,14 @@ def collect_youtube_trend_candidates_df(query: str, days=30, per_query=50, pages
 
     return df
 
+def collect_youtube_trend_candidates_df(query: str, days=30, per_query=50, pages=1, published_after_date: Optional[str] = None, published_before_date: Optional[str] = None) -> pd.DataFrame:
+    videos = collect_youtube_trend_candidates(query=query, days=days, per_query=per_query, pages=pages, published_after_date=published_after_date, published_before_date=published_before_date)
+    return _videos_to_df(videos)
+
+def collect_youtube_trend_candidates_incremental_df(query: str, days=30, per_query=50, pages=1, published_after_date: Optional[str] = None, region: str = "KR") -> pd.DataFrame:
+    videos = collect_youtube_trend_candidates_incremental(query=query, days=days, per_query=per_query, pages=pages, published_after_date=published_after_date, region=region)
+    return _videos_to_df(videos)
+
 if __name__ == "__main__":
     df = collect_youtube_trend_candidates_df(days=30, per_query=50, pages=1)
     print(df.head(10))
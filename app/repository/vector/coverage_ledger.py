@@ -0,0 +1,202 @@
+# app/repository/vector/coverage_ledger.py
+import os
+import time
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import List, Tuple, Dict, Optional
+
+from app.core.logger import logger
+
+DATE_FMT = "%Y-%m-%d"
+
+
+def _to_date(day: str):
+    return datetime.strptime(day, DATE_FMT).date()
+
+
+def _to_str(d) -> str:
+    return d.strftime(DATE_FMT)
+
+
+def _last_complete_day():
+    """오늘은 이후에도 새 영상이 올라오므로 수집 완료로 볼 수 있는 마지막 날은 어제"""
+    return datetime.now().date() - timedelta(days=1)
+
+
+class CoverageLedger:
+    """
+    실제로 크롤링을 완료한 (category, sns) 별 날짜 구간을 기록하는 원장 (SQLite)
+    - 구간은 양 끝 날짜를 포함하며, 겹치거나 맞닿은 구간은 기록 시 하나로 병합
+    - 요청 기간 중 아직 수집하지 않은 빈 구간(gap)을 컬렉션 스캔 없이 계산
+    - 오늘은 이후에도 새 영상이 올라오므로 완료 구간에 넣지 않고, 수집 시각만 따로 기록하여
+      today_ttl_seconds 동안만 수집된 것으로 취급 (TTL이 지나면 [오늘, 오늘] 구간을 다시 수집)
+    """
+
+    def __init__(self, path: str, today_ttl_seconds: float = 3 * 3600):
+        self.path = path
+        self.today_ttl_seconds = today_ttl_seconds
+        self._lock = threading.Lock()
+
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS coverage (
+                category TEXT NOT NULL,
+                sns TEXT NOT NULL,
+                start_day TEXT NOT NULL,
+                end_day TEXT NOT NULL,
+                PRIMARY KEY (category, sns, start_day)
+            );
+            CREATE TABLE IF NOT EXISTS partial_days (
+                category TEXT NOT NULL,
+                sns TEXT NOT NULL,
+                day TEXT NOT NULL,
+                recorded_at REAL NOT NULL,
+                PRIMARY KEY (category, sns, day)
+            );
+            CREATE TABLE IF NOT EXISTS ledger_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+        self._conn.commit()
+
+    def ensure_collection(self, collection_id: str):
+        """컬렉션이 리셋되어 id가 바뀌었다면 기존 커버리지 기록은 무효이므로 비웁니다."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM ledger_meta WHERE key = 'collection_id'").fetchone()
+            if row and row[0] == collection_id:
+                return
+            if row:
+                logger.info("[CoverageLedger] Collection changed. Clearing crawl coverage ledger.")
+                self._conn.execute("DELETE FROM coverage")
+                self._conn.execute("DELETE FROM partial_days")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ledger_meta (key, value) VALUES ('collection_id', ?)", (collection_id,)
+            )
+            self._conn.commit()
+
+    def intervals(self, category: str, sns: str) -> List[Tuple[str, str]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT start_day, end_day FROM coverage WHERE category = ? AND sns = ? ORDER BY start_day",
+                (category, sns),
+            ).fetchall()
+
+    def record(self, category: str, sns: str, start_day: str, end_day: str):
+        """
+        [start_day, end_day] 구간을 수집 완료로 기록하고, 겹치거나 인접한 구간과 병합합니다.
+        어제까지만 완료 구간으로 기록하고, 오늘이 포함되면 오늘의 수집 시각을 따로 기록합니다.
+        """
+        today = datetime.now().date()
+        new_start, new_end = _to_date(start_day), min(_to_date(end_day), _last_complete_day())
+        includes_today = _to_date(start_day) <= today <= _to_date(end_day)
+
+        with self._lock:
+            if includes_today:
+                self._conn.execute("DELETE FROM partial_days WHERE day < ?", (_to_str(today),))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO partial_days (category, sns, day, recorded_at) VALUES (?, ?, ?, ?)",
+                    (category, sns, _to_str(today), time.time()),
+                )
+
+            if new_start <= new_end:
+                # 하루 차이로 맞닿은 구간까지 병합 대상
+                rows = self._conn.execute(
+                    "SELECT start_day, end_day FROM coverage "
+                    "WHERE category = ? AND sns = ? AND start_day <= ? AND end_day >= ?",
+                    (category, sns, _to_str(new_end + timedelta(days=1)), _to_str(new_start - timedelta(days=1))),
+                ).fetchall()
+                for s, e in rows:
+                    new_start = min(new_start, _to_date(s))
+                    new_end = max(new_end, _to_date(e))
+
+                self._conn.executemany(
+                    "DELETE FROM coverage WHERE category = ? AND sns = ? AND start_day = ?",
+                    [(category, sns, s) for s, _ in rows],
+                )
+                self._conn.execute(
+                    "INSERT INTO coverage (category, sns, start_day, end_day) VALUES (?, ?, ?, ?)",
+                    (category, sns, _to_str(new_start), _to_str(new_end)),
+                )
+            self._conn.commit()
+
+        if new_start <= new_end:
+            logger.info(f"[CoverageLedger] Recorded coverage {category}/{sns}: {_to_str(new_start)} ~ {_to_str(new_end)}")
+        if includes_today:
+            logger.info(f"[CoverageLedger] Recorded partial coverage {category}/{sns}: {_to_str(today)}")
+
+    def _today_is_fresh(self, category: str, sns: str) -> bool:
+        """오늘 수집 기록이 today_ttl_seconds 이내이면 오늘도 수집된 것으로 취급"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT recorded_at FROM partial_days WHERE category = ? AND sns = ? AND day = ?",
+                (category, sns, _to_str(datetime.now().date())),
+            ).fetchone()
+        return row is not None and time.time() - row[0] < self.today_ttl_seconds
+
+    def gaps(self, category: str, sns: str, start_day: str, end_day: str) -> List[Tuple[str, str]]:
+        """[start_day, end_day] 중 아직 수집 기록이 없는 구간 목록 (양 끝 포함)"""
+        cursor, end = _to_date(start_day), _to_date(end_day)
+        last_complete = _last_complete_day()
+        missing = []
+        for s, e in self.intervals(category, sns):
+            # 완료 구간은 어제까지만 인정 (오늘은 아래에서 TTL로 따로 판단)
+            s, e = _to_date(s), min(_to_date(e), last_complete)
+            if s > e:
+                continue
+            if e < cursor:
+                continue
+            if s > end:
+                break
+            if s > cursor:
+                missing.append((_to_str(cursor), _to_str(s - timedelta(days=1))))
+            cursor = max(cursor, e + timedelta(days=1))
+            if cursor > end:
+                break
+        if cursor <= end:
+            missing.append((_to_str(cursor), _to_str(end)))
+
+        today = last_complete + timedelta(days=1)
+        if not any(_to_date(s) <= today <= _to_date(e) for s, e in missing) or not self._today_is_fresh(category, sns):
+            return missing
+
+        # 최근에 오늘을 수집했다면 오늘을 빈 구간에서 제외
+        trimmed = []
+        for s, e in missing:
+            s, e = _to_date(s), _to_date(e)
+            if not s <= today <= e:
+                trimmed.append((_to_str(s), _to_str(e)))
+                continue
+            if s < today:
+                trimmed.append((_to_str(s), _to_str(today - timedelta(days=1))))
+            if today < e:
+                trimmed.append((_to_str(today + timedelta(days=1)), _to_str(e)))
+        return trimmed
+
+
+_ledger_instances: Dict[str, CoverageLedger] = {}
+_ledger_lock = threading.Lock()
+
+
+def get_coverage_ledger(collection_name: str = "trendmirror_kb") -> Optional[CoverageLedger]:
+    """컬렉션별 프로세스 전역 크롤링 커버리지 원장을 반환합니다. 열 수 없으면 None."""
+    with _ledger_lock:
+        if collection_name not in _ledger_instances:
+            persist_path = os.getenv("CHROMA_PERSIST_PATH", "chroma_tm")
+            index_dir = os.getenv("METADATA_INDEX_DIR", persist_path)
+            path = os.path.join(index_dir, f"tm_coverage_{collection_name}.sqlite3")
+            today_ttl_seconds = float(os.getenv("COVERAGE_TODAY_TTL_HOURS", "3")) * 3600
+            try:
+                _ledger_instances[collection_name] = CoverageLedger(path=path, today_ttl_seconds=today_ttl_seconds)
+            except Exception as e:
+                logger.error(f"[CoverageLedger] Failed to open ledger at '{path}': {e}", exc_info=True)
+                return None
+    return _ledger_instances[collection_name]
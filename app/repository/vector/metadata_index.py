@@ -0,0 +1,278 @@
+# app/repository/vector/metadata_index.py
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from app.core.logger import logger
+
+# published_at이 없는 문서(예: SyncService가 적재한 키워드 빈도 문서)는 day = '' 로 집계
+NO_DAY = ""
+
+
+def _day_of(published_at: Any) -> str:
+    if isinstance(published_at, (int, float)) and not isinstance(published_at, bool):
+        # ChromaDB 기간 필터와 동일하게 로컬 시간 기준 날짜로 변환
+        return datetime.fromtimestamp(published_at).strftime("%Y-%m-%d")
+    return NO_DAY
+
+
+def _split_keywords(keywords_str: Any) -> List[str]:
+    if not keywords_str or not isinstance(keywords_str, str):
+        return []
+    return [kw.strip() for kw in keywords_str.split(",") if kw.strip()]
+
+
+class MetadataIndex:
+    """
+    ChromaDB 메타데이터의 (category, sns, day) 단위 집계 인덱스 (SQLite 사이드카)
+    - 키워드 빈도, 감성 빈도, published_at 최소/최대값을 미리 집계해 두어
+      조회 시 컬렉션 전체를 스캔하지 않고 O(일수 x 키워드) 조회로 처리
+    - upsert/delete 시 문서 단위로 증감 반영
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # 이번 upsert/delete에서 문서가 빠진 (category, sns, day) — _cleanup에서 min/max 재계산 대상
+        self._removed: Set[Tuple[str, str, str]] = set()
+
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id TEXT PRIMARY KEY,
+                category TEXT,
+                sns TEXT,
+                day TEXT NOT NULL,
+                published_at REAL,
+                keywords TEXT,
+                sentiment TEXT
+            );
+            CREATE TABLE IF NOT EXISTS keyword_counts (
+                category TEXT, sns TEXT, day TEXT, keyword TEXT, count INTEGER NOT NULL,
+                PRIMARY KEY (category, sns, day, keyword)
+            );
+            CREATE TABLE IF NOT EXISTS sentiment_counts (
+                category TEXT, sns TEXT, day TEXT, sentiment TEXT, count INTEGER NOT NULL,
+                PRIMARY KEY (category, sns, day, sentiment)
+            );
+            CREATE TABLE IF NOT EXISTS day_stats (
+                category TEXT, sns TEXT, day TEXT, doc_count INTEGER NOT NULL,
+                min_published_at REAL, max_published_at REAL,
+                PRIMARY KEY (category, sns, day)
+            );
+            CREATE TABLE IF NOT EXISTS index_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+        self._conn.commit()
+
+    # ---------------------------------------------------------------
+    # 동기화
+    # ---------------------------------------------------------------
+    def ensure_synced(self, collection):
+        """컬렉션이 바뀌었거나(리셋 등) 문서 수가 맞지 않으면 컬렉션 기준으로 인덱스를 재구축합니다."""
+        try:
+            collection_id = str(collection.id)
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM index_meta WHERE key = 'collection_id'").fetchone()
+                indexed_count = self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            if row and row[0] == collection_id and indexed_count == collection.count():
+                return
+            self.rebuild(collection)
+        except Exception as e:
+            logger.error(f"[MetadataIndex] Failed to sync index with collection: {e}", exc_info=True)
+
+    def rebuild(self, collection, page_size: int = 5000):
+        logger.info("[MetadataIndex] Rebuilding metadata index from ChromaDB collection...")
+        with self._lock:
+            self._conn.executescript(
+                "DELETE FROM docs; DELETE FROM keyword_counts; DELETE FROM sentiment_counts; DELETE FROM day_stats;"
+            )
+            self._conn.commit()
+
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            self.upsert(ids, page.get("metadatas") or [{}] * len(ids))
+            offset += len(ids)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO index_meta (key, value) VALUES ('collection_id', ?)", (str(collection.id),)
+            )
+            self._conn.commit()
+        logger.info(f"[MetadataIndex] Rebuild complete: {offset} documents indexed.")
+
+    # ---------------------------------------------------------------
+    # 증분 갱신
+    # ---------------------------------------------------------------
+    def _apply(self, row: Tuple, sign: int):
+        """문서 1건의 기여분을 집계 테이블에 더하거나(sign=1) 뺍니다(sign=-1)."""
+        _, category, sns, day, published_at, keywords, sentiment = row
+
+        for kw, cnt in Counter(_split_keywords(keywords)).items():
+            self._conn.execute(
+                "INSERT INTO keyword_counts (category, sns, day, keyword, count) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(category, sns, day, keyword) DO UPDATE SET count = count + excluded.count",
+                (category, sns, day, kw, sign * cnt),
+            )
+
+        if sentiment:
+            self._conn.execute(
+                "INSERT INTO sentiment_counts (category, sns, day, sentiment, count) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(category, sns, day, sentiment) DO UPDATE SET count = count + excluded.count",
+                (category, sns, day, sentiment, sign),
+            )
+
+        self._conn.execute(
+            "INSERT INTO day_stats (category, sns, day, doc_count, min_published_at, max_published_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(category, sns, day) DO UPDATE SET doc_count = doc_count + excluded.doc_count",
+            (category, sns, day, sign, published_at, published_at),
+        )
+        if sign > 0 and published_at is not None:
+            self._conn.execute(
+                "UPDATE day_stats SET "
+                "min_published_at = MIN(COALESCE(min_published_at, ?), ?), "
+                "max_published_at = MAX(COALESCE(max_published_at, ?), ?) "
+                "WHERE category = ? AND sns = ? AND day = ?",
+                (published_at, published_at, published_at, published_at, category, sns, day),
+            )
+
+    def _cleanup(self):
+        """0이 된 집계 행을 제거하고, 삭제가 있었던 날짜의 min/max를 문서 테이블 기준으로 재계산합니다."""
+        self._conn.execute("DELETE FROM keyword_counts WHERE count <= 0")
+        self._conn.execute("DELETE FROM sentiment_counts WHERE count <= 0")
+        self._conn.execute("DELETE FROM day_stats WHERE doc_count <= 0")
+        for category, sns, day in self._removed:
+            self._conn.execute(
+                "UPDATE day_stats SET "
+                "min_published_at = (SELECT MIN(published_at) FROM docs WHERE category = ? AND sns = ? AND day = ?), "
+                "max_published_at = (SELECT MAX(published_at) FROM docs WHERE category = ? AND sns = ? AND day = ?) "
+                "WHERE category = ? AND sns = ? AND day = ?",
+                (category, sns, day) * 3,
+            )
+
+    def _fetch_rows(self, ids: List[str]) -> Dict[str, Tuple]:
+        rows = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self._conn.execute(f"SELECT * FROM docs WHERE doc_id IN ({placeholders})", chunk):
+                rows[row[0]] = row
+        return rows
+
+    def upsert(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        if not ids:
+            return
+        with self._lock:
+            self._removed = set()
+            existing = self._fetch_rows(list(ids))
+            for doc_id, meta in zip(ids, metadatas):
+                meta = meta or {}
+                if doc_id in existing:
+                    old = existing[doc_id]
+                    self._apply(old, -1)
+                    self._removed.add((old[1], old[2], old[3]))
+
+                published_at = meta.get("published_at")
+                if not isinstance(published_at, (int, float)) or isinstance(published_at, bool):
+                    published_at = None
+                row = (
+                    doc_id,
+                    str(meta.get("category") or ""),
+                    str(meta.get("sns") or ""),
+                    _day_of(published_at),
+                    published_at,
+                    meta.get("keyword") if isinstance(meta.get("keyword"), str) else None,
+                    meta.get("sentiment") if isinstance(meta.get("sentiment"), str) and meta.get("sentiment") else None,
+                )
+                self._conn.execute("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+                self._apply(row, 1)
+                existing[doc_id] = row
+            self._cleanup()
+            self._conn.commit()
+
+    def delete(self, ids: List[str]):
+        if not ids:
+            return
+        with self._lock:
+            self._removed = set()
+            for doc_id, row in self._fetch_rows(list(ids)).items():
+                self._apply(row, -1)
+                self._removed.add((row[1], row[2], row[3]))
+                self._conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+            self._cleanup()
+            self._conn.commit()
+
+    # ---------------------------------------------------------------
+    # 조회
+    # ---------------------------------------------------------------
+    @staticmethod
+    def _day_clause(start_day: Optional[str], end_day: Optional[str]) -> Tuple[str, Tuple]:
+        if start_day and end_day:
+            return " AND day != '' AND day BETWEEN ? AND ?", (start_day, end_day)
+        return "", ()
+
+    def keyword_frequencies(self, category: str, sns: str, n_results: int = 100,
+                            start_day: Optional[str] = None, end_day: Optional[str] = None) -> List[Tuple[str, int]]:
+        clause, params = self._day_clause(start_day, end_day)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT keyword, SUM(count) AS total FROM keyword_counts "
+                f"WHERE category = ? AND sns = ?{clause} GROUP BY keyword ORDER BY total DESC LIMIT ?",
+                (category, sns, *params, n_results),
+            ).fetchall()
+
+    def sentiment_frequencies(self, category: str, sns: str, n_results: int = 100,
+                              start_day: Optional[str] = None, end_day: Optional[str] = None) -> List[Tuple[str, int]]:
+        clause, params = self._day_clause(start_day, end_day)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT sentiment, SUM(count) AS total FROM sentiment_counts "
+                f"WHERE category = ? AND sns = ?{clause} GROUP BY sentiment ORDER BY total DESC LIMIT ?",
+                (category, sns, *params, n_results),
+            ).fetchall()
+
+    def published_range(self, category: str) -> Tuple[Optional[float], Optional[float]]:
+        """카테고리 전체(SNS 무관)의 published_at 최소/최대값"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(min_published_at), MAX(max_published_at) FROM day_stats WHERE category = ? AND day != ''",
+                (category,),
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+
+_index_instances: Dict[str, MetadataIndex] = {}
+_index_lock = threading.Lock()
+
+
+def get_metadata_index(collection_name: str = "trendmirror_kb") -> Optional[MetadataIndex]:
+    """컬렉션별 프로세스 전역 메타데이터 집계 인덱스를 반환합니다. 열 수 없으면 None (전체 스캔으로 대체)."""
+    with _index_lock:
+        if collection_name not in _index_instances:
+            persist_path = os.getenv("CHROMA_PERSIST_PATH", "chroma_tm")
+            index_dir = os.getenv("METADATA_INDEX_DIR", persist_path)
+            path = os.path.join(index_dir, f"tm_metadata_index_{collection_name}.sqlite3")
+            try:
+                _index_instances[collection_name] = MetadataIndex(path=path)
+            except Exception as e:
+                logger.error(f"[MetadataIndex] Failed to open index at '{path}': {e}", exc_info=True)
+                return None
+    return _index_instances[collection_name]
@@ -1,6 +1,8 @@
 # app/repository/vector/vector_repo.py
 from typing import List, Dict, Any
 from app.core.db import ChromaDBConnection
+from app.repository.vector.metadata_index import MetadataIndex, get_metadata_index
+from app.repository.vector.coverage_ledger import CoverageLedger, get_coverage_ledger
 from app.core.logger import logger # Import logger
 import uuid # Import uuid
 
@@ -8,6 +10,14 @@ class ChromaDBRepository:
     def __init__(self, collection_name: str = "trendmirror_kb"):
         self._connection = ChromaDBConnection()
         self.collection = self._connection.get_collection(collection_name)
+        # 키워드/감성/기간 집계용 사이드카 인덱스 (없으면 서비스에서 전체 스캔으로 대체)
+        self.metadata_index: MetadataIndex = get_metadata_index(collection_name)
+        if self.metadata_index:
+            self.metadata_index.ensure_synced(self.collection)
+        # 실제 크롤링 완료 구간 원장
+        self.coverage_ledger: CoverageLedger = get_coverage_ledger(collection_name)
+        if self.coverage_ledger:
+            self.coverage_ledger.ensure_collection(str(self.collection.id))
 
     def add_documents(self, documents: List[str], embeddings: List[List[float]], metadatas: List[Dict[str, Any]] = None,
                       ids: List[str] = None):
@@ -25,6 +35,8 @@ class ChromaDBRepository:
             metadatas=metadatas,
             ids=ids
         )
+        if self.metadata_index:
+            self.metadata_index.upsert(ids, metadatas)
 
     def query(self, query_embeddings: List[List[float]], n_results: int = 5) -> Dict[str, Any]:
         # 노트북의 chroma_search 로직 구현
@@ -38,7 +50,16 @@ class ChromaDBRepository:
         """
         메타데이터 필터를 기반으로 DB에서 문서를 삭제합니다.
         """
-        return self.collection.delete(where=where)
+        if not self.metadata_index:
+            return self.collection.delete(where=where)
+
+        # 집계 인덱스에서도 빼기 위해 삭제 대상 ID를 먼저 조회
+        target_ids = self.collection.get(where=where, include=[]).get("ids") or []
+        if not target_ids:
+            return None
+        result = self.collection.delete(ids=target_ids)
+        self.metadata_index.delete(target_ids)
+        return result
 
     def get_by_metadata(self, where: Dict[str, Any], include: List[str] = None) -> Dict[str, Any]:
         """
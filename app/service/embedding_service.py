@@ -1,12 +1,122 @@
-from typing import List
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Iterator, Tuple
 from app.core.llm import get_upstage_embeddings
+from app.core.logger import logger
+from app.agents.utils import count_tokens, truncate_text_to_tokens
+from app.repository.cache.embedding_cache import EmbeddingCache, get_embedding_cache
+
+
+class EmbeddingBatchError(RuntimeError):
+    pass
+
 
 class EmbeddingService:
-    def __init__(self):
+    def __init__(self, cache: Optional[EmbeddingCache] = None):
         self._embeddings = get_upstage_embeddings()
+        self._cache = cache if cache is not None else get_embedding_cache()
+        self._model_name = getattr(self._embeddings, "model", "") or ""
+
+        # 배치 파이프라인 설정 (토큰 기준 배치 + 동시 실행 수 제한)
+        self.max_input_tokens = int(os.getenv("EMBEDDING_MAX_INPUT_TOKENS", "4000"))
+        self.max_batch_tokens = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "50000"))
+        self.max_batch_size = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "100"))
+        self.max_concurrency = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+        self.max_retries = int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+
+    def _cache_key(self, text: str, kind: str) -> str:
+        # Upstage는 query/passage 임베딩 모델이 다르므로 종류까지 키에 포함
+        return EmbeddingCache.make_key(f"{self._model_name}:{kind}", text)
+
+    def _plan_batches(self, texts: List[str]) -> List[Tuple[int, int]]:
+        """입력 순서를 유지한 채 토큰 예산/개수 제한에 맞춰 연속 구간(start, end)으로 나눕니다."""
+        batches = []
+        start, batch_tokens = 0, 0
+        for i, text in enumerate(texts):
+            tokens = min(count_tokens(text or ""), self.max_input_tokens)
+            if i > start and (batch_tokens + tokens > self.max_batch_tokens or i - start >= self.max_batch_size):
+                batches.append((start, i))
+                start, batch_tokens = i, 0
+            batch_tokens += tokens
+        if start < len(texts):
+            batches.append((start, len(texts)))
+        return batches
+
+    def _embed_documents_uncached(self, texts: List[str]) -> List[List[float]]:
+        # 토큰 한도에 근접한 입력은 잘라서 전송 (저장되는 문서 원문은 그대로 유지)
+        payload = [truncate_text_to_tokens(t or "", self.max_input_tokens) for t in texts]
+        for attempt in range(self.max_retries):
+            try:
+                return self._embeddings.embed_documents(payload)
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    raise
+                wait = 1.5 * (2 ** attempt)
+                logger.warning(f"[Embedding] Batch of {len(texts)} failed ({e}). Retrying in {wait:.1f}s...")
+                time.sleep(wait)
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if not self._cache:
+            return self._embed_documents_uncached(texts)
+
+        keys = [self._cache_key(t, "passage") for t in texts]
+        cached = self._cache.get_many(keys)
+
+        # 캐시 미스만 API로 전송 (동일 텍스트 중복 제거)
+        miss_keys, miss_texts, seen = [], [], set()
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in seen:
+                seen.add(key)
+                miss_keys.append(key)
+                miss_texts.append(text)
+
+        if miss_texts:
+            new_vectors = self._embed_documents_uncached(miss_texts)
+            fresh = dict(zip(miss_keys, new_vectors))
+            self._cache.put_many(fresh)
+            cached.update(fresh)
+
+        logger.debug(f"[Embedding] {len(texts)} texts, cache hits: {len(texts) - len(miss_texts)}, API calls for: {len(miss_texts)}")
+        return [cached[k] for k in keys]
+
+    def iter_embedding_batches(self, texts: List[str]) -> Iterator[Tuple[int, int, List[List[float]]]]:
+        """
+        텍스트를 토큰 기준 배치로 나누어 동시에 임베딩하고, 입력 순서대로 (start, end, vectors)를 yield 합니다.
+        실패한 배치는 개별적으로 재시도하며, 끝내 실패한 배치는 건너뛴 뒤 마지막에 EmbeddingBatchError를 발생시킵니다.
+        """
+        batches = self._plan_batches(texts)
+        if not batches:
+            return
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(batches)))) as executor:
+            futures = [executor.submit(self._embed_batch, texts[s:e]) for s, e in batches]
+            for (s, e), future in zip(batches, futures):
+                try:
+                    yield s, e, future.result()
+                except Exception as err:
+                    logger.error(f"[Embedding] Batch [{s}:{e}] failed after {self.max_retries} attempts: {err}")
+                    failed.append((s, e))
+
+        if failed:
+            raise EmbeddingBatchError(f"{len(failed)}/{len(batches)} embedding batches failed: {failed}")
 
     def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        return self._embeddings.embed_documents(texts)
+        vectors: List[List[float]] = []
+        for _, _, batch_vectors in self.iter_embedding_batches(texts):
+            vectors.extend(batch_vectors)
+        return vectors
 
     def create_embedding(self, text: str) -> List[float]:
-        return self._embeddings.embed_query(text)
\ No newline at end of file
+        if not self._cache:
+            return self._embeddings.embed_query(text)
+
+        key = self._cache_key(text, "query")
+        cached = self._cache.get_many([key])
+        if key in cached:
+            return cached[key]
+
+        vector = self._embeddings.embed_query(text)
+        self._cache.put_many({key: vector})
+        return vector
@@ -0,0 +1,70 @@
+# app/service/keyword_matcher.py
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, List, Set, Tuple
+
+
+class KeywordMatcher:
+    """
+    Aho–Corasick 오토마톤 기반 다중 키워드 매처 (순수 파이썬)
+    - 키워드 집합으로 한 번만 만들고, 글마다 텍스트를 한 번만 훑어 등장한 키워드를 모두 찾음
+    - 매칭 결과는 입력 키워드 순서를 유지 ([k for k in keywords if k in text] 와 동일한 결과)
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(k for k in keywords if k))
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        for idx, keyword in enumerate(self.keywords):
+            node = 0
+            for ch in keyword:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] += (idx,)
+
+        # BFS로 실패 링크를 만들고, 실패 링크 쪽 출력(접미사로 끝나는 키워드)을 합쳐 둠
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def find_indices(self, text: str) -> Set[int]:
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[int] = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+    def find(self, text: str) -> List[str]:
+        """텍스트에 등장하는 키워드 목록 (키워드 순서 유지, 중복 없음)"""
+        if not text or not self.keywords:
+            return []
+        return [self.keywords[i] for i in sorted(self.find_indices(text))]
+
+    def find_all(self, texts: Iterable[str]) -> List[List[str]]:
+        return [self.find(t if isinstance(t, str) else "") for t in texts]
+
+
+@lru_cache(maxsize=32)
+def get_keyword_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    """같은 키워드 집합에 대한 오토마톤을 재사용합니다."""
+    return KeywordMatcher(keywords)
@@ -5,6 +5,8 @@ from typing import List, Dict, Any, Tuple, Optional
 
 import pandas as pd
 
+from app.service.keyword_matcher import KeywordMatcher, get_keyword_matcher
+
 
 def _root_dir() -> Path:
     # app/service/naver_validate_service.py -> service -> app -> project root
@@ -62,43 +64,69 @@ def _load_naver_posts(csv_path: Path) -> pd.DataFrame:
     return df
 
 
+# _extract_keywords_simple 기본 불용어(필요하면 늘리면 됨)
+SIMPLE_STOPWORDS = frozenset([
+    "먹방", "맛집", "브이로그", "vlog", "리뷰", "후기", "추천", "신상", "요즘", "유행",
+    "핫한", "핫플", "편의점", "음식", "디저트", "레시피", "요리", "도전", "모음",
+    "ASMR", "asmr", "shorts", "쇼츠", "전국", "한국", "서울", "부산", "대구",
+    "진짜", "최고", "레전드", "간단", "초간단"
+])
+
+SIMPLE_TOKEN_PATTERN = r"[가-힣0-9]{2,}"  # 2글자 이상 한글/숫자
+SIMPLE_MAX_TOKEN_LEN = 15
+
+
 def _extract_keywords_simple(
     yt_df: pd.DataFrame,
     top_k: int = 30,
     min_videos: int = 2,
+    bigrams: bool = False,
+    char_ngram: int = 0,
 ) -> pd.DataFrame:
     """
-    LLM 없이도 돌아가는 "간단 키워드 후보" 생성기.
-    - 유튜브 title/description에서 한글/숫자 토큰 추출
-    - 불용어 제거
-    - 영상 수/score 합으로 랭킹
+    LLM 없이도 돌아가는 "간단 키워드 후보" 생성기 (벡터화 버전).
+    - 유튜브 title/description에서 한글/숫자 토큰 추출 (str.findall + explode)
+    - 불용어 제거 (집합 기반 isin 마스크)
+    - bigrams=True 이면 영상 안에서 연속된 두 토큰("두바이 쫀득쿠키")도 후보에 추가
+    - char_ngram=n(>=2) 이면 토큰의 글자 n-gram도 후보에 추가
+    - 영상 수/score 합으로 랭킹 (keyword / yt_videos / yt_score_sum)
     """
-    # 매우 기본 불용어(필요하면 늘리면 됨)
-    stop = set([
-        "먹방", "맛집", "브이로그", "vlog", "리뷰", "후기", "추천", "신상", "요즘", "유행",
-        "핫한", "핫플", "편의점", "음식", "디저트", "레시피", "요리", "도전", "모음",
-        "ASMR", "asmr", "shorts", "쇼츠", "전국", "한국", "서울", "부산", "대구",
-        "진짜", "최고", "레전드", "간단", "초간단"
-    ])
-
-    token_re = re.compile(r"[가-힣0-9]{2,}")  # 2글자 이상 한글/숫자
-
-    rows = []
-    for _, r in yt_df.iterrows():
-        text = str(r.get("yt_text", ""))
-        score = float(r.get("score", 0.0) or 0.0)
-        tokens = token_re.findall(text)
-        # 정제
-        tokens = [t for t in tokens if t not in stop and len(t) <= 15]
-        # 중복 제거(한 영상 내)
-        for t in set(tokens):
-            rows.append((t, score))
-
-    if not rows:
-        return pd.DataFrame(columns=["keyword", "yt_videos", "yt_score_sum"])
-
-    tmp = pd.DataFrame(rows, columns=["keyword", "score"])
-    agg = tmp.groupby("keyword", as_index=False).agg(
+    columns = ["keyword", "yt_videos", "yt_score_sum"]
+    if yt_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    if "yt_text" in yt_df.columns:
+        texts = yt_df["yt_text"].fillna("").astype(str)
+    else:
+        texts = pd.Series("", index=yt_df.index)
+    scores = pd.to_numeric(yt_df["score"], errors="coerce").fillna(0.0).to_numpy() if "score" in yt_df.columns else None
+
+    tokens = pd.DataFrame({"row": range(len(texts)), "keyword": texts.str.findall(SIMPLE_TOKEN_PATTERN).to_numpy()})
+    tokens = tokens.explode("keyword").dropna(subset=["keyword"])
+    # 정제
+    tokens = tokens[~tokens["keyword"].isin(SIMPLE_STOPWORDS) & (tokens["keyword"].str.len() <= SIMPLE_MAX_TOKEN_LEN)]
+
+    candidates = [tokens]
+    if bigrams and not tokens.empty:
+        nxt = tokens.groupby("row")["keyword"].shift(-1)
+        pairs = tokens.assign(keyword=tokens["keyword"] + " " + nxt)
+        candidates.append(pairs.dropna(subset=["keyword"]))
+    if char_ngram and char_ngram >= 2 and not tokens.empty:
+        lengths = tokens["keyword"].str.len()
+        for i in range(SIMPLE_MAX_TOKEN_LEN - char_ngram + 1):
+            has_gram = lengths > max(char_ngram, i + char_ngram - 1)
+            if not has_gram.any():
+                break
+            grams = tokens[has_gram].assign(keyword=tokens.loc[has_gram, "keyword"].str[i:i + char_ngram])
+            candidates.append(grams[~grams["keyword"].isin(SIMPLE_STOPWORDS)])
+
+    # 중복 제거(한 영상 내)
+    cand = pd.concat(candidates, ignore_index=True).drop_duplicates(["row", "keyword"])
+    if cand.empty:
+        return pd.DataFrame(columns=columns)
+    cand["score"] = scores[cand["row"].to_numpy()] if scores is not None else 0.0
+
+    agg = cand.groupby("keyword", as_index=False).agg(
         yt_videos=("keyword", "size"),
         yt_score_sum=("score", "sum"),
     )
@@ -111,6 +139,30 @@ def _extract_keywords_simple(
     return agg.head(top_k).reset_index(drop=True)
 
 
+def label_naver_post(post: Dict[str, Any], matcher: KeywordMatcher) -> Dict[str, Any]:
+    """
+    수집된 네이버 글 1건을 정제하고 키워드를 매칭합니다 (스트리밍 수집 중 글 단위 처리용).
+    _load_naver_posts + _match_keywords_to_naver 결과와 같은 컬럼을 가집니다.
+    matcher는 키워드 집합당 한 번 만든 KeywordMatcher를 재사용합니다.
+    """
+    title = _clean_html(post.get("title", ""))
+    description = _clean_html(post.get("description", ""))
+    hits = matcher.find(f"{title} {description}".strip())
+    days_ago = pd.to_numeric(post.get("days_ago"), errors="coerce")
+    return {
+        "days_ago": 9999 if pd.isna(days_ago) else int(days_ago),
+        "postdate": str(post.get("postdate", "")),
+        "title": title,
+        "description": description,
+        "bloggername": str(post.get("bloggername", "")),
+        "link": str(post.get("link", "")),
+        "query": str(post.get("query", "")),
+        "source": str(post.get("source", "naver_blog")),
+        "matched_keywords": "|".join(hits),
+        "match_count": len(hits),
+    }
+
+
 def _match_keywords_to_naver(
     naver_df: pd.DataFrame,
     keywords: List[str],
@@ -118,16 +170,15 @@ def _match_keywords_to_naver(
     
     """
     네이버 글별로 매칭된 키워드 목록 생성
+    (키워드 집합으로 Aho–Corasick 오토마톤을 한 번 만들고 글마다 한 번씩만 훑음)
     """
+    matcher = get_keyword_matcher(tuple(keywords))
+    texts = naver_df["nv_text"] if "nv_text" in naver_df.columns else pd.Series("", index=naver_df.index)
+    hits = matcher.find_all(texts.astype(str))
 
-    matched = []
-    for _, r in naver_df.iterrows():
-        text = str(r.get("nv_text", ""))
-        hits = [k for k in keywords if k and (k in text)]
-        matched.append("|".join(hits) if hits else "")
     out = naver_df.copy()
-    out["matched_keywords"] = matched
-    out["match_count"] = out["matched_keywords"].apply(lambda s: 0 if not s else len(s.split("|")))
+    out["matched_keywords"] = ["|".join(h) for h in hits]
+    out["match_count"] = [len(h) for h in hits]
     return out
 
 
@@ -139,34 +190,34 @@ def _keyword_stats_from_labeled(
     """
     키워드별 blog_posts / unique_bloggers / recent_posts_nd 생성
     """
-
-    rows = []
-    for _, r in labeled_df.iterrows():
-        mk = r.get("matched_keywords", "")
-        if not isinstance(mk, str) or not mk:
-            continue
-        for k in mk.split("|"):
-            if k:
-                rows.append({
-                    "keyword": k,
-                    "bloggername": r.get("bloggername", ""),
-                    "link": r.get("link", ""),
-                    "days_ago": int(r.get("days_ago", 9999) or 9999),
-                })
-
-    if not rows:
-        return pd.DataFrame(columns=["keyword", "blog_posts", "unique_bloggers", f"recent_posts_{recent_days}d", "spread_score"])
-
-    tmp = pd.DataFrame(rows)
-    tmp["days_ago"] = pd.to_numeric(tmp["days_ago"], errors="coerce").fillna(9999).astype(int)
+    recent_col = f"recent_posts_{recent_days}d"
+    empty = pd.DataFrame(columns=["keyword", "blog_posts", "unique_bloggers", recent_col, "spread_score"])
+    if labeled_df.empty or "matched_keywords" not in labeled_df.columns:
+        return empty
+
+    tmp = pd.DataFrame({
+        "keyword": labeled_df["matched_keywords"].where(labeled_df["matched_keywords"].map(lambda v: isinstance(v, str)), ""),
+        "bloggername": labeled_df["bloggername"] if "bloggername" in labeled_df.columns else "",
+        "link": labeled_df["link"] if "link" in labeled_df.columns else "",
+        "days_ago": pd.to_numeric(labeled_df["days_ago"], errors="coerce") if "days_ago" in labeled_df.columns else 9999,
+    })
+    tmp = tmp[tmp["keyword"] != ""]
+    if tmp.empty:
+        return empty
+
+    # 글 1건 x 매칭 키워드 N개 -> N행으로 펼친 뒤 키워드 단위로 집계
+    tmp = tmp.assign(keyword=tmp["keyword"].str.split("|")).explode("keyword")
+    tmp = tmp[tmp["keyword"].astype(bool)]
+    tmp["days_ago"] = tmp["days_ago"].fillna(9999).astype(int)
+    tmp["is_recent"] = tmp["days_ago"] <= recent_days
 
     agg = tmp.groupby("keyword", as_index=False).agg(
         blog_posts=("link", "nunique"),
         unique_bloggers=("bloggername", "nunique"),
-        **{f"recent_posts_{recent_days}d": ("days_ago", lambda s: int((s <= recent_days).sum()))}
+        **{recent_col: ("is_recent", "sum")}
     )
+    agg[recent_col] = agg[recent_col].astype(int)
 
-    recent_col = f"recent_posts_{recent_days}d"
     agg["spread_score"] = (
         agg["blog_posts"] * 1.0 +
         agg["unique_bloggers"] * 0.7 +
@@ -1,28 +1,101 @@
 import re
+import glob
 import pandas as pd
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
 from app.service.vector_service import VectorService
 from app.core.logger import logger
 
-import re
-import pandas as pd
-import os
-from datetime import datetime, timedelta
-from typing import Dict, Any
-from app.service.vector_service import VectorService
-from app.core.logger import logger
+KEYWORD_CSV_PATTERN = re.compile(r"^(?P<sns>\w+)_(?P<category>.+)_(?P<date>\d{8})_(?P<days>\d+)d_real_data_keyword_frequencies\.csv$")
+
+
+def _parse_keyword_csv_name(base_name: str) -> Optional[Dict[str, Any]]:
+    """
+    [SNS]_[CATEGORY]_[DATE]_[DAYS]d_real_data_keyword_frequencies.csv 형식의 파일명을 파싱합니다.
+    형식이 다르면 None, 날짜가 잘못되었으면 ValueError를 발생시킵니다.
+    """
+    match = KEYWORD_CSV_PATTERN.match(base_name)
+    if not match:
+        return None
+
+    file_info = match.groupdict()
+    target_date = datetime.strptime(file_info['date'], "%Y%m%d")
+    return {
+        "sns": file_info['sns'],
+        "category": file_info['category'],
+        "date_str": file_info['date'],
+        "date_int": int(file_info['date']),
+        # 파일명에서 추출한 days를 사용하여 기준일 계산
+        "cutoff_int": int((target_date - timedelta(days=int(file_info['days']))).strftime("%Y%m%d")),
+    }
+
+
+def _read_keyword_csv(file_path: str) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """키워드 빈도 CSV를 읽어 (DataFrame, 오류 메시지)를 반환합니다. 프로세스 풀에서 호출됩니다."""
+    try:
+        # 소문자 keyword, frequency 컬럼 대응
+        df = pd.read_csv(file_path, encoding='utf-8-sig')
+        df.columns = [col.strip().lower() for col in df.columns]
+    except Exception as e:
+        return None, f"Failed to read file: {e}"
+
+    if 'keyword' not in df.columns or 'frequency' not in df.columns:
+        return None, f"Missing required columns (keyword, frequency). Current columns: {list(df.columns)}"
+    return df[['keyword', 'frequency']], None
 
 class SyncService:
     """
     특정 형식의 트렌드 분석 데이터를 Vector DB와 동기화하는 서비스
-    - 정책: N일 보관, 빈도수 3 이상 적재
+    - 정책: N일 보관, 빈도수 min_frequency(기본 3) 이상 적재
     """
     
-    def __init__(self, vector_service: VectorService):
+    def __init__(self, vector_service: VectorService, min_frequency: int = None, upsert_batch_size: int = None):
         self.vector_service = vector_service
+        self.min_frequency = min_frequency if min_frequency is not None else int(os.getenv("SYNC_MIN_FREQUENCY", "3"))
+        self.upsert_batch_size = upsert_batch_size or int(os.getenv("SYNC_UPSERT_BATCH_SIZE", "1000"))
+
+    @staticmethod
+    def _build_sync_frame(df: pd.DataFrame, sns_name: str, category: str, date_str: str, date_int: int, min_frequency: int) -> pd.DataFrame:
+        """keyword/frequency DataFrame을 컬럼 연산만으로 필터링하고 id/document/메타데이터 컬럼을 만듭니다."""
+        if df.empty or "keyword" not in df.columns or "frequency" not in df.columns:
+            return pd.DataFrame()
+
+        frame = pd.DataFrame({
+            "keyword": df["keyword"].astype(str).str.strip(),
+            "count": pd.to_numeric(df["frequency"], errors="coerce").fillna(0).astype("int64"),
+        })
+        frame = frame[frame["count"] >= min_frequency].drop_duplicates(subset="keyword")
+
+        frame["sns"] = sns_name
+        frame["category"] = category
+        frame["timestamp"] = date_int
+        frame["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M")
+        frame["id"] = f"{sns_name}_{category}_{date_int}_" + frame["keyword"]
+        frame["document"] = (
+            f"[{sns_name} - {category}] '" + frame["keyword"] + "' 언급 빈도: "
+            + frame["count"].astype(str) + f"회 (기준일: {date_str})"
+        )
+        return frame
 
-    def sync_dataframe_to_db(self, df: pd.DataFrame, slots: Dict[str, Any], sns_name: str = "youtube"):
+    def _upsert_sync_frame(self, frame: pd.DataFrame, batch_size: int = None):
+        """준비된 프레임을 batch_size(기본 upsert_batch_size) 단위로 나눠 Vector DB에 적재합니다."""
+        meta_cols = ["sns", "category", "keyword", "count", "timestamp", "updated_at"]
+        batch_size = batch_size or self.upsert_batch_size
+        for start in range(0, len(frame), batch_size):
+            chunk = frame.iloc[start:start + batch_size]
+            self.vector_service.add_documents(
+                documents=chunk["document"].tolist(),
+                metadatas=chunk[meta_cols].to_dict("records"),
+                ids=chunk["id"].tolist(),
+            )
+
+    def _log_top_keywords(self, frame: pd.DataFrame):
+        top = frame.nlargest(5, "count")[["keyword", "count"]].rename(columns={"count": "frequency"})
+        logger.info(f"--- Top 5 Synced Keywords ---\n{top.to_string(index=False)}")
+
+    def sync_dataframe_to_db(self, df: pd.DataFrame, slots: Dict[str, Any], sns_name: str = "youtube", min_frequency: int = None):
         """DataFrame과 slots 정보를 기반으로 데이터를 DB에 적재합니다."""
         
         # 1. slots에서 정보 추출
@@ -46,66 +119,40 @@ class SyncService:
         except Exception as e:
             logger.debug(f"[INFO] Note during DB cleanup: {e}")
 
-        # 3. 데이터 적재 준비 (빈도수 3 이상만)
-        documents, metadatas, ids = [], [], []
-        save_time = datetime.now().strftime("%Y-%m-%d %H:%M")
-
-        for _, row in df.iterrows():
-            kw = str(row['keyword']).strip()
-            count = int(row['frequency'])
-            
-            if count >= 3:
-                doc_text = f"[{sns_name} - {category}] '{kw}' 언급 빈도: {count}회 (기준일: {current_date_str})"
-                documents.append(doc_text)
-                metadatas.append({
-                    "sns": sns_name,
-                    "category": category,
-                    "keyword": kw,
-                    "count": count,
-                    "timestamp": current_date_int,
-                    "updated_at": save_time
-                })
-                ids.append(f"{sns_name}_{category}_{current_date_int}_{kw}")
+        # 3. 데이터 적재 준비 (빈도수 min_frequency 이상만)
+        min_frequency = self.min_frequency if min_frequency is None else min_frequency
+        frame = self._build_sync_frame(df, sns_name, category, current_date_str, current_date_int, min_frequency)
 
         # 4. 최종 Vector DB 적재
-        if ids:
-            self.vector_service.add_documents(documents=documents, metadatas=metadatas, ids=ids)
-            logger.info(f"[SUCCESS] Sync complete: {len(ids)} valid keywords saved to DB.")
-            
-            df_synced = pd.DataFrame(metadatas)[['keyword', 'count']].rename(columns={'count': 'frequency'})
-            df_synced = df_synced.sort_values(by='frequency', ascending=False)
-            logger.info(f"--- Top 5 Synced Keywords ---\n{df_synced.head(5).to_string(index=False)}")
+        if not frame.empty:
+            self._upsert_sync_frame(frame)
+            logger.info(f"[SUCCESS] Sync complete: {len(frame)} valid keywords saved to DB.")
+            self._log_top_keywords(frame)
         else:
-            logger.warning(f"[WARNING] No data to load in DataFrame with frequency >= 3.")
+            logger.warning(f"[WARNING] No data to load in DataFrame with frequency >= {min_frequency}.")
     
-    def sync_csv_to_db(self, file_path: str):
+    def sync_csv_to_db(self, file_path: str, min_frequency: int = None):
         """지정한 파일의 이름 형식을 검증하고 데이터를 DB에 적재합니다."""
         base_name = os.path.basename(file_path)
 
         # 1. Regex를 이용한 새로운 파일명 검증
-        pattern = re.compile(r"^(?P<sns>\w+)_(?P<category>.+)_(?P<date>\d{8})_(?P<days>\d+)d_real_data_keyword_frequencies\.csv$")
-        match = pattern.match(base_name)
+        try:
+            file_info = _parse_keyword_csv_name(base_name)
+        except ValueError:
+            logger.error(f"[ERROR] Invalid date format in filename: {base_name} (must be YYYYMMDD)")
+            return
 
-        if not match:
+        if not file_info:
             logger.error(f"[SKIP] Invalid file format or structure: {base_name}")
             logger.info("[INFO] Required format: [SNS]_[CATEGORY]_[DATE]_[DAYS]d_real_data_keyword_frequencies.csv")
             return
 
-        # 2. Regex 그룹에서 정보 추출
-        file_info = match.groupdict()
+        # 2. 파일명에서 정보 추출
         sns_name = file_info['sns']
         category = file_info['category']
-        file_date_str = file_info['date']
-        days_in_file = int(file_info['days'])
-
-        try:
-            target_date = datetime.strptime(file_date_str, "%Y%m%d")
-            # 파일명에서 추출한 days를 사용하여 기준일 계산
-            cutoff_date_int = int((target_date - timedelta(days=days_in_file)).strftime("%Y%m%d"))
-            current_date_int = int(file_date_str)
-        except ValueError:
-            logger.error(f"[ERROR] Invalid date format in filename: {file_date_str} (must be YYYYMMDD)")
-            return
+        file_date_str = file_info['date_str']
+        cutoff_date_int = file_info['cutoff_int']
+        current_date_int = file_info['date_int']
 
         logger.info(f"[SYNC] [{sns_name} | {category}] Validation complete. Starting data analysis for date: {file_date_str}")
 
@@ -131,50 +178,119 @@ class SyncService:
             logger.debug(f"[INFO] Note during DB cleanup: {e}")
 
         # 4. CSV 데이터 로드 및 전처리
-        try:
-            # 소문자 keyword, frequency 컬럼 대응
-            df = pd.read_csv(file_path, encoding='utf-8-sig')
-            df.columns = [col.strip().lower() for col in df.columns]
-        except Exception as e:
-            logger.error(f"[ERROR] Failed to read file: {e}")
+        df, error = _read_keyword_csv(file_path)
+        if error:
+            logger.error(f"[ERROR] {error}")
             return
 
-        if 'keyword' not in df.columns or 'frequency' not in df.columns:
-            logger.error(f"[ERROR] Missing required columns (keyword, frequency). Current columns: {list(df.columns)}")
-            return
-
-        # 5. 데이터 적재 준비 (빈도수 3 이상만)
-        documents, metadatas, ids = [], [], []
-        save_time = datetime.now().strftime("%Y-%m-%d %H:%M")
-
-        for _, row in df.iterrows():
-            kw = str(row['keyword']).strip()
-            count = int(row['frequency'])
-            
-            if count >= 3:
-                # 자연어 문서 생성 (Rank 제외)
-                doc_text = f"[{sns_name} - {category}] '{kw}' 언급 빈도: {count}회 (기준일: {file_date_str})"
-                
-                documents.append(doc_text)
-                metadatas.append({
-                    "sns": sns_name,
-                    "category": category,
-                    "keyword": kw,
-                    "count": count,
-                    "timestamp": current_date_int,
-                    "updated_at": save_time
-                })
-                # 고유 ID 생성 (SNS_카테고리_날짜_키워드)
-                ids.append(f"{sns_name}_{category}_{current_date_int}_{kw}")
+        # 5. 데이터 적재 준비 (빈도수 min_frequency 이상만)
+        min_frequency = self.min_frequency if min_frequency is None else min_frequency
+        frame = self._build_sync_frame(df, sns_name, category, file_date_str, current_date_int, min_frequency)
 
         # 6. 최종 Vector DB 적재
-        if ids:
-            self.vector_service.add_documents(documents=documents, metadatas=metadatas, ids=ids)
-            logger.info(f"[SUCCESS] Sync complete: {len(ids)} valid keywords saved to DB.")
-
-            # 저장된 데이터의 상위 5개를 로깅하기 위한 로직 추가
-            df_synced = pd.DataFrame(metadatas)[['keyword', 'count']].rename(columns={'count': 'frequency'})
-            df_synced = df_synced.sort_values(by='frequency', ascending=False)
-            logger.info(f"--- Top 5 Synced Keywords ---\n{df_synced.head(5).to_string(index=False)}")
+        if not frame.empty:
+            self._upsert_sync_frame(frame)
+            logger.info(f"[SUCCESS] Sync complete: {len(frame)} valid keywords saved to DB.")
+            self._log_top_keywords(frame)
         else:
-            logger.warning(f"[WARNING] No data to load in {base_name} with frequency >= 3.")
\ No newline at end of file
+            logger.warning(f"[WARNING] No data to load in {base_name} with frequency >= {min_frequency}.")
+
+    def sync_csv_directory(self, path_or_glob: str, min_frequency: int = None, max_workers: int = None,
+                           batch_size: int = 5000) -> List[Dict[str, Any]]:
+        """
+        디렉토리(또는 glob 패턴)의 *_keyword_frequencies.csv 파일들을 한 번에 적재합니다.
+        - (sns, category) 그룹별로 삭제 조건을 하나의 필터로 합쳐 1회만 삭제
+        - 결과는 파일을 이름순으로 sync_csv_to_db 한 것과 같음 (같은 날짜 파일은 마지막 파일만 반영)
+        - CSV 파싱은 프로세스 풀에서 병렬 처리
+        - 그룹별로 큰 배치 단위 upsert
+        반환값: 파일별 처리 결과 리스트 [{"file", "status", "rows", "message"}]
+        """
+        if os.path.isdir(path_or_glob):
+            pattern = os.path.join(path_or_glob, "*_keyword_frequencies.csv")
+        else:
+            pattern = path_or_glob
+        files = sorted(glob.glob(pattern))
+        min_frequency = self.min_frequency if min_frequency is None else min_frequency
+        results: Dict[str, Dict[str, Any]] = {}
+
+        # 1. 파일명 검증 및 (sns, category) 그룹핑
+        groups: Dict[Tuple[str, str], List[Tuple[str, Dict[str, Any]]]] = {}
+        for file_path in files:
+            base_name = os.path.basename(file_path)
+            try:
+                file_info = _parse_keyword_csv_name(base_name)
+            except ValueError:
+                file_info = None
+            if not file_info:
+                results[file_path] = {"file": file_path, "status": "skipped", "rows": 0, "message": "invalid file name"}
+                continue
+            groups.setdefault((file_info["sns"], file_info["category"]), []).append((file_path, file_info))
+
+        valid_files = [fp for members in groups.values() for fp, _ in members]
+        logger.info(f"[SYNC] Bulk sync: {len(files)} files found, {len(valid_files)} valid in {len(groups)} (sns, category) groups.")
+        if not valid_files:
+            return [results[fp] for fp in files]
+
+        # 2. CSV 병렬 파싱
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            parsed = dict(zip(valid_files, executor.map(_read_keyword_csv, valid_files, chunksize=8)))
+
+        # 3. 그룹별 1회 삭제 + 배치 upsert
+        for (sns_name, category), members in groups.items():
+            # 순차 재생 시 가장 최신 파일의 보관 기준일보다 오래된 데이터는 결국 삭제되므로 미리 제외
+            cutoff_int = max(info["cutoff_int"] for _, info in members)
+            # 같은 날짜 파일이 여러 개면 순차 처리에서는 나중 파일이 그 날짜 데이터를 지우고 다시 쓰므로 마지막 파일만 반영
+            latest_by_date = {info["date_int"]: file_path for file_path, info in members}
+            live, replaced_dates = [], set()
+            for file_path, info in sorted(members, key=lambda m: m[1]["date_int"]):
+                df, error = parsed[file_path]
+                is_latest = latest_by_date[info["date_int"]] == file_path
+                if info["date_int"] < cutoff_int:
+                    results[file_path] = {"file": file_path, "status": "skipped", "rows": 0, "message": "older than retention window"}
+                elif error:
+                    results[file_path] = {"file": file_path, "status": "error", "rows": 0, "message": error}
+                    # 순차 처리에서도 날짜 데이터를 지운 뒤에 파싱이 실패하므로 삭제 대상에는 포함
+                    if is_latest:
+                        replaced_dates.add(info["date_int"])
+                elif not is_latest:
+                    results[file_path] = {
+                        "file": file_path, "status": "skipped", "rows": 0,
+                        "message": f"superseded by {os.path.basename(latest_by_date[info['date_int']])}",
+                    }
+                else:
+                    live.append((file_path, info, df))
+                    replaced_dates.add(info["date_int"])
+
+            try:
+                self.vector_service.delete_by_metadata(filter={
+                    "$and": [
+                        {"sns": sns_name},
+                        {"category": category},
+                        {"$or": [
+                            {"timestamp": {"$lt": cutoff_int}},
+                            {"timestamp": {"$in": sorted(replaced_dates) or [cutoff_int]}},
+                        ]},
+                    ]
+                })
+            except Exception as e:
+                logger.debug(f"[INFO] Note during DB cleanup: {e}")
+
+            frames = []
+            for file_path, info, df in live:
+                frame = self._build_sync_frame(df, sns_name, category, info["date_str"], info["date_int"], min_frequency)
+                frames.append(frame)
+                results[file_path] = {"file": file_path, "status": "success", "rows": len(frame), "message": ""}
+            frames = [f for f in frames if not f.empty]
+            if not frames:
+                continue
+
+            group_frame = pd.concat(frames, ignore_index=True)
+            try:
+                self._upsert_sync_frame(group_frame, batch_size=batch_size)
+                logger.info(f"[SUCCESS] [{sns_name} | {category}] {len(group_frame)} keywords from {len(live)} files saved to DB.")
+            except Exception as e:
+                logger.error(f"[ERROR] [{sns_name} | {category}] Bulk upsert failed: {e}", exc_info=True)
+                for file_path, _, _ in live:
+                    results[file_path] = {"file": file_path, "status": "error", "rows": 0, "message": str(e)}
+
+        return [results[fp] for fp in files]
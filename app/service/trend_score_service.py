@@ -0,0 +1,113 @@
+# app/service/trend_score_service.py
+from datetime import datetime, timezone
+from typing import Dict, Optional, Union, Sequence
+
+import numpy as np
+import pandas as pd
+
+# 비율 지표(좋아요/댓글 비율)를 일평균 조회수와 비슷한 크기로 맞추기 위한 배율
+RATIO_SCALE = 100000.0
+
+# published_at이 없을 때 가정하는 경과 일수, 경과 일수의 하한 (youtube_client.days_since와 동일)
+DEFAULT_DAYS = 30.0
+MIN_DAYS = 0.5
+
+# 지표별 가중치 프리셋. 키는 compute_trend_features가 만드는 컬럼명
+WEIGHTINGS: Dict[str, Dict[str, float]] = {
+    "default": {"views_per_day": 0.6, "like_ratio": 0.2, "comment_ratio": 0.2},
+    "engagement": {"views_per_day": 0.3, "like_ratio": 0.35, "comment_ratio": 0.35},
+    "views": {"views_per_day": 1.0},
+}
+
+FEATURES = ["views_per_day", "like_ratio", "comment_ratio"]
+
+
+def _resolve_weights(weights: Union[str, Dict[str, float], None]) -> Dict[str, float]:
+    if weights is None:
+        return WEIGHTINGS["default"]
+    if isinstance(weights, str):
+        if weights not in WEIGHTINGS:
+            raise ValueError(f"알 수 없는 가중치 프리셋: '{weights}' (사용 가능: {list(WEIGHTINGS)})")
+        return WEIGHTINGS[weights]
+    unknown = set(weights) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"알 수 없는 지표: {sorted(unknown)} (사용 가능: {FEATURES})")
+    return weights
+
+
+def compute_trend_features(
+    views: Sequence,
+    likes: Sequence,
+    comments: Sequence,
+    published_at: Sequence,
+    now: Optional[datetime] = None,
+) -> pd.DataFrame:
+    """
+    조회수/좋아요/댓글 수와 게시 시각 컬럼으로 트렌드 지표를 한 번에 계산합니다.
+    반환 컬럼: days_since, views_per_day, like_ratio, comment_ratio
+    """
+    now_ts = pd.Timestamp(now or datetime.now(timezone.utc))
+    if now_ts.tzinfo is None:
+        now_ts = now_ts.tz_localize("UTC")
+
+    v = pd.to_numeric(pd.Series(views), errors="coerce").fillna(0).to_numpy(dtype="float64")
+    l = pd.to_numeric(pd.Series(likes), errors="coerce").fillna(0).to_numpy(dtype="float64")
+    c = pd.to_numeric(pd.Series(comments), errors="coerce").fillna(0).to_numpy(dtype="float64")
+
+    published = pd.to_datetime(pd.Series(published_at), errors="coerce", utc=True)
+    days = ((now_ts - published).dt.total_seconds() / 86400.0).to_numpy(dtype="float64")
+    days = np.where(np.isnan(days), DEFAULT_DAYS, np.maximum(days, MIN_DAYS))
+
+    has_views = v > 0
+    safe_views = np.where(has_views, v, 1.0)
+    return pd.DataFrame({
+        "days_since": days,
+        "views_per_day": v / days,
+        "like_ratio": np.where(has_views, l / safe_views, 0.0),
+        "comment_ratio": np.where(has_views, c / safe_views, 0.0),
+    })
+
+
+def score_trend_features(
+    features: pd.DataFrame,
+    weights: Union[str, Dict[str, float], None] = "default",
+    normalize: Optional[str] = None,
+) -> np.ndarray:
+    """
+    지표 DataFrame에 가중치를 적용해 점수 배열을 반환합니다.
+    normalize="percentile" 이면 지표별로 이번 수집분 안에서의 백분위(0~1)로 바꾼 뒤 가중합합니다.
+    """
+    weights = _resolve_weights(weights)
+    if features.empty:
+        return np.zeros(0)
+
+    if normalize == "percentile":
+        scaled = features[FEATURES].rank(pct=True, method="average")
+    elif normalize in (None, "", "none"):
+        scaled = features[FEATURES].copy()
+        scaled[["like_ratio", "comment_ratio"]] *= RATIO_SCALE
+    else:
+        raise ValueError(f"지원하지 않는 정규화 방식: '{normalize}'")
+
+    score = np.zeros(len(features))
+    for feature, weight in weights.items():
+        score += scaled[feature].to_numpy(dtype="float64") * weight
+    return score
+
+
+def score_videos_df(
+    df: pd.DataFrame,
+    weights: Union[str, Dict[str, float], None] = "default",
+    normalize: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> pd.Series:
+    """
+    viewCount/likeCount/commentCount/published_at 컬럼을 가진 영상 DataFrame의 트렌드 점수
+    수집해 둔 CSV의 오프라인 재점수화/백테스트: python scripts/rescore_youtube_csv.py <csv> --weighting engagement --as-of 2026-10-01
+    """
+    if df.empty:
+        return pd.Series(dtype="float64", index=df.index)
+    features = compute_trend_features(
+        df["viewCount"], df["likeCount"], df["commentCount"], df["published_at"], now=now
+    )
+    return pd.Series(score_trend_features(features, weights=weights, normalize=normalize), index=df.index)
@@ -1,18 +1,94 @@
 # app/service/vector_service.py
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+from collections import Counter
 from datetime import datetime, timedelta
+import pandas as pd
 from app.service.embedding_service import EmbeddingService
 from app.repository.vector.vector_repo import ChromaDBRepository
+from app.repository.cache.report_cache import get_report_cache
+
+
+def _filter_categories(filter: Any) -> List[str]:
+    """where 필터에서 category 조건 값을 모읍니다. ($and/$or 중첩, {"$eq": ...} 포함)"""
+    found = []
+    if isinstance(filter, dict):
+        for key, value in filter.items():
+            if key == "category":
+                value = value.get("$eq") if isinstance(value, dict) else value
+                if isinstance(value, str):
+                    found.append(value)
+            elif isinstance(value, (list, dict)):
+                found.extend(_filter_categories(value))
+    elif isinstance(filter, list):
+        for item in filter:
+            found.extend(_filter_categories(item))
+    return found
+
+
+def _invalidate_reports(categories: Any = None):
+    """카테고리 데이터가 바뀌었으므로 리포트 캐시의 데이터 버전을 올립니다. (categories=None 이면 전체)"""
+    report_cache = get_report_cache()
+    if report_cache:
+        report_cache.bump_versions(categories)
+
+
+def build_daily_sentiment_series(docs, start_date, end_date):
+    """문서의 published_at/sentiment로 기간 내 일별 감성 건수(positive/neutral/negative) 레코드를 만듭니다."""
+    if not docs:
+        return []
+
+    records = []
+    for doc in docs:
+        ts = doc.get("published_at")
+        sentiment = doc.get("sentiment")
+        if ts and sentiment:
+            try:
+                dt = datetime.fromtimestamp(float(ts))
+                records.append({"date": pd.Timestamp(dt).normalize(), "sentiment": sentiment})
+            except (ValueError, TypeError):
+                continue
+
+    if not records:
+        return []
+
+    df = pd.DataFrame(records)
+    df_pivot = df.groupby(["date", "sentiment"]).size().unstack(fill_value=0)
+
+    for s in ["positive", "neutral", "negative"]:
+        if s not in df_pivot.columns:
+            df_pivot[s] = 0
+
+    full_date_range = pd.date_range(start=start_date, end=end_date, freq="D").normalize()
+    df_pivot = df_pivot.reindex(full_date_range, fill_value=0)
+    df_pivot = df_pivot[["positive", "neutral", "negative"]]
+
+    daily_sentiments = df_pivot.reset_index().rename(columns={"index": "date"})
+    daily_sentiments["date"] = daily_sentiments["date"].dt.strftime("%Y-%m-%d")
+    return daily_sentiments.to_dict("records")
 
 
 class VectorService:
     def __init__(self, vector_repository: ChromaDBRepository, embedding_service: EmbeddingService):
         self.vector_repository = vector_repository
         self.embedding_service = embedding_service
+        # 요청 단위 기간 스냅샷 메모 (VectorService는 요청마다 생성됨, 쓰기 발생 시 무효화)
+        self._snapshot_memo: Dict[tuple, Dict[str, Any]] = {}
 
     def add_documents(self, documents: List[str], metadatas: List[Dict[str, Any]] = None, ids: List[str] = None):
-        embeddings = self.embedding_service.create_embeddings(documents)
-        self.vector_repository.add_documents(documents=documents, embeddings=embeddings, metadatas=metadatas, ids=ids)
+        self._snapshot_memo.clear()
+        try:
+            # 임베딩이 끝난 배치부터 입력 순서대로 바로 upsert (전체 실패 방지)
+            for start, end, embeddings in self.embedding_service.iter_embedding_batches(documents):
+                self.vector_repository.add_documents(
+                    documents=documents[start:end],
+                    embeddings=embeddings,
+                    metadatas=metadatas[start:end] if metadatas is not None else None,
+                    ids=ids[start:end] if ids is not None else None,
+                )
+        finally:
+            # 쓰기가 끝난 뒤 버전을 올려야 쓰는 도중 만든 리포트가 캐시에 유효하게 남지 않음
+            categories = {m.get("category") for m in metadatas or [] if m}
+            _invalidate_reports(categories if metadatas is not None and None not in categories else None)
 
     def search(self, query: str, n_results: int = 25) -> List[Dict[str, Any]]:
         query_embedding = self.embedding_service.create_embedding(query)
@@ -29,10 +105,22 @@ class VectorService:
         return out
 
     def delete_by_metadata(self, filter: Dict[str, Any]):
-        return self.vector_repository.delete(where=filter)
+        self._snapshot_memo.clear()
+        try:
+            return self.vector_repository.delete(where=filter)
+        finally:
+            _invalidate_reports(_filter_categories(filter) or None)
+
+    @property
+    def _metadata_index(self):
+        return getattr(self.vector_repository, "metadata_index", None)
 
     def get_keyword_frequencies(self, category: str, sns: str, n_results: int = 100, start_date: str = None, end_date: str = None) -> List[Dict[str, Any]]:
         from collections import Counter
+        if self._metadata_index:
+            rows = self._metadata_index.keyword_frequencies(category, sns, n_results=n_results, start_day=start_date, end_day=end_date)
+            return [{"keyword": kw, "frequency": count} for kw, count in rows]
+
         where_filter = {"$and": [{"category": category}, {"sns": sns}]}
         
         if start_date and end_date:
@@ -57,6 +145,10 @@ class VectorService:
 
     def get_sentiment_frequencies(self, category: str, sns: str, n_results: int = 100, start_date: str = None, end_date: str = None) -> List[Dict[str, Any]]:
         from collections import Counter
+        if self._metadata_index:
+            rows = self._metadata_index.sentiment_frequencies(category, sns, n_results=n_results, start_day=start_date, end_day=end_date)
+            return [{"sentiment": s, "frequency": count} for s, count in rows]
+
         where_filter = {"$and": [{"category": category}, {"sns": sns}]}
 
         if start_date and end_date:
@@ -105,22 +197,82 @@ class VectorService:
         
         return output_docs
 
+    def get_period_snapshot(self, category: str, sns: str, start_date: str, end_date: str) -> Dict[str, Any]:
+        """
+        (category, sns, 기간)에 대한 분석용 데이터를 한 번의 조회로 모아 반환합니다.
+        - keyword_frequencies_all: 전체 기간 키워드 빈도 (내림차순)
+        - keyword_frequencies: 기간 내 키워드 빈도 (내림차순)
+        - sentiment_frequencies: 기간 내 감성 빈도
+        - daily_sentiments: 기간 내 일별 감성 추이
+        - documents: 기간 내 문서 (text + 메타데이터)
+        같은 요청 안에서는 결과를 메모해 두고 재사용합니다.
+        """
+        memo_key = (category, sns, start_date, end_date)
+        if memo_key in self._snapshot_memo:
+            return self._snapshot_memo[memo_key]
+
+        docs = self.get_documents_for_period(category=category, sns=sns, start_date=start_date, end_date=end_date)
+
+        keyword_counts = Counter()
+        sentiment_counts = Counter()
+        for doc in docs:
+            keywords_str = doc.get("keyword")
+            if keywords_str and isinstance(keywords_str, str):
+                keyword_counts.update([kw.strip() for kw in keywords_str.split(',') if kw.strip()])
+            sentiment_str = doc.get("sentiment")
+            if sentiment_str and isinstance(sentiment_str, str):
+                sentiment_counts.update([sentiment_str])
+
+        # 전체 기간 빈도는 집계 인덱스가 있으면 인덱스에서, 없으면 한 번 더 스캔
+        all_time = self.get_keyword_frequencies(category=category, sns=sns, n_results=1000)
+
+        snapshot = {
+            "keyword_frequencies_all": all_time,
+            "keyword_frequencies": [{"keyword": kw, "frequency": c} for kw, c in keyword_counts.most_common()],
+            "sentiment_frequencies": [{"sentiment": s, "frequency": c} for s, c in sentiment_counts.most_common()],
+            "daily_sentiments": build_daily_sentiment_series(docs, start_date, end_date),
+            "documents": docs,
+        }
+        self._snapshot_memo[memo_key] = snapshot
+        return snapshot
+
+    def record_crawl_coverage(self, category: str, sns: str, start_date: str, end_date: str):
+        """[start_date, end_date] 기간의 크롤링/적재가 끝났음을 커버리지 원장에 기록합니다."""
+        ledger = getattr(self.vector_repository, "coverage_ledger", None)
+        if ledger:
+            ledger.record(category, sns, start_date, end_date)
+
+    def get_coverage_gaps(self, category: str, sns: str, start_date: str, end_date: str) -> List[Tuple[str, str]]:
+        """
+        요청 기간 중 아직 크롤링하지 않은 (start, end) 구간 목록을 반환합니다.
+        원장을 사용할 수 없으면 요청 기간 전체를 빈 구간으로 간주합니다.
+        """
+        ledger = getattr(self.vector_repository, "coverage_ledger", None)
+        if not ledger:
+            return [(start_date, end_date)]
+        return ledger.gaps(category, sns, start_date, end_date)
+
     def check_data_existence(self, category: str, start_date: str, end_date: str) -> Dict[str, Any]:
         user_start_ts = datetime.strptime(f"{start_date}T00:00:00", "%Y-%m-%dT%H:%M:%S").timestamp()
         user_end_ts = datetime.strptime(f"{end_date}T23:59:59", "%Y-%m-%dT%H:%M:%S").timestamp()
 
-        results = self.vector_repository.get_by_metadata(where={"category": category}, include=['metadatas'])
+        if self._metadata_index:
+            db_min_ts, db_max_ts = self._metadata_index.published_range(category)
+            if db_min_ts is None or db_max_ts is None:
+                return {"status": "NONE", "new_start": start_date, "new_end": end_date}
+        else:
+            results = self.vector_repository.get_by_metadata(where={"category": category}, include=['metadatas'])
 
-        if not results or not results.get('metadatas'):
-            return {"status": "NONE", "new_start": start_date, "new_end": end_date}
+            if not results or not results.get('metadatas'):
+                return {"status": "NONE", "new_start": start_date, "new_end": end_date}
 
-        published_timestamps = [meta['published_at'] for meta in results['metadatas'] if meta.get('published_at') and isinstance(meta['published_at'], (int, float))]
-        
-        if not published_timestamps:
-            return {"status": "NONE", "new_start": start_date, "new_end": end_date}
+            published_timestamps = [meta['published_at'] for meta in results['metadatas'] if meta.get('published_at') and isinstance(meta['published_at'], (int, float))]
+
+            if not published_timestamps:
+                return {"status": "NONE", "new_start": start_date, "new_end": end_date}
 
-        db_min_ts = min(published_timestamps)
-        db_max_ts = max(published_timestamps)
+            db_min_ts = min(published_timestamps)
+            db_max_ts = max(published_timestamps)
         db_min_dt = datetime.fromtimestamp(db_min_ts)
         db_max_dt = datetime.fromtimestamp(db_max_ts)
 
@@ -0,0 +1,72 @@
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+
+# Add the project root to the Python path to resolve module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# 실제 캐시/원장을 건드리지 않도록 임시 디렉터리를 사용 (app 모듈 import 전에 설정)
+work_dir = tempfile.mkdtemp(prefix="tm_report_cache_check_")
+os.environ["REPORT_CACHE_ENABLED"] = "true"
+os.environ["REPORT_CACHE_PATH"] = os.path.join(work_dir, "report_results.sqlite3")
+
+from datetime import datetime
+from app.agents.workflow import cache_check_node
+from app.core.logger import logger
+from app.repository.cache.report_cache import ReportResultCache, get_report_cache
+from app.repository.vector.coverage_ledger import CoverageLedger
+from app.service.vector_service import VectorService
+
+# 로거 설정
+logger.setLevel("INFO")
+
+
+def check_repeated_request_hits_report_cache() -> bool:
+    """
+    같은 slots로 두 번 요청하면 두 번째 cache_check는 report_cache_hit=True 여야 합니다.
+    첫 요청 후 strategy_gen이 리포트를 저장하는 과정을 그대로 재현합니다. (크롤링/LLM 호출 없음)
+    """
+    ledger = CoverageLedger(os.path.join(work_dir, "coverage.sqlite3"))
+    vector_service = VectorService(vector_repository=SimpleNamespace(coverage_ledger=ledger), embedding_service=None)
+    config = {"configurable": {"vector_service": vector_service}}
+    slots = {"search_query": "캠핑", "period_days": 7, "region": "KR"}
+    state = {"user_input": "요즘 캠핑 트렌드 알려줘", "slots": slots}
+
+    first = cache_check_node(state, config)
+    if first.get("report_cache_hit"):
+        logger.error(f"First request unexpectedly hit the report cache: {first}")
+        return False
+
+    # strategy_gen: 데이터를 읽기 전에 버전을 조회하고, PDF까지 만든 리포트를 저장
+    report_cache = get_report_cache()
+    data_version = report_cache.data_version(slots["search_query"])
+    pdf_path = os.path.join(work_dir, "report.pdf")
+    with open(pdf_path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+    end_date_str = datetime.now().strftime("%Y-%m-%d")
+    report_cache.put(
+        ReportResultCache.make_key(slots, end_date_str),
+        slots["search_query"],
+        data_version,
+        {"final_answer": "cached report", "pdf_path": pdf_path, "keyword_frequencies": [], "daily_sentiments": []},
+    )
+
+    second = cache_check_node(state, config)
+    if not second.get("report_cache_hit") or second.get("final_answer") != "cached report":
+        logger.error(f"Repeated request did not hit the report cache: {second}")
+        return False
+
+    # 카테고리 데이터가 바뀌면 같은 요청이라도 다시 분석해야 함
+    report_cache.bump_versions([slots["search_query"]])
+    third = cache_check_node(state, config)
+    if third.get("report_cache_hit"):
+        logger.error(f"Report cache was not invalidated by a data change: {third}")
+        return False
+
+    logger.info("Repeated identical request returned report_cache_hit=True.")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_repeated_request_hits_report_cache() else 1)
@@ -0,0 +1,47 @@
+import sys
+import os
+import argparse
+
+# Add the project root to the Python path to resolve module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from app.core.logger import logger
+from app.service.trend_score_service import WEIGHTINGS, score_videos_df
+
+# 로거 설정
+logger.setLevel("INFO")
+
+
+def rescore_csv(path: str, weighting: str, normalize: str = None, as_of: str = None, top: int = 20, output: str = None):
+    """
+    수집해 둔 YouTube CSV(downloads/youtube_*.csv)를 다른 가중치/정규화/기준 시각으로 다시 점수화합니다.
+    API를 다시 호출하지 않으므로 가중치 프리셋 비교나 과거 시점 기준 백테스트에 사용합니다.
+    """
+    df = pd.read_csv(path)
+    df["published_at"] = pd.to_datetime(df["published_at"], errors="coerce", utc=True)
+    now = pd.Timestamp(as_of, tz="UTC").to_pydatetime() if as_of else None
+
+    df["rescored"] = score_videos_df(df, weights=weighting, normalize=normalize, now=now)
+    df = df.sort_values("rescored", ascending=False).reset_index(drop=True)
+
+    columns = [c for c in ["rescored", "score", "title", "viewCount", "published_at"] if c in df.columns]
+    logger.info(f"--- Top {top} by '{weighting}' (normalize={normalize}, as_of={as_of or 'now'}) ---\n{df[columns].head(top).to_string()}")
+
+    if output:
+        df.to_csv(output, index=False, encoding="utf-8-sig")
+        logger.info(f"Rescored CSV saved to {output}")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score a collected YouTube CSV offline.")
+    parser.add_argument("csv_path", help="e.g. downloads/youtube_캠핑_20261017_7d_with_keywords.csv")
+    parser.add_argument("--weighting", default="default", choices=sorted(WEIGHTINGS))
+    parser.add_argument("--normalize", default=None, choices=["percentile"])
+    parser.add_argument("--as-of", default=None, help="기준 시각 (예: 2026-10-01T00:00:00). 백테스트용")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", default=None, help="점수를 추가한 CSV 저장 경로")
+    args = parser.parse_args()
+
+    rescore_csv(args.csv_path, args.weighting, normalize=args.normalize, as_of=args.as_of, top=args.top, output=args.output)